@@ -0,0 +1,327 @@
+"""Local HTTP service for FFT analysis without the GUI.
+
+Endpoints (JSON in and out unless noted):
+
+    GET  /health    service status and cache statistics
+    POST /analyze   spectrum and peaks of an uploaded array or a file range
+
+``/analyze`` accepts either a JSON body::
+
+    {"data": [0.1, 0.2, ...], "fs": 1000, "window": "hann"}
+    {"file": "run_12.csv", "column": "Thrust", "start_line": 1, "n_lines": 4096,
+     "fs": 1000, "window": "hann", "max_peaks": 10}
+
+or raw little-endian float64 samples (``Content-Type:
+application/octet-stream``) with the parameters in the query string
+(``/analyze?fs=1000&window=hann``). Add ``format=npz`` to the query string
+to receive the arrays as an ``.npz`` file instead of JSON.
+
+Requests for spectra of the same length and window that arrive within a
+few milliseconds of each other are computed together with one 2-D FFT,
+and results are cached by request content.
+
+Usage:
+    python analysis_service.py --port 8765 --settings fft_analyzer_settings.json
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from scipy.fft import fftfreq
+
+from fft_core import (MULTITAPER, PRECISIONS, WINDOW_CHOICES, compute_spectrum_batch, detect_peaks, extract_range,
+                      load_table, multitaper_params_from_settings, peak_params_from_settings)
+from spectral_index import load_settings_file
+
+DEFAULT_PORT = 8765
+BATCH_WAIT = 0.005  # Seconds to wait for more same-length requests
+MAX_BATCH = 256
+CACHE_ENTRIES = 256
+MAX_BODY_BYTES = 512 * 1024 * 1024
+
+
+class SpectrumBatcher:
+    """Collect concurrent spectrum requests and compute equal-length ones together"""
+
+    def __init__(self, max_wait=BATCH_WAIT, max_batch=MAX_BATCH):
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.pending = {}  # (n, window, dtype, multitaper items) -> [(data, future), ...]
+        self.condition = threading.Condition()
+        self.batches = 0
+        self.spectra = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, data, window_func='none', multitaper=None):
+        """Queue one segment; the future resolves to its amplitude spectrum"""
+        future = Future()
+        key = (len(data), window_func, data.dtype.str, tuple(sorted(multitaper.items())) if multitaper else None)
+        with self.condition:
+            self.pending.setdefault(key, []).append((data, future))
+            self.condition.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+            # Let requests arriving at the same moment join the batch
+            time.sleep(self.max_wait)
+            with self.condition:
+                groups, self.pending = self.pending, {}
+            for (n, window_func, _, multitaper), items in groups.items():
+                for i in range(0, len(items), self.max_batch):
+                    self._compute(items[i:i + self.max_batch], window_func, dict(multitaper) if multitaper else None)
+
+    def _compute(self, items, window_func, multitaper=None):
+        try:
+            # The frequency axis is applied per request, so any fs works here
+            _, amplitudes = compute_spectrum_batch(np.stack([data for data, _ in items]), 1.0, window_func,
+                                                   multitaper)
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.spectra += len(items)
+        for (_, future), amplitude in zip(items, amplitudes):
+            future.set_result(amplitude.copy())  # Cached results must not pin the whole batch
+
+
+class ResultCache:
+    """Thread-safe least-recently-used cache of analysis results"""
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class AnalysisService:
+    """Request handling independent of HTTP: parameters in, spectrum and peaks out"""
+
+    def __init__(self, settings=None, batcher=None, cache=None):
+        self.settings = settings or {}
+        self.peak_params = peak_params_from_settings(self.settings)
+        self.multitaper = multitaper_params_from_settings(self.settings)
+        self.batcher = batcher or SpectrumBatcher()
+        self.cache = cache or ResultCache()
+        self.tables = ResultCache(max_entries=8)
+
+    def load_data(self, params, body=None):
+        """Samples of the request: the uploaded array or a file column range"""
+        dtype = params.get('precision', self.settings.get('processing_precision', 'float64'))
+        if dtype not in PRECISIONS:
+            raise ValueError(f"precision must be one of {', '.join(PRECISIONS)}")
+
+        if body is not None:
+            data = np.frombuffer(body, dtype='<f8')
+        elif 'data' in params:
+            data = np.asarray(params['data'], dtype=float)
+        elif 'file' in params:
+            path = os.path.abspath(params['file'])
+            stat = os.stat(path)
+            table_key = (path, stat.st_mtime, stat.st_size)
+            table = self.tables.get(table_key)
+            if table is None:
+                table = load_table(path)
+                self.tables.put(table_key, table)
+            if 'column' not in params:
+                raise ValueError("A 'column' is required with 'file'.")
+            n_lines = params.get('n_lines')
+            data = extract_range(table, params['column'], int(params.get('start_line', 1)),
+                                 int(n_lines) if n_lines else None)
+            if getattr(table, 'sample_rate', None) and 'fs' not in params:
+                params['fs'] = table.sample_rate
+        else:
+            raise ValueError("Provide 'data', 'file' or a binary body.")
+
+        data = data[~np.isnan(data)].astype(dtype, copy=False)
+        if len(data) < 2:
+            raise ValueError("At least two valid samples are needed.")
+        return data
+
+    def cache_key(self, data, freq_hz, window_func, max_peaks):
+        digest = hashlib.sha1(np.ascontiguousarray(data).view(np.uint8)).hexdigest()
+        return (digest, data.dtype.str, len(data), freq_hz, window_func, max_peaks)
+
+    def analyze(self, params, body=None):
+        """Spectrum and peaks for one request; the result dict has a 'cached' flag"""
+        data = self.load_data(params, body)
+        freq_hz = float(params.get('fs', 1000.0))
+        if freq_hz <= 0:
+            raise ValueError("fs must be positive.")
+        window_func = params.get('window', self.settings.get('window_function', 'none'))
+        if window_func not in WINDOW_CHOICES:
+            raise ValueError(f"Unknown window: {window_func}")
+        max_peaks = int(params.get('max_peaks', 10))
+
+        key = self.cache_key(data, freq_hz, window_func, max_peaks)
+        result = self.cache.get(key)
+        if result is not None:
+            return dict(result, cached=True)
+
+        amplitude = self.batcher.submit(data, window_func,
+                                        self.multitaper if window_func == MULTITAPER else None).result()
+        n = len(data)
+        frequencies = fftfreq(n, 1.0 / freq_hz)[:n//2]
+        peaks_idx = sorted(detect_peaks(amplitude, self.peak_params),
+                           key=lambda idx: amplitude[idx], reverse=True)[:max_peaks]
+        result = {
+            'n_points': n,
+            'fs': freq_hz,
+            'window': window_func,
+            'frequencies': frequencies,
+            'amplitudes': amplitude,
+            'peak_frequencies': frequencies[peaks_idx],
+            'peak_amplitudes': amplitude[peaks_idx]
+        }
+        self.cache.put(key, result)
+        return dict(result, cached=False)
+
+    def stats(self):
+        return {
+            'status': 'ok',
+            'cache_entries': len(self.cache.entries),
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'fft_batches': self.batcher.batches,
+            'spectra_computed': self.batcher.spectra
+        }
+
+
+def encode_json(result):
+    return json.dumps({
+        'n_points': result['n_points'],
+        'fs': result['fs'],
+        'window': result['window'],
+        'cached': result['cached'],
+        'frequencies': result['frequencies'].tolist(),
+        'amplitudes': result['amplitudes'].tolist(),
+        'peaks': [{'frequency': float(f), 'amplitude': float(a)}
+                  for f, a in zip(result['peak_frequencies'], result['peak_amplitudes'])]
+    }).encode()
+
+
+def encode_npz(result):
+    buffer = io.BytesIO()
+    np.savez(buffer, frequencies=result['frequencies'], amplitudes=result['amplitudes'],
+             peak_frequencies=result['peak_frequencies'], peak_amplitudes=result['peak_amplitudes'])
+    return buffer.getvalue()
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def send_body(self, status, body, content_type='application/json'):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_error_json(self, status, message):
+            self.send_body(status, json.dumps({'error': message}).encode())
+
+        def do_GET(self):
+            if urlparse(self.path).path == '/health':
+                self.send_body(200, json.dumps(service.stats()).encode())
+            else:
+                self.send_error_json(404, "Not found")
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != '/analyze':
+                self.send_error_json(404, "Not found")
+                return
+
+            length = int(self.headers.get('Content-Length', 0))
+            if length > MAX_BODY_BYTES:
+                self.send_error_json(413, "Request body too large")
+                return
+            raw = self.rfile.read(length)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+            try:
+                if self.headers.get('Content-Type', '').startswith('application/octet-stream'):
+                    result = service.analyze(params, body=raw)
+                else:
+                    params.update(json.loads(raw or b'{}'))
+                    result = service.analyze(params)
+            except (ValueError, KeyError, OSError) as e:
+                self.send_error_json(400, str(e))
+                return
+            except Exception as e:
+                self.send_error_json(500, str(e))
+                return
+
+            if params.get('format') == 'npz':
+                self.send_body(200, encode_npz(result), 'application/octet-stream')
+            else:
+                self.send_body(200, encode_json(result))
+
+        def log_message(self, format, *args):
+            pass  # Keep the console quiet; errors are returned to the client
+
+    return Handler
+
+
+def create_server(host='127.0.0.1', port=DEFAULT_PORT, settings=None):
+    """Create (but do not start) the HTTP server; port 0 picks a free port"""
+    service = AnalysisService(settings)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve FFT analyses over HTTP on this machine")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--settings', default='fft_analyzer_settings.json',
+                        help="Settings file providing default window, precision and peak parameters")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port, load_settings_file(args.settings))
+    print(f"Serving FFT analysis on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
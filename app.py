@@ -5,12 +5,38 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
-from scipy.fft import fft, fftfreq
-from scipy.signal.windows import blackman, hann, hamming
+from matplotlib.colors import LogNorm
+from matplotlib.widgets import SpanSelector
+import hashlib
 import json
+import multiprocessing
 import os
+import re
 from datetime import datetime
 
+from cross_spectrum import cross_spectral_analysis, cross_spectrum_table
+from envelope import envelope_spectrum
+from fft_backends import BACKEND_CHOICES, available_backends, configure
+from fft_core import (DEFAULT_MULTITAPER_PARAMS, MULTITAPER, MULTITAPER_SETTING_KEYS, PEAK_SETTING_KEYS,
+                      PRECISIONS, WINDOW_CHOICES, compute_spectrum, decimate, detect_peaks,
+                      fft_copies, load_table, numeric_columns, precision_report, read_column)
+from limit_mask import REPORT_COLUMNS, check_files, load_mask, parse_mask, save_mask
+from loaders import BINARY_DTYPES, DEFAULT_DESCRIPTOR, is_binary_file, read_descriptor, write_descriptor
+from memory_budget import DEFAULT_MEMORY_BUDGET_MB, MEMORY_STRATEGIES, plan_analysis, run_plan
+from octave_bands import OCTAVE_FRACTIONS, band_levels, band_table
+from peak_tracking import track_peaks, track_summary
+from plot_export import EXPORT_DPI, export_figure_async
+from pyramid import MinMaxPyramid, file_signature, pyramid_path
+from quality import describe_quality, scan_quality
+from report import REPORT_FORMATS, format_cell, generate_reports, group_files
+from results_model import ALL, ResultsModel
+from spectral_index import SpectralIndex
+from spectral_summary import load_summaries, save_summaries, summarize_spectrum, summary_curve
+from spectrum_cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MB, SpectrumCache, cache_key, digest_rows
+from sweep import build_sweep_jobs, export_sweep, run_sweep_async, waterfall_matrix
+from timebase import (analyze_time_base, compute_nonuniform_spectrum, describe_time_base,
+                      find_time_column, has_irregular_sampling)
+
 class FFTAnalyzerApp:
     def __init__(self, root):
         self.root = root
@@ -20,6 +46,9 @@ class FFTAnalyzerApp:
         
         # Data storage
         self.df = None
+        self.time_column = None  # Time column of the loaded file, if any
+        self.limit_mask = None  # Active limit mask, checked after every analysis
+        self.limit_mask_artists = []
         self.fft_results = {}  # Store multiple FFT results for combining
         self.original_default_colors = ["#0095ff", '#ff7f0e', "#22d322", "#ff0000", "#a94cff", '#8c564b']
         self.current_colors = self.original_default_colors.copy()
@@ -30,19 +59,37 @@ class FFTAnalyzerApp:
             'peak_labels_count': 5,
             'default_colors': self.original_default_colors.copy(),
             'window_function': 'none',
-            'peak_threshold_mode': 'relative',  # 'relative', 'absolute', or 'statistical'
+            'peak_threshold_mode': 'relative',  # 'relative', 'absolute', 'statistical' or 'noise_floor'
             'peak_relative_threshold': 0.1,  # 10% of max amplitude
             'peak_absolute_threshold': 0.001,  # Absolute amplitude value
             'peak_statistical_factor': 1.0,  # Factor for statistical threshold (mean + factor * std)
+            'peak_noise_margin_db': 10.0,  # Margin above the local noise floor (dB)
+            'peak_noise_window': 65,  # Noise floor window (frequency bins)
+            'peak_noise_percentile': 50,  # Noise floor percentile (50 = running median)
             'peak_min_distance': 10,  # Minimum distance between peaks (in frequency bins)
             'skip_dc_component': True,  # Skip DC (0 Hz) component
             'peak_window_size': 3,  # Window size for local maximum detection
             'pin_face_color': 'yellow',  # Pin annotation background color
-            'pin_edge_color': 'orange'   # Pin annotation border color
+            'pin_edge_color': 'orange',   # Pin annotation border color
+            'index_db_path': 'fft_spectral_index.db',  # SQLite spectral index database
+            'processing_precision': 'float64',  # 'float64' or 'float32' pipeline
+            'persist_preview_pyramid': False,  # Save time-domain preview pyramids next to data files
+            'quality_scan': True,  # Scan the range for clipping, flat-lines, spikes, gaps before the FFT
+            'memory_budget_mb': DEFAULT_MEMORY_BUDGET_MB,  # Working set allowed for one analysis
+            'memory_strategy': 'auto',  # Strategy over budget: 'auto', 'averaged' or 'decimated'
+            'fft_backend': 'auto',  # 'auto' (benchmark per size class), 'scipy', 'numpy' or 'pyfftw'
+            'spectrum_cache': True,  # Reuse spectra of identical samples and parameters across sessions
+            'spectrum_cache_dir': DEFAULT_CACHE_DIR,  # May be a shared team directory
+            'spectrum_cache_mb': DEFAULT_CACHE_MB,  # Size bound; least recently used entries go first
+            'multitaper_nw': DEFAULT_MULTITAPER_PARAMS['nw'],  # Time-half-bandwidth product of the DPSS tapers
+            'multitaper_tapers': 0,  # Number of tapers, 0 = 2NW - 1
+            'multitaper_adaptive': True  # Adaptive (Thomson) weighting of the eigenspectra
         }
         
         self.setup_ui()
         self.load_settings()
+        self.configure_fft_backend()
+        self.configure_spectrum_cache()
     
     def setup_ui(self):
         # Create main notebook for tabs
@@ -61,9 +108,14 @@ class FFTAnalyzerApp:
         self.results_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.results_frame, text="Combined Results")
         
+        # Spectral Index Tab
+        self.index_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.index_frame, text="Spectral Index")
+        
         self.setup_main_tab()
         self.setup_settings_tab()
         self.setup_results_tab()
+        self.setup_index_tab()
     
     def setup_main_tab(self):
         # Create paned window for resizable sections
@@ -89,7 +141,7 @@ class FFTAnalyzerApp:
         self.file_path = tk.StringVar()
         ttk.Label(file_frame, text="Selected File:").pack(anchor=tk.W)
         ttk.Entry(file_frame, textvariable=self.file_path, state="readonly").pack(fill=tk.X, pady=(5, 10))
-        ttk.Button(file_frame, text="Select CSV File", command=self.select_file).pack(fill=tk.X)
+        ttk.Button(file_frame, text="Select Data File", command=self.select_file).pack(fill=tk.X)
         
         # Data configuration section
         data_frame = ttk.LabelFrame(parent, text="Data Configuration", padding="10")
@@ -151,6 +203,11 @@ class FFTAnalyzerApp:
         ttk.Entry(freq_frame, textvariable=self.freq_var, width=10).pack(side=tk.LEFT)
         ttk.Label(freq_frame, text="Hz").pack(side=tk.LEFT, padx=(5, 0))
         
+        # Sample rate detected from the time column
+        self.timebase_label = ttk.Label(data_frame, text="", foreground="blue", 
+                                       font=("TkDefaultFont", 8), wraplength=300)
+        self.timebase_label.pack(anchor=tk.W, pady=(0, 5))
+        
         # Analysis information
         analysis_frame = ttk.LabelFrame(parent, text="Analysis Information", padding="10")
         analysis_frame.pack(fill=tk.X, pady=(0, 10))
@@ -163,14 +220,65 @@ class FFTAnalyzerApp:
         ttk.Label(analysis_frame, text="Window Function:").pack(anchor=tk.W)
         self.window_var = tk.StringVar(value="none")
         window_combo = ttk.Combobox(analysis_frame, textvariable=self.window_var, 
-                                values=["none", "blackman", "hann", "hamming"], 
+                                values=list(WINDOW_CHOICES), 
                                 state="readonly")
         window_combo.pack(fill=tk.X, pady=(5, 10))
         
+        # Spectrum mode (non-uniform uses the time column)
+        ttk.Label(analysis_frame, text="Spectrum Mode:").pack(anchor=tk.W)
+        self.spectrum_mode_var = tk.StringVar(value="auto")
+        ttk.Combobox(analysis_frame, textvariable=self.spectrum_mode_var, 
+                    values=["auto", "uniform", "non-uniform"], 
+                    state="readonly").pack(fill=tk.X, pady=(5, 10))
+        
+        # Processing precision
+        precision_frame = ttk.Frame(analysis_frame)
+        precision_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(precision_frame, text="Precision:").pack(side=tk.LEFT)
+        self.precision_var = tk.StringVar(value=self.settings['processing_precision'])
+        ttk.Combobox(precision_frame, textvariable=self.precision_var, values=list(PRECISIONS), 
+                    state="readonly", width=8).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(precision_frame, text="Check Accuracy", 
+                  command=self.check_precision_accuracy).pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Decimation ahead of the FFT for low-frequency analysis
+        decimation_frame = ttk.Frame(analysis_frame)
+        decimation_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(decimation_frame, text="Decimation Factor:").pack(side=tk.LEFT)
+        self.decimation_var = tk.IntVar(value=1)
+        ttk.Spinbox(decimation_frame, from_=1, to=1000, width=6, 
+                   textvariable=self.decimation_var).pack(side=tk.LEFT, padx=(10, 0))
+        self.decimation_label = ttk.Label(decimation_frame, text="(1 = off)", font=("TkDefaultFont", 8))
+        self.decimation_label.pack(side=tk.LEFT, padx=(10, 0))
+        self.decimation_var.trace_add('write', self.update_decimation_label)
+        self.freq_var.trace_add('write', self.update_decimation_label)
+        
         # Analysis button
         ttk.Button(analysis_frame, text="Run FFT Analysis", 
                 command=self.run_fft_analysis, style="Accent.TButton").pack(fill=tk.X, pady=(10, 0))
         
+        # Advanced analyses (opened in their own windows)
+        self.advanced_frame = ttk.LabelFrame(parent, text="Advanced Analysis", padding="10")
+        self.advanced_frame.pack(fill=tk.X, pady=(0, 10))
+        self.advanced_frame.columnconfigure((0, 1), weight=1)
+        
+        ttk.Button(self.advanced_frame, text="Offset Sweep...", 
+                command=self.open_sweep_dialog).grid(row=0, column=0, sticky=tk.EW, padx=(0, 2), pady=(0, 5))
+        ttk.Button(self.advanced_frame, text="Transfer Function...", 
+                command=self.open_transfer_dialog).grid(row=0, column=1, sticky=tk.EW, padx=(2, 0), pady=(0, 5))
+        ttk.Button(self.advanced_frame, text="Peak Tracking...", 
+                command=self.open_tracking_dialog).grid(row=1, column=0, sticky=tk.EW, padx=(0, 2), pady=(0, 5))
+        ttk.Button(self.advanced_frame, text="Octave Bands...", 
+                command=self.open_octave_dialog).grid(row=1, column=1, sticky=tk.EW, padx=(2, 0), pady=(0, 5))
+        ttk.Button(self.advanced_frame, text="Envelope...", 
+                command=self.open_envelope_dialog).grid(row=2, column=0, sticky=tk.EW, padx=(0, 2), pady=(0, 5))
+        ttk.Button(self.advanced_frame, text="Data Quality...", 
+                command=self.open_quality_dialog).grid(row=2, column=1, sticky=tk.EW, padx=(2, 0), pady=(0, 5))
+        ttk.Button(self.advanced_frame, text="Limit Mask...", 
+                command=self.open_limit_mask_dialog).grid(row=3, column=0, sticky=tk.EW, padx=(0, 2), pady=(0, 5))
+        ttk.Button(self.advanced_frame, text="Reports...", 
+                command=self.open_report_dialog).grid(row=3, column=1, sticky=tk.EW, padx=(2, 0), pady=(0, 5))
+        
         # Export section
         export_frame = ttk.LabelFrame(parent, text="Export", padding="10")
         export_frame.pack(fill=tk.X, pady=(0, 10))
@@ -179,6 +287,9 @@ class FFTAnalyzerApp:
                 command=self.export_data).pack(fill=tk.X, pady=(0, 5))
         ttk.Button(export_frame, text="Export Plot (PNG)", 
                 command=self.export_plot).pack(fill=tk.X, pady=(0, 5))
+        self.rasterize_export_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(export_frame, text="Rasterize traces in PDF/SVG", 
+                       variable=self.rasterize_export_var).pack(anchor=tk.W, pady=(0, 5))
         ttk.Button(export_frame, text="Save to Combined Results", 
                 command=self.save_to_results).pack(fill=tk.X)
     
@@ -214,6 +325,29 @@ class FFTAnalyzerApp:
         self.canvas.mpl_connect('motion_notify_event', self.on_hover)
         self.canvas.mpl_connect('axes_leave_event', self.on_leave)
         self.canvas.mpl_connect('button_press_event', self.on_click)
+        
+        # Time-domain preview of the selected column; drag to select the FFT range,
+        # scroll to zoom and shift+scroll to pan
+        self.preview_fig = Figure(figsize=(10, 1.6), dpi=100)
+        self.preview_ax = self.preview_fig.add_subplot(111)
+        self.preview_canvas = FigureCanvasTkAgg(self.preview_fig, parent)
+        self.preview_canvas.get_tk_widget().configure(height=160)
+        self.preview_canvas.get_tk_widget().pack(side=tk.BOTTOM, fill=tk.X)
+        
+        self.preview_line = self.preview_ax.plot([], [], color='steelblue', linewidth=0.8)[0]
+        self.preview_ax.set_xlabel('Row', fontsize=8)
+        self.preview_ax.tick_params(labelsize=8)
+        self.preview_ax.grid(True, alpha=0.3)
+        self.preview_fig.subplots_adjust(left=0.06, right=0.99, top=0.95, bottom=0.3)
+        
+        self.preview_pyramids = {}  # (file path, column) -> MinMaxPyramid
+        self.preview_pyramid = None
+        self.preview_column = None
+        self.preview_span = None
+        self.preview_selector = SpanSelector(self.preview_ax, self.on_preview_select, 'horizontal', 
+                                             useblit=True, minspan=2, 
+                                             props=dict(alpha=0.2, facecolor='orange'))
+        self.preview_canvas.mpl_connect('scroll_event', self.on_preview_scroll)
     
     def setup_settings_tab(self):
         settings_main = ttk.Frame(self.settings_frame)
@@ -254,7 +388,7 @@ class FFTAnalyzerApp:
         ttk.Label(threshold_frame, text="Threshold Mode:").pack(anchor=tk.W)
         self.threshold_mode_var = tk.StringVar(value=self.settings['peak_threshold_mode'])
         threshold_combo = ttk.Combobox(threshold_frame, textvariable=self.threshold_mode_var,
-                                     values=["relative", "absolute", "statistical"], 
+                                     values=["relative", "absolute", "statistical", "noise_floor"], 
                                      state="readonly", width=15)
         threshold_combo.pack(anchor=tk.W, pady=(5, 0))
         threshold_combo.bind('<<ComboboxSelected>>', self.on_threshold_mode_changed)
@@ -292,6 +426,29 @@ class FFTAnalyzerApp:
         self.stat_value_label.pack(anchor=tk.W)
         stat_scale.configure(command=self.update_statistical_label)
         
+        self.noise_floor_frame = ttk.Frame(peak_frame)
+        noise_label_frame = ttk.Frame(self.noise_floor_frame)
+        noise_label_frame.pack(fill=tk.X)
+        ttk.Label(noise_label_frame, text="Margin above local noise floor (dB):").pack(side=tk.LEFT)
+        self.noise_margin_var = tk.DoubleVar(value=self.settings['peak_noise_margin_db'])
+        noise_scale = ttk.Scale(self.noise_floor_frame, from_=1.0, to=40.0,
+                              variable=self.noise_margin_var, orient=tk.HORIZONTAL)
+        noise_scale.pack(fill=tk.X, pady=(5, 0))
+        self.noise_margin_label = ttk.Label(self.noise_floor_frame, text=f"{self.settings['peak_noise_margin_db']:.1f}")
+        self.noise_margin_label.pack(anchor=tk.W)
+        noise_scale.configure(command=self.update_noise_margin_label)
+        noise_window_frame = ttk.Frame(self.noise_floor_frame)
+        noise_window_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(noise_window_frame, text="Floor window (bins):").pack(side=tk.LEFT)
+        self.noise_window_var = tk.IntVar(value=self.settings['peak_noise_window'])
+        ttk.Spinbox(noise_window_frame, from_=5, to=10001, increment=10, width=7,
+                   textvariable=self.noise_window_var).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Label(noise_window_frame, text="Percentile:").pack(side=tk.LEFT, padx=(10, 0))
+        self.noise_percentile_var = tk.IntVar(value=self.settings['peak_noise_percentile'])
+        ttk.Spinbox(noise_window_frame, from_=1, to=99, width=5,
+                   textvariable=self.noise_percentile_var).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Label(noise_window_frame, text="(50 = median)").pack(side=tk.LEFT, padx=(10, 0))
+        
         # Minimum distance between peaks
         distance_frame = ttk.Frame(peak_frame)
         distance_frame.pack(fill=tk.X, pady=(10, 10))
@@ -324,6 +481,117 @@ class FFTAnalyzerApp:
         # Show appropriate threshold frame
         self.on_threshold_mode_changed()
         
+        # Data quality settings
+        quality_settings_frame = ttk.LabelFrame(scrollable_frame, text="Data Quality", padding="15")
+        quality_settings_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        self.quality_scan_var = tk.BooleanVar(value=self.settings['quality_scan'])
+        ttk.Checkbutton(quality_settings_frame, 
+                       text="Scan the selected range for clipping, flat-lines, spikes, gaps and drift before each analysis", 
+                       variable=self.quality_scan_var).pack(anchor=tk.W)
+        
+        # Multitaper settings
+        multitaper_settings_frame = ttk.LabelFrame(scrollable_frame, text="Multitaper Window", padding="15")
+        multitaper_settings_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        nw_frame = ttk.Frame(multitaper_settings_frame)
+        nw_frame.pack(fill=tk.X)
+        ttk.Label(nw_frame, text="Time-half-bandwidth NW:").pack(side=tk.LEFT)
+        self.multitaper_nw_var = tk.DoubleVar(value=self.settings['multitaper_nw'])
+        ttk.Spinbox(nw_frame, from_=1.0, to=20.0, increment=0.5, width=8,
+                   textvariable=self.multitaper_nw_var).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Label(nw_frame, text="Tapers (0 = 2NW - 1):").pack(side=tk.LEFT, padx=(20, 0))
+        self.multitaper_tapers_var = tk.IntVar(value=self.settings['multitaper_tapers'])
+        ttk.Spinbox(nw_frame, from_=0, to=40, width=6,
+                   textvariable=self.multitaper_tapers_var).pack(side=tk.LEFT, padx=(10, 0))
+        self.multitaper_adaptive_var = tk.BooleanVar(value=self.settings['multitaper_adaptive'])
+        ttk.Checkbutton(multitaper_settings_frame, text="Adaptive weighting of the tapers", 
+                       variable=self.multitaper_adaptive_var).pack(anchor=tk.W, pady=(10, 0))
+        ttk.Label(multitaper_settings_frame, 
+                 text="Used when the window function is 'multitaper': the range is transformed with several "
+                      "DPSS tapers at once and their spectra averaged, for a low-variance spectrum of short "
+                      "ranges at a resolution of about 2NW bins. Noise reads at the same level as with 'none'.", 
+                 foreground="gray", font=("TkDefaultFont", 8), wraplength=500).pack(anchor=tk.W, pady=(5, 0))
+        
+        # Memory budget settings
+        memory_settings_frame = ttk.LabelFrame(scrollable_frame, text="Memory Budget", padding="15")
+        memory_settings_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        budget_frame = ttk.Frame(memory_settings_frame)
+        budget_frame.pack(fill=tk.X)
+        ttk.Label(budget_frame, text="Memory budget per analysis (MB):").pack(side=tk.LEFT)
+        self.memory_budget_var = tk.IntVar(value=self.settings['memory_budget_mb'])
+        ttk.Entry(budget_frame, textvariable=self.memory_budget_var, width=10).pack(side=tk.LEFT, padx=(10, 0))
+        
+        strategy_frame = ttk.Frame(memory_settings_frame)
+        strategy_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Label(strategy_frame, text="Over budget:").pack(side=tk.LEFT)
+        self.memory_strategy_var = tk.StringVar(value=self.settings['memory_strategy'])
+        ttk.Combobox(strategy_frame, textvariable=self.memory_strategy_var, values=list(MEMORY_STRATEGIES),
+                    state="readonly", width=12).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Label(memory_settings_frame, 
+                 text="averaged: Welch average of segments that fit (full band, coarser resolution); "
+                      "decimated: chunked decimation (same resolution, narrower band); "
+                      "auto: decimated if a decimation factor is set, averaged otherwise", 
+                 foreground="gray", font=("TkDefaultFont", 8), wraplength=500).pack(anchor=tk.W, pady=(5, 0))
+        
+        # FFT backend settings
+        backend_settings_frame = ttk.LabelFrame(scrollable_frame, text="FFT Backend", padding="15")
+        backend_settings_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        backend_frame = ttk.Frame(backend_settings_frame)
+        backend_frame.pack(fill=tk.X)
+        ttk.Label(backend_frame, text="Backend:").pack(side=tk.LEFT)
+        self.fft_backend_var = tk.StringVar(value=self.settings['fft_backend'])
+        backends = [name for name in BACKEND_CHOICES if name == 'auto' or name in available_backends()]
+        ttk.Combobox(backend_frame, textvariable=self.fft_backend_var, values=backends,
+                    state="readonly", width=10).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(backend_frame, text="Re-tune", 
+                  command=self.retune_fft_backend).pack(side=tk.LEFT, padx=(10, 0))
+        missing = "" if 'pyfftw' in available_backends() else " (install pyFFTW to add it)"
+        ttk.Label(backend_settings_frame, 
+                 text=f"auto: lengths are grouped in power-of-two size classes; the available backends and worker "
+                      f"counts are benchmarked in the background for each new class and precision and the "
+                      f"fastest is used from then on{missing}", 
+                 foreground="gray", font=("TkDefaultFont", 8), wraplength=500).pack(anchor=tk.W, pady=(5, 0))
+        
+        # Spectrum cache settings
+        cache_settings_frame = ttk.LabelFrame(scrollable_frame, text="Spectrum Cache", padding="15")
+        cache_settings_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        self.spectrum_cache_var = tk.BooleanVar(value=self.settings['spectrum_cache'])
+        ttk.Checkbutton(cache_settings_frame, 
+                       text="Reuse spectra and peaks of previously analyzed ranges (same samples and parameters)", 
+                       variable=self.spectrum_cache_var).pack(anchor=tk.W)
+        
+        cache_dir_frame = ttk.Frame(cache_settings_frame)
+        cache_dir_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Label(cache_dir_frame, text="Directory:").pack(side=tk.LEFT)
+        self.spectrum_cache_dir_var = tk.StringVar(value=self.settings['spectrum_cache_dir'])
+        ttk.Entry(cache_dir_frame, textvariable=self.spectrum_cache_dir_var).pack(side=tk.LEFT, fill=tk.X, 
+                                                                                 expand=True, padx=(10, 0))
+        ttk.Button(cache_dir_frame, text="Browse", 
+                  command=self.select_spectrum_cache_dir).pack(side=tk.LEFT, padx=(10, 0))
+        
+        cache_size_frame = ttk.Frame(cache_settings_frame)
+        cache_size_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Label(cache_size_frame, text="Maximum size (MB):").pack(side=tk.LEFT)
+        self.spectrum_cache_mb_var = tk.IntVar(value=self.settings['spectrum_cache_mb'])
+        ttk.Entry(cache_size_frame, textvariable=self.spectrum_cache_mb_var, width=10).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(cache_size_frame, text="Clear Cache", 
+                  command=self.clear_spectrum_cache).pack(side=tk.LEFT, padx=(10, 0))
+        self.spectrum_cache_label = ttk.Label(cache_size_frame, text="", foreground="gray", 
+                                              font=("TkDefaultFont", 8))
+        self.spectrum_cache_label.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Time-domain preview settings
+        preview_settings_frame = ttk.LabelFrame(scrollable_frame, text="Time-Domain Preview", padding="15")
+        preview_settings_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        self.persist_pyramid_var = tk.BooleanVar(value=self.settings['persist_preview_pyramid'])
+        ttk.Checkbutton(preview_settings_frame, text="Save preview data next to data files (faster reopening)", 
+                       variable=self.persist_pyramid_var).pack(anchor=tk.W)
+        
         # Color settings
         color_frame = ttk.LabelFrame(scrollable_frame, text="Color Settings", padding="15")
         color_frame.pack(fill=tk.X, pady=(0, 15))
@@ -404,29 +672,61 @@ class FFTAnalyzerApp:
         list_frame = ttk.LabelFrame(results_left, text="Saved Results", padding="10")
         list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
-        # Treeview for results
-        self.results_tree = ttk.Treeview(list_frame, columns=('Select', 'Name', 'Date'), show='tree headings')
+        # Filters
+        filter_frame = ttk.Frame(list_frame)
+        filter_frame.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        ttk.Label(filter_frame, text="Filter:").grid(row=0, column=0, sticky=tk.W)
+        self.results_filter_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.results_filter_var).grid(
+            row=0, column=1, columnspan=3, sticky=tk.EW, padx=(5, 0))
+        ttk.Label(filter_frame, text="Column:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        self.results_column_filter_var = tk.StringVar(value=ALL)
+        self.results_column_filter = ttk.Combobox(filter_frame, textvariable=self.results_column_filter_var, 
+                                                  values=[ALL], state="readonly", width=12)
+        self.results_column_filter.grid(row=1, column=1, sticky=tk.EW, padx=(5, 5), pady=(5, 0))
+        ttk.Label(filter_frame, text="Window:").grid(row=1, column=2, sticky=tk.W, pady=(5, 0))
+        self.results_window_filter_var = tk.StringVar(value=ALL)
+        self.results_window_filter = ttk.Combobox(filter_frame, textvariable=self.results_window_filter_var, 
+                                                  values=[ALL], state="readonly", width=10)
+        self.results_window_filter.grid(row=1, column=3, sticky=tk.EW, padx=(5, 0), pady=(5, 0))
+        filter_frame.columnconfigure(1, weight=1)
+        filter_frame.columnconfigure(3, weight=1)
+        
+        for var in (self.results_filter_var, self.results_column_filter_var, self.results_window_filter_var):
+            var.trace_add('write', lambda *args: self.apply_results_filter())
+        
+        # Treeview for results. Only the rows that fit on screen exist as
+        # items; scrolling moves the window over self.results_model.view
+        self.results_model = ResultsModel()
+        self.results_offset = 0
+        self.results_tree = ttk.Treeview(list_frame, columns=('Select', 'Name', 'Column', 'Window', 'Date'), 
+                                         show='tree headings')
         self.results_tree.heading('Select', text='☐')
-        self.results_tree.heading('#0', text='ID')
-        self.results_tree.heading('Name', text='analysis Name')
-        self.results_tree.heading('Date', text='Date')
+        self.results_tree.heading('#0', text='ID', command=lambda: self.sort_results('id'))
+        self.results_tree.heading('Name', text='analysis Name', command=lambda: self.sort_results('name'))
+        self.results_tree.heading('Column', text='Column', command=lambda: self.sort_results('column'))
+        self.results_tree.heading('Window', text='Window', command=lambda: self.sort_results('window'))
+        self.results_tree.heading('Date', text='Date', command=lambda: self.sort_results('date'))
         
         self.results_tree.column('Select', width=30, anchor='center')
         self.results_tree.column('#0', width=50)
         self.results_tree.column('Name', width=150)
+        self.results_tree.column('Column', width=80)
+        self.results_tree.column('Window', width=70)
         self.results_tree.column('Date', width=100)
         
-        results_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
-        self.results_tree.configure(yscrollcommand=results_scrollbar.set)
+        self.results_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.scroll_results)
         
         self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Bind click event for checkbox functionality
         self.results_tree.bind('<Button-1>', self.on_treeview_click)
-        
-        # Store checkbox states
-        self.checkbox_states = {}
+        self.results_tree.bind('<Configure>', lambda event: self.render_results())
+        self.results_tree.bind('<MouseWheel>', 
+                               lambda event: self.scroll_results('scroll', -1 if event.delta > 0 else 1, 'units'))
+        self.results_tree.bind('<Button-4>', lambda event: self.scroll_results('scroll', -1, 'units'))
+        self.results_tree.bind('<Button-5>', lambda event: self.scroll_results('scroll', 1, 'units'))
         
         # Control buttons
         controls_frame = ttk.Frame(results_left)
@@ -441,7 +741,11 @@ class FFTAnalyzerApp:
         ttk.Button(controls_frame, text="Clear All", 
                 command=self.clear_all_results).pack(fill=tk.X, pady=(0, 5))
         ttk.Button(controls_frame, text="Export Combined Plot", 
-                command=self.export_combined_plot).pack(fill=tk.X)
+                command=self.export_combined_plot).pack(fill=tk.X, pady=(0, 5))
+        ttk.Button(controls_frame, text="Export Summaries...", 
+                command=self.export_summaries).pack(fill=tk.X, pady=(0, 5))
+        ttk.Button(controls_frame, text="Import Summaries...", 
+                command=self.import_summaries).pack(fill=tk.X)
         
         # Combined plot
         self.combined_fig = Figure(figsize=(10, 6), dpi=100)
@@ -465,6 +769,7 @@ class FFTAnalyzerApp:
         self.combined_hover_annotation = None
         self.combined_hover_line = None
         self.combined_data = {}  # Store combined plot data
+        self.combined_lines = {}  # One line artist per saved result, kept between redraws
         self.combined_permanent_annotations = []  # For click-to-hold annotations
         
         # Connect hover events for combined plot
@@ -472,17 +777,165 @@ class FFTAnalyzerApp:
         self.combined_canvas.mpl_connect('axes_leave_event', self.on_combined_leave)
         self.combined_canvas.mpl_connect('button_press_event', self.on_combined_click)
     
+    def setup_index_tab(self):
+        index_paned = ttk.PanedWindow(self.index_frame, orient=tk.HORIZONTAL)
+        index_paned.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        index_left = ttk.Frame(index_paned)
+        index_paned.add(index_left, weight=1)
+        
+        index_right = ttk.Frame(index_paned)
+        index_paned.add(index_right, weight=3)
+        
+        # Database selection and indexing
+        db_frame = ttk.LabelFrame(index_left, text="Index Database", padding="10")
+        db_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.index_db_var = tk.StringVar(value=self.settings['index_db_path'])
+        ttk.Entry(db_frame, textvariable=self.index_db_var).pack(fill=tk.X, pady=(0, 5))
+        ttk.Button(db_frame, text="Choose Database", 
+                command=self.select_index_db).pack(fill=tk.X, pady=(0, 5))
+        ttk.Button(db_frame, text="Index Files...", 
+                command=self.index_files_dialog).pack(fill=tk.X)
+        ttk.Label(db_frame, text="Uses the acquisition frequency, window and\npeak detection settings currently selected.", 
+                 font=("TkDefaultFont", 8)).pack(anchor=tk.W, pady=(5, 0))
+        
+        self.index_status = ttk.Label(db_frame, text="", foreground="blue", font=("TkDefaultFont", 8))
+        self.index_status.pack(anchor=tk.W, pady=(5, 0))
+        
+        # Query controls
+        query_frame = ttk.LabelFrame(index_left, text="Peak Query", padding="10")
+        query_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.query_fmin_var = tk.StringVar(value="0")
+        self.query_fmax_var = tk.StringVar(value="500")
+        self.query_amin_var = tk.StringVar()
+        self.query_amax_var = tk.StringVar()
+        self.query_column_var = tk.StringVar()
+        
+        for label, var in [("Min Frequency (Hz):", self.query_fmin_var),
+                           ("Max Frequency (Hz):", self.query_fmax_var),
+                           ("Min Amplitude (optional):", self.query_amin_var),
+                           ("Max Amplitude (optional):", self.query_amax_var),
+                           ("Column (optional):", self.query_column_var)]:
+            ttk.Label(query_frame, text=label).pack(anchor=tk.W)
+            ttk.Entry(query_frame, textvariable=var).pack(fill=tk.X, pady=(5, 10))
+        
+        ttk.Button(query_frame, text="Run Query", 
+                command=self.run_index_query, style="Accent.TButton").pack(fill=tk.X, pady=(10, 0))
+        
+        # Query results
+        results_list_frame = ttk.LabelFrame(index_right, text="Matching Peaks", padding="10")
+        results_list_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.query_tree = ttk.Treeview(results_list_frame, columns=('File', 'Column', 'Rank', 'Frequency', 'Amplitude'), 
+                                      show='headings')
+        for col, width in [('File', 300), ('Column', 120), ('Rank', 50), ('Frequency', 100), ('Amplitude', 100)]:
+            self.query_tree.heading(col, text=col)
+            self.query_tree.column(col, width=width)
+        
+        query_scrollbar = ttk.Scrollbar(results_list_frame, orient=tk.VERTICAL, command=self.query_tree.yview)
+        self.query_tree.configure(yscrollcommand=query_scrollbar.set)
+        
+        self.query_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        query_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    
+    def select_index_db(self):
+        """Choose the SQLite database used for the spectral index"""
+        db_path = filedialog.asksaveasfilename(
+            title="Select Index Database",
+            defaultextension=".db",
+            confirmoverwrite=False,
+            filetypes=[("SQLite databases", "*.db"), ("All files", "*.*")]
+        )
+        if db_path:
+            self.index_db_var.set(db_path)
+    
+    def index_files_dialog(self):
+        """Analyze a set of files and store their peaks in the spectral index"""
+        file_paths = filedialog.askopenfilenames(
+            title="Select files to index",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not file_paths:
+            return
+        
+        def show_progress(done, total, path):
+            self.index_status.configure(text=f"Indexed {done}/{total}: {os.path.basename(path)}")
+            self.root.update_idletasks()
+        
+        try:
+            with SpectralIndex(self.index_db_var.get()) as index:
+                results = index.index_files(file_paths, self.freq_var.get(), self.window_var.get(),
+                                            self.get_peak_params(), progress=show_progress, 
+                                            multitaper=self.get_multitaper_params())
+                stats = index.stats()
+            
+            failed = [(path, result) for path, result in results if isinstance(result, Exception)]
+            message = (f"Indexed {len(results) - len(failed)} of {len(results)} files.\n"
+                       f"Database now holds {stats['files']} files, {stats['analyses']} columns, {stats['peaks']} peaks.")
+            if failed:
+                message += "\n\nFailed:\n" + "\n".join(f"{os.path.basename(path)}: {e}" for path, e in failed[:10])
+                messagebox.showwarning("Indexing Finished", message)
+            else:
+                messagebox.showinfo("Success", message)
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Indexing failed:\n{str(e)}")
+    
+    def run_index_query(self):
+        """Query the spectral index for peaks in the requested range"""
+        try:
+            freq_min = float(self.query_fmin_var.get())
+            freq_max = float(self.query_fmax_var.get())
+            amp_min = float(self.query_amin_var.get()) if self.query_amin_var.get().strip() else None
+            amp_max = float(self.query_amax_var.get()) if self.query_amax_var.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Error", "Query limits must be numeric values.")
+            return
+        
+        try:
+            with SpectralIndex(self.index_db_var.get()) as index:
+                rows = index.query_peaks(freq_min, freq_max, amp_min, amp_max,
+                                         self.query_column_var.get().strip() or None)
+            
+            self.query_tree.delete(*self.query_tree.get_children())
+            for row in rows:
+                self.query_tree.insert('', 'end', values=(row['path'], row['column_name'], row['rank'],
+                                                          f"{row['frequency']:.2f}", f"{row['amplitude']:.3e}"))
+            self.index_status.configure(text=f"{len(rows)} matching peaks")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Query failed:\n{str(e)}")
+    
     def select_file(self):
         file_path = filedialog.askopenfilename(
-            title="Select CSV file",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            title="Select data file",
+            filetypes=[("Data files", "*.csv *.wav *.bin *.raw *.dat"), ("CSV files", "*.csv"), 
+                       ("WAV files", "*.wav"), ("Raw binary files", "*.bin *.raw *.dat"), ("All files", "*.*")]
         )
         
         if file_path:
             try:
-                self.df = pd.read_csv(file_path)
+                # Raw binary files need a descriptor of their sample layout
+                descriptor = None
+                if is_binary_file(file_path) and read_descriptor(file_path) is None:
+                    descriptor = self.ask_binary_descriptor(file_path)
+                    if descriptor is None:
+                        return
+                
+                self.df = load_table(file_path, descriptor, dtype=self.precision_var.get())
                 self.file_path.set(file_path)
                 
+                # Binary and WAV files carry their own sample rate, CSV files may have a time column
+                if getattr(self.df, 'sample_rate', None):
+                    self.freq_var.set(self.df.sample_rate)
+                    self.time_column = None
+                    self.timebase_label.configure(text=f"Sample rate from file: {self.df.sample_rate:.6g} Hz", 
+                                                  foreground="blue")
+                else:
+                    self.detect_time_base()
+                
                 # Update column combo
                 columns = list(self.df.columns)
                 self.column_combo['values'] = columns
@@ -505,16 +958,102 @@ class FFTAnalyzerApp:
                 
                 # Update range info
                 self.update_range_info()
+                self.build_preview()
                 
                 messagebox.showinfo("Success", f"File loaded successfully!\nRows: {len(self.df)}\nColumns: {len(self.df.columns)}")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
     
+    def detect_time_base(self):
+        """Detect the sample rate, jitter and gaps from the time column"""
+        self.time_column = find_time_column(self.df)
+        if self.time_column is None:
+            self.timebase_label.configure(text="")
+            return
+        
+        try:
+            info = analyze_time_base(self.df[self.time_column].values)
+        except (ValueError, TypeError) as e:
+            self.time_column = None
+            self.timebase_label.configure(text=f"Time column not usable: {e}", foreground="orange")
+            return
+        
+        self.freq_var.set(round(info['sample_rate'], 6))
+        self.timebase_label.configure(
+            text=f"Detected from '{self.time_column}': {describe_time_base(info)}",
+            foreground="blue" if info['is_uniform'] else "orange"
+        )
+    
+    def ask_binary_descriptor(self, file_path):
+        """Ask for the sample layout of a raw binary file and save it as a sidecar"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Raw Binary Format")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        frame = ttk.Frame(dialog, padding="15")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(frame, text=os.path.basename(file_path), font=("TkDefaultFont", 9, "bold")).grid(
+            row=0, column=0, columnspan=2, sticky=tk.W, pady=(0, 10))
+        
+        dtype_var = tk.StringVar(value=DEFAULT_DESCRIPTOR['dtype'])
+        channels_var = tk.IntVar(value=DEFAULT_DESCRIPTOR['channels'])
+        rate_var = tk.DoubleVar(value=self.freq_var.get())
+        scale_var = tk.DoubleVar(value=DEFAULT_DESCRIPTOR['scale'])
+        header_var = tk.IntVar(value=DEFAULT_DESCRIPTOR['header_bytes'])
+        
+        ttk.Label(frame, text="Sample type:").grid(row=1, column=0, sticky=tk.W, pady=2)
+        ttk.Combobox(frame, textvariable=dtype_var, values=list(BINARY_DTYPES), 
+                    state="readonly", width=12).grid(row=1, column=1, sticky=tk.W, pady=2)
+        ttk.Label(frame, text="Channels (interleaved):").grid(row=2, column=0, sticky=tk.W, pady=2)
+        ttk.Spinbox(frame, from_=1, to=256, textvariable=channels_var, width=10).grid(row=2, column=1, sticky=tk.W, pady=2)
+        ttk.Label(frame, text="Sample rate (Hz):").grid(row=3, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(frame, textvariable=rate_var, width=12).grid(row=3, column=1, sticky=tk.W, pady=2)
+        ttk.Label(frame, text="Scale factor:").grid(row=4, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(frame, textvariable=scale_var, width=12).grid(row=4, column=1, sticky=tk.W, pady=2)
+        ttk.Label(frame, text="Header bytes:").grid(row=5, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(frame, textvariable=header_var, width=12).grid(row=5, column=1, sticky=tk.W, pady=2)
+        
+        result = {}
+        
+        def accept():
+            try:
+                result.update({
+                    'dtype': dtype_var.get(),
+                    'channels': channels_var.get(),
+                    'sample_rate': rate_var.get(),
+                    'scale': scale_var.get(),
+                    'header_bytes': header_var.get()
+                })
+            except tk.TclError:
+                messagebox.showerror("Error", "Please enter numeric values.", parent=dialog)
+                return
+            dialog.destroy()
+        
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=6, column=0, columnspan=2, pady=(15, 0))
+        ttk.Button(buttons, text="OK", command=accept).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+        
+        self.root.wait_window(dialog)
+        
+        if not result:
+            return None
+        
+        # Remember the layout next to the file for the next time it is opened
+        try:
+            write_descriptor(file_path, result)
+        except OSError:
+            pass
+        return result
+    
     def on_column_selected(self, event=None):
         selected_column = self.column_var.get()
         if selected_column:
             self.column_name.set(selected_column)
+            self.build_preview()
     
     def update_start_label(self, value):
         start_val = int(float(value))
@@ -526,6 +1065,18 @@ class FFTAnalyzerApp:
         self.lines_label.configure(text=str(lines_val))
         self.update_range_info()
     
+    def update_decimation_label(self, *args):
+        """Show the analysis bandwidth left after decimation"""
+        try:
+            factor = self.decimation_var.get()
+            freq_hz = self.freq_var.get()
+        except tk.TclError:
+            return
+        if factor <= 1:
+            self.decimation_label.configure(text="(1 = off)")
+        else:
+            self.decimation_label.configure(text=f"(0-{freq_hz / factor / 2:.4g} Hz)")
+    
     def update_range_info(self):
         """Update the range information display"""
         start = self.start_line_var.get()
@@ -552,6 +1103,118 @@ class FFTAnalyzerApp:
                 text=f"Range: Row {start} to {end} ({lines} points)",
                 foreground="blue"
             )
+        self.update_preview_selection()
+    
+    def build_preview(self):
+        """Show the selected column in the time-domain preview, building its min/max pyramid once"""
+        column = self.column_var.get()
+        if self.df is None or not column:
+            return
+        
+        file_path = self.file_path.get()
+        key = (file_path, column)
+        pyramid = self.preview_pyramids.get(key)
+        try:
+            if pyramid is None:
+                persist = self.persist_pyramid_var.get() and os.path.exists(file_path)
+                if persist:
+                    signature = file_signature(file_path, column)
+                    pyramid = MinMaxPyramid.load(pyramid_path(file_path, column), signature)
+                if pyramid is None:
+                    pyramid = MinMaxPyramid.build(lambda start, end: read_column(self.df, column, start, end), 
+                                                  len(self.df))
+                    if persist:
+                        try:
+                            pyramid.save(pyramid_path(file_path, column), signature)
+                        except OSError:
+                            pass  # Read-only data directory; the pyramid is simply rebuilt next time
+                self.preview_pyramids[key] = pyramid
+        except (ValueError, TypeError):
+            # Non-numeric column
+            self.preview_pyramid = None
+            self.preview_line.set_data([], [])
+            self.preview_canvas.draw_idle()
+            return
+        
+        self.preview_pyramid = pyramid
+        self.preview_column = column
+        self.preview_ax.set_xlim(1, max(pyramid.n_samples, 2))
+        self.refresh_preview()
+        self.update_preview_selection()
+    
+    def refresh_preview(self):
+        """Redraw the preview trace for the current view at screen resolution"""
+        pyramid = self.preview_pyramid
+        if pyramid is None:
+            return
+        x_min, x_max = self.preview_ax.get_xlim()
+        n_pixels = max(int(self.preview_ax.bbox.width), 100)
+        envelope = pyramid.query(x_min - 1, x_max, n_pixels)
+        if envelope is None:
+            # Few enough rows to draw the samples themselves
+            start = max(int(x_min) - 1, 0)
+            end = min(int(np.ceil(x_max)) + 1, pyramid.n_samples)
+            x = np.arange(start, end)
+            y = np.asarray(read_column(self.df, self.preview_column, start, end), dtype=float)
+        else:
+            x, y = envelope
+        self.preview_line.set_data(x + 1, y)  # Rows are numbered from 1
+        
+        finite = y[np.isfinite(y)]
+        if len(finite):
+            low, high = finite.min(), finite.max()
+            margin = (high - low) * 0.05 or 1.0
+            self.preview_ax.set_ylim(low - margin, high + margin)
+        self.preview_canvas.draw_idle()
+    
+    def on_preview_scroll(self, event):
+        """Zoom the preview around the cursor, or pan it with shift held"""
+        if event.inaxes != self.preview_ax or self.preview_pyramid is None:
+            return
+        x_min, x_max = self.preview_ax.get_xlim()
+        width = x_max - x_min
+        if event.key == 'shift':
+            shift = -0.2 * width if event.button == 'up' else 0.2 * width
+            x_min, x_max = x_min + shift, x_max + shift
+        else:
+            scale = 0.8 if event.button == 'up' else 1.25
+            x_min = event.xdata - (event.xdata - x_min) * scale
+            x_max = event.xdata + (x_max - event.xdata) * scale
+        
+        # Keep the view inside the data and at least a few rows wide
+        n_rows = self.preview_pyramid.n_samples
+        width = min(max(x_max - x_min, 10), n_rows)
+        x_min = min(max(x_min, 1), max(n_rows - width, 1))
+        self.preview_ax.set_xlim(x_min, x_min + width)
+        self.refresh_preview()
+    
+    def on_preview_select(self, x_min, x_max):
+        """Use the rows dragged over in the preview as the FFT range"""
+        if self.preview_pyramid is None:
+            return
+        n_rows = self.preview_pyramid.n_samples
+        start = min(max(int(round(x_min)), 1), n_rows)
+        lines = min(max(int(round(x_max - x_min)), 2), n_rows - start + 1)
+        # The slider cannot show more lines than its maximum
+        lines = min(lines, int(float(self.lines_scale.cget('to'))))
+        self.start_line_var.set(start)
+        self.lines_var.set(lines)
+        self.start_label.configure(text=str(start))
+        self.lines_label.configure(text=str(lines))
+        self.update_range_info()
+    
+    def update_preview_selection(self):
+        """Highlight the current FFT range in the preview"""
+        if not hasattr(self, 'preview_ax'):
+            return
+        if self.preview_span is not None:
+            self.preview_span.remove()
+            self.preview_span = None
+        if self.preview_pyramid is not None:
+            start = self.start_line_var.get()
+            end = min(start + self.lines_var.get(), self.preview_pyramid.n_samples + 1)
+            self.preview_span = self.preview_ax.axvspan(start, end, color='orange', alpha=0.15)
+        self.preview_canvas.draw_idle()
     
     def on_hover(self, event):
         """Handle mouse hover over the plot"""
@@ -1024,7 +1687,7 @@ class FFTAnalyzerApp:
     
     def run_fft_analysis(self):
         if self.df is None:
-            messagebox.showerror("Error", "Please select a CSV file first.")
+            messagebox.showerror("Error", "Please select a data file first.")
             return
         
         if not self.column_var.get():
@@ -1038,6 +1701,7 @@ class FFTAnalyzerApp:
             n_lines = self.lines_var.get()
             freq_hz = self.freq_var.get()
             window_func = self.window_var.get()
+            multitaper = self.get_multitaper_params() if window_func == MULTITAPER else None
             
             # Calculate actual indices (convert from 1-based to 0-based indexing)
             start_idx = start_line - 1  # Convert to 0-based index
@@ -1055,30 +1719,36 @@ class FFTAnalyzerApp:
                 actual_lines = end_idx - start_idx
                 messagebox.showwarning("Warning", f"Requested range exceeds data size. Using {actual_lines} lines instead of {n_lines}.")
             
-            # Extract data from the specified range
-            data = self.df[column].iloc[start_idx:end_idx].values
-            data = data[~np.isnan(data)]  # Remove NaN values
+            # Estimate the working set before reading anything and stay within the memory budget
+            precision = self.precision_var.get()
+            plan = plan_analysis(end_idx - start_idx, np.dtype(precision).itemsize,
+                                 self.memory_budget_var.get() * 1024 * 1024, self.memory_strategy_var.get(),
+                                 self.decimation_var.get(), self.quality_scan_var.get(), 
+                                 fft_copies(window_func, multitaper))
             
-            if len(data) == 0:
-                messagebox.showerror("Error", "No valid data found in selected range.")
-                return
-            
-            # Apply window function
-            if window_func == "blackman":
-                window = blackman(len(data))
-                data = data * window
-            elif window_func == "hann":
-                window = hann(len(data))
-                data = data * window
-            elif window_func == "hamming":
-                window = hamming(len(data))
-                data = data * window
-            
-            # Perform FFT
-            yf = fft(data)
-            T = 1.0 / freq_hz
-            xf = fftfreq(len(data), T)[:len(data)//2]
-            amplitude = 2.0/len(data) * np.abs(yf[:len(data)//2])
+            # Reuse a cached result of the same samples and parameters
+            cache_key = cached = None
+            if self.spectrum_cache_var.get():
+                cache_key = self.spectrum_cache_key(column, start_idx, end_idx, freq_hz, window_func, plan, 
+                                                    multitaper)
+                cached = self.spectrum_cache.get(cache_key)
+            if cached is not None:
+                arrays, result = cached
+                result.update(frequencies=arrays['frequencies'], amplitudes=arrays['amplitudes'], cached=True)
+            else:
+                result = self.compute_range_spectrum(column, start_idx, end_idx, freq_hz, window_func, plan, 
+                                                     multitaper)
+                if cache_key is not None:
+                    meta = {name: value for name, value in result.items() 
+                            if name not in ('frequencies', 'amplitudes')}
+                    self.spectrum_cache.put(cache_key, {'frequencies': result['frequencies'], 
+                                                        'amplitudes': result['amplitudes']}, meta)
+            xf, amplitude = result['frequencies'], result['amplitudes']
+            n_points = result['n_points']
+            decimation = result['decimation']
+            freq_hz = result['freq_hz']
+            spectrum_mode = result['spectrum_mode']
+            quality = {'issues': result['quality_issues']} if result['quality_issues'] is not None else None
             
             # Plot results
             self.ax.clear()
@@ -1090,17 +1760,18 @@ class FFTAnalyzerApp:
             
             # Customize plot
             display_name = self.column_name.get() or column
-            range_text = f"Rows {start_line}-{start_idx + len(data)}"
+            range_text = f"Rows {start_line}-{start_idx + n_points}"
             self.ax.set_xlabel('Frequency (Hz)')
             self.ax.set_ylabel('Amplitude')
             self.ax.set_title(f'FFT Analysis: {display_name} ({range_text})')
             self.ax.grid(True, alpha=0.3)
             
+            # Peaks feed both the labels and the archived summary
+            peaks_idx = self.cached_peaks(cache_key, amplitude, xf)
+            
             # Add frequency labels if enabled
             peak_count = self.peak_count_var.get()
             if peak_count > 0:
-                peaks_idx = self.detect_peaks_advanced(amplitude, xf)
-                
                 # Sort peaks by amplitude (highest first) and take the requested number
                 if peaks_idx:
                     peaks_with_amplitude = [(idx, amplitude[idx]) for idx in peaks_idx if idx < len(xf)]
@@ -1119,6 +1790,12 @@ class FFTAnalyzerApp:
                                        arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0.1'),
                                        fontsize=8)
             
+            # Check against the active limit mask
+            limit_check = None
+            self.limit_mask_artists = []
+            if self.limit_mask is not None:
+                limit_check = self.draw_limit_mask(xf, amplitude)
+            
             self.fig.tight_layout()
             self.canvas.draw()
             
@@ -1130,19 +1807,1151 @@ class FFTAnalyzerApp:
                 'display_name': display_name,
                 'analysis_name': self.analysis_name.get(),
                 'freq_hz': freq_hz,
+                'decimation': decimation,
+                'effective_freq_hz': freq_hz / decimation,
                 'start_line': start_line,
-                'n_lines': len(data),  # Actual number of lines used
+                'n_lines': n_points,  # Actual number of lines used
                 'range_text': range_text,
                 'window_func': window_func,
+                'spectrum_mode': spectrum_mode,
+                'strategy': plan['strategy'],
+                'quality': describe_quality(quality) if quality else None,
+                'limit_check': self.describe_limit_check(limit_check) if limit_check else None,
                 'color': color,
                 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
+            if len(xf) >= 3:
+                self.current_fft_data['summary'] = summarize_spectrum(xf, amplitude, peaks_idx, {
+                    'analysis_name': self.current_fft_data['analysis_name'],
+                    'display_name': display_name,
+                    'column': column,
+                    'source_file': os.path.basename(self.file_path.get()),
+                    'window_func': window_func,
+                    'freq_hz': freq_hz / decimation,
+                    'start_line': start_line,
+                    'n_lines': n_points,
+                    'timestamp': self.current_fft_data['timestamp']
+                })
             
-            messagebox.showinfo("Success", f"FFT analysis completed successfully!\nAnalyzed {len(data)} data points from {range_text}")
+            message = f"FFT analysis completed successfully!\nAnalyzed {n_points} data points from {range_text}"
+            if result['detail']:
+                message += f"\n{result['detail']}"
+            if result.get('cached'):
+                message += "\nLoaded from the spectrum cache"
+            if spectrum_mode == "non-uniform":
+                message += f"\nIrregular sampling: used the non-uniform (Lomb-Scargle) spectrum from '{self.time_column}'"
+            if limit_check:
+                message += f"\n{self.current_fft_data['limit_check']}"
+            if plan['reason']:
+                message += f"\n\n{plan['reason']}"
+            if quality and quality['issues']:
+                message += "\n\nData quality warnings:\n- " + "\n- ".join(quality['issues'])
+                messagebox.showwarning("Analysis completed with warnings", message)
+            elif limit_check and not limit_check['passed']:
+                messagebox.showwarning("Analysis completed: limit exceeded", message)
+            elif plan['strategy'] != 'full':
+                messagebox.showwarning("Analysis adapted to the memory budget", message)
+            else:
+                messagebox.showinfo("Success", message)
             
         except Exception as e:
             messagebox.showerror("Error", f"FFT analysis failed:\n{str(e)}")
     
+    def compute_range_spectrum(self, column, start_idx, end_idx, freq_hz, window_func, plan, multitaper=None):
+        """Spectrum of rows [start_idx, end_idx) of a column following the memory plan
+        
+        Returns a dictionary with the frequencies and amplitudes, the number
+        of samples used, the decimation and effective sample rate, the
+        spectrum mode, the quality issues (None when not scanned) and a
+        line describing any decimation or chunking.
+        """
+        precision = self.precision_var.get()
+        quality = None
+        detail = ""
+        
+        if plan['strategy'] == 'full':
+            # Extract data from the specified range
+            data = read_column(self.df, column, start_idx, end_idx).astype(precision)
+            
+            # Check the raw range (missing values included) before trusting it
+            if plan['quality_scan']:
+                quality = scan_quality(data, start_row=start_idx + 1, full_scale=getattr(self.df, 'full_scale', None))
+            
+            # Irregular or gappy ranges keep their time stamps for the non-uniform spectrum
+            times = None
+            spectrum_mode = self.spectrum_mode_var.get()
+            if self.time_column is not None and column != self.time_column and spectrum_mode != "uniform":
+                times = read_column(self.df, self.time_column, start_idx, end_idx).astype(float)
+                if spectrum_mode == "auto" and not has_irregular_sampling(times, data):
+                    times = None
+            
+            valid = ~np.isnan(data)  # Remove NaN values
+            if times is not None:
+                valid &= ~np.isnan(times)
+                times = times[valid]
+            data = data[valid]
+            
+            if len(data) == 0:
+                raise ValueError("No valid data found in selected range.")
+            
+            n_points = len(data)  # Samples used, before any decimation
+            decimation = 1
+            
+            # Perform FFT
+            if times is not None:
+                xf, amplitude = compute_nonuniform_spectrum(times, data, window_func)
+                freq_hz = 1.0 / np.median(np.diff(times))  # Effective rate of the range
+                spectrum_mode = "non-uniform"
+                if self.decimation_var.get() > 1:
+                    detail = "Decimation not applied: irregularly sampled ranges use the non-uniform spectrum"
+            else:
+                # Optional anti-aliased decimation ahead of the FFT
+                decimation = max(self.decimation_var.get(), 1)
+                if decimation > 1:
+                    data = decimate(data, decimation)
+                    detail = f"Decimated by {decimation} to {freq_hz / decimation:.6g} Hz ({len(data)} points)"
+                xf, amplitude = compute_spectrum(data, freq_hz / decimation, window_func, multitaper)
+                spectrum_mode = "uniform"
+        else:
+            # Chunked: only a bounded part of the range is in memory at any time
+            read = lambda start, end: read_column(self.df, column, start_idx + start, start_idx + end)
+            xf, amplitude, n_points, chunking = run_plan(plan, read, end_idx - start_idx, freq_hz, 
+                                                         window_func, precision, multitaper)
+            decimation = plan['decimation']
+            spectrum_mode = "uniform"
+            detail = f"Memory budget: {chunking}"
+        
+        return {
+            'frequencies': xf,
+            'amplitudes': amplitude,
+            'n_points': n_points,
+            'decimation': decimation,
+            'freq_hz': freq_hz,
+            'spectrum_mode': spectrum_mode,
+            'quality_issues': quality['issues'] if quality else None,
+            'detail': detail
+        }
+    
+    def spectrum_cache_key(self, column, start_idx, end_idx, freq_hz, window_func, plan, multitaper=None):
+        """Cache key of an analysis: the hashed samples plus every parameter that shapes the result"""
+        digest = digest_rows(lambda start, end: read_column(self.df, column, start_idx + start, start_idx + end),
+                             end_idx - start_idx)
+        spectrum_mode = self.spectrum_mode_var.get()
+        uses_times = self.time_column is not None and column != self.time_column and spectrum_mode != "uniform"
+        if uses_times:
+            digest = digest_rows(lambda start, end: read_column(self.df, self.time_column, 
+                                                                start_idx + start, start_idx + end),
+                                 end_idx - start_idx, digest)
+        return cache_key(digest, {
+            'column': column,
+            'rows': [start_idx + 1, end_idx],
+            'window': window_func,
+            'fs': freq_hz,
+            'backend': self.fft_backend_var.get(),
+            'precision': self.precision_var.get(),
+            'decimation': max(self.decimation_var.get(), 1),
+            'spectrum_mode': spectrum_mode if uses_times else "uniform",
+            'plan': [plan['strategy'], plan['decimation'], plan['segment_length'], plan['quality_scan']],
+            'multitaper': multitaper
+        })
+    
+    def cached_peaks(self, spectrum_key, amplitude, frequencies):
+        """Peaks of the spectrum, from the cache when the spectrum and peak settings were seen before"""
+        if spectrum_key is None:
+            return self.detect_peaks_advanced(amplitude, frequencies)
+        key = cache_key(hashlib.sha1(spectrum_key.encode('ascii')), self.get_peak_params())
+        cached = self.spectrum_cache.get(key)
+        if cached is not None:
+            return cached[0]['peaks'].tolist()
+        peaks_idx = self.detect_peaks_advanced(amplitude, frequencies)
+        self.spectrum_cache.put(key, {'peaks': np.asarray(peaks_idx, dtype=np.int64)})
+        return peaks_idx
+    
+    def get_selected_column_data(self):
+        """Return the whole selected column, missing samples included, or None after reporting why"""
+        if self.df is None:
+            messagebox.showerror("Error", "Please select a data file first.")
+            return None
+        
+        if not self.column_var.get():
+            messagebox.showerror("Error", "Please select a column to analyze.")
+            return None
+        
+        return read_column(self.df, self.column_var.get()).astype(float)
+    
+    def open_sweep_dialog(self):
+        """Configure and run the analysis over many start offsets, lengths and windows"""
+        data = self.get_selected_column_data()
+        if data is None:
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"Offset Sweep - {self.column_var.get()}")
+        dialog.geometry("1100x750")
+        
+        controls = ttk.Frame(dialog, padding="10")
+        controls.pack(side=tk.LEFT, fill=tk.Y)
+        
+        n_lines = max(self.lines_var.get(), 2)
+        first_var = tk.IntVar(value=self.start_line_var.get())
+        last_var = tk.IntVar(value=max(len(data) - n_lines + 1, 1))
+        step_var = tk.IntVar(value=max(n_lines // 2, 1))
+        lengths_var = tk.StringVar(value=str(n_lines))
+        workers_var = tk.IntVar(value=os.cpu_count() or 1)
+        window_vars = {name: tk.BooleanVar(value=(name == self.window_var.get())) 
+                       for name in WINDOW_CHOICES}
+        
+        for label, var in [("First start line:", first_var), ("Last start line:", last_var), 
+                           ("Start step (lines):", step_var), ("Lengths (comma separated):", lengths_var),
+                           ("Worker processes:", workers_var)]:
+            ttk.Label(controls, text=label).pack(anchor=tk.W)
+            ttk.Entry(controls, textvariable=var, width=20).pack(fill=tk.X, pady=(5, 10))
+        
+        ttk.Label(controls, text="Windows:").pack(anchor=tk.W)
+        for name, var in window_vars.items():
+            ttk.Checkbutton(controls, text=name, variable=var).pack(anchor=tk.W)
+        
+        status = ttk.Label(controls, text=f"{len(data)} rows, {np.count_nonzero(~np.isnan(data))} valid samples", 
+                          foreground="blue", 
+                          font=("TkDefaultFont", 8), wraplength=200)
+        
+        # Waterfall view
+        plot_frame = ttk.Frame(dialog)
+        plot_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        
+        combo_var = tk.StringVar()
+        combo = ttk.Combobox(plot_frame, textvariable=combo_var, state="readonly")
+        combo.pack(anchor=tk.W, padx=10, pady=(10, 0))
+        
+        fig = Figure(figsize=(8, 6), dpi=100)
+        canvas = FigureCanvasTkAgg(fig, plot_frame)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        toolbar = NavigationToolbar2Tk(canvas, plot_frame)
+        toolbar.update()
+        
+        freq_hz = self.freq_var.get()
+        state = {'results': []}
+        
+        def show_waterfall(event=None):
+            if not combo_var.get():
+                return
+            window_func, length = combo_var.get().rsplit(' / ', 1)
+            start_lines, frequencies, amplitudes = waterfall_matrix(state['results'], int(length), window_func)
+            fig.clear()
+            ax = fig.add_subplot(111)
+            if len(start_lines):
+                times = (start_lines - 1) / freq_hz
+                positive = amplitudes[amplitudes > 0]
+                floor = positive.min() if len(positive) else 1e-12
+                mesh = ax.pcolormesh(frequencies, times, np.maximum(amplitudes, floor), 
+                                     norm=LogNorm(vmin=floor, vmax=amplitudes.max()), shading='auto')
+                fig.colorbar(mesh, ax=ax, label='Amplitude')
+            ax.set_xlabel('Frequency (Hz)')
+            ax.set_ylabel('Start time (s)')
+            ax.set_title(f'Waterfall: {self.column_var.get()} ({window_func}, {length} lines)')
+            fig.tight_layout()
+            canvas.draw()
+        
+        combo.bind('<<ComboboxSelected>>', show_waterfall)
+        
+        def run():
+            try:
+                lengths = [int(v) for v in lengths_var.get().replace(' ', '').split(',') if v]
+                windows = [name for name, var in window_vars.items() if var.get()]
+                jobs = build_sweep_jobs(len(data), first_var.get(), last_var.get(), step_var.get(), 
+                                        lengths, windows)
+            except (ValueError, tk.TclError):
+                messagebox.showerror("Error", "Please enter numeric sweep settings.", parent=dialog)
+                return
+            if not jobs:
+                messagebox.showerror("Error", "No sweep combinations fit in the data.", parent=dialog)
+                return
+            
+            # The sweep runs on a worker thread; its progress and outcome are picked up here
+            progress = [0, len(jobs)]
+            outcome = []
+            
+            def set_progress(done, total):
+                progress[:] = [done, total]
+            
+            def check_done():
+                if not dialog.winfo_exists():
+                    return
+                if not outcome:
+                    status.configure(text=f"Analyzed {progress[0]}/{progress[1]} combinations")
+                    self.root.after(100, check_done)
+                    return
+                run_button.configure(state=tk.NORMAL)
+                results, error = outcome[0]
+                if error is not None:
+                    messagebox.showerror("Error", f"Sweep failed:\n{str(error)}", parent=dialog)
+                    return
+                state['results'] = results
+                status.configure(text=f"Analyzed {len(jobs)} combinations")
+                combos = sorted({(r['window_func'], r['n_lines']) for r in results})
+                combo['values'] = [f"{w} / {n}" for w, n in combos]
+                if combos:
+                    combo.set(combo['values'][0])
+                    show_waterfall()
+            
+            try:
+                run_sweep_async(data, freq_hz, jobs, lambda results, error: outcome.append((results, error)), 
+                                set_progress, peak_params=self.get_peak_params(), 
+                                max_peaks=max(self.peak_count_var.get(), 1), workers=max(workers_var.get(), 1), 
+                                multitaper=self.get_multitaper_params())
+            except tk.TclError:
+                messagebox.showerror("Error", "Please enter numeric sweep settings.", parent=dialog)
+                return
+            run_button.configure(state=tk.DISABLED)
+            status.configure(text=f"Analyzing {len(jobs)} combinations...")
+            self.root.after(100, check_done)
+        
+        def export():
+            if not state['results']:
+                messagebox.showerror("Error", "Run the sweep first.", parent=dialog)
+                return
+            file_path = filedialog.asksaveasfilename(
+                parent=dialog,
+                title="Export Sweep Results",
+                defaultextension=".csv",
+                filetypes=[("Peak table (CSV)", "*.csv"), ("Spectra and peaks (NumPy)", "*.npz"), ("All files", "*.*")]
+            )
+            if file_path:
+                try:
+                    export_sweep(state['results'], file_path, freq_hz)
+                    messagebox.showinfo("Success", f"Sweep results exported to {file_path}", parent=dialog)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}", parent=dialog)
+        
+        run_button = ttk.Button(controls, text="Run Sweep", command=run, style="Accent.TButton")
+        run_button.pack(fill=tk.X, pady=(15, 5))
+        ttk.Button(controls, text="Export Results", command=export).pack(fill=tk.X)
+        status.pack(anchor=tk.W, pady=(10, 0))
+    
+    def check_precision_accuracy(self):
+        """Report the float32 amplitude error against float64 on the selected range"""
+        selected_range = self.get_selected_range()
+        if selected_range is None:
+            return
+        if not self.column_var.get():
+            messagebox.showerror("Error", "Please select a column to analyze.")
+            return
+        
+        try:
+            start_idx, end_idx = selected_range
+            data = read_column(self.df, self.column_var.get(), start_idx, end_idx).astype(np.float64)
+            data = data[~np.isnan(data)]
+            if len(data) == 0:
+                messagebox.showerror("Error", "No valid data found in selected range.")
+                return
+            
+            report = precision_report(data, self.freq_var.get(), self.window_var.get(), 
+                                      multitaper=self.get_multitaper_params())
+            
+            note = ""
+            if read_column(self.df, self.column_var.get(), start_idx, start_idx + 1).dtype == np.float32:
+                note = "\n\nNote: the file was loaded in float32, so the reference is also limited to float32 input."
+            messagebox.showinfo("Precision Check", 
+                f"float32 vs float64 on {report['n_points']} points:\n\n"
+                f"Max amplitude error: {report['max_error_vs_peak']:.2e} of peak\n"
+                f"Max relative error (bins within {-report['significant_db']:.0f} dB of peak, "
+                f"{report['n_significant_bins']} bins): {report['max_relative_error']:.2e}\n"
+                f"Dominant frequency: {report['peak_frequency_float32']:.3f} Hz (float32) / "
+                f"{report['peak_frequency_float64']:.3f} Hz (float64)\n\n"
+                f"Working memory: {report['bytes_float32'] / 1e6:.1f} MB (float32) / "
+                f"{report['bytes_float64'] / 1e6:.1f} MB (float64)" + note)
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Precision check failed:\n{str(e)}")
+    
+    def get_selected_range(self):
+        """Return the 0-based (start, end) indices of the selected row range, or None after reporting why"""
+        if self.df is None:
+            messagebox.showerror("Error", "Please select a data file first.")
+            return None
+        
+        start_idx = self.start_line_var.get() - 1
+        end_idx = min(start_idx + self.lines_var.get(), len(self.df))
+        if start_idx >= len(self.df):
+            messagebox.showerror("Error", f"Start line ({start_idx + 1}) exceeds data size ({len(self.df)} rows).")
+            return None
+        return start_idx, end_idx
+    
+    def open_transfer_dialog(self):
+        """Two-channel analysis: cross-spectrum, H1/H2 transfer functions and coherence"""
+        selected_range = self.get_selected_range()
+        if selected_range is None:
+            return
+        start_idx, end_idx = selected_range
+        
+        columns = [column for column in numeric_columns(self.df) if column != self.time_column]
+        if len(columns) < 2:
+            messagebox.showwarning("Warning", "The transfer function needs two numeric signal columns.")
+            return
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Transfer Function and Coherence")
+        dialog.geometry("1100x800")
+        
+        controls = ttk.Frame(dialog, padding="10")
+        controls.pack(side=tk.LEFT, fill=tk.Y)
+        
+        input_var = tk.StringVar(value=self.column_var.get() if self.column_var.get() in columns else columns[0])
+        output_var = tk.StringVar(value=next((c for c in columns if c != input_var.get()), columns[0]))
+        nperseg_var = tk.IntVar(value=min(1024, end_idx - start_idx))
+        overlap_var = tk.DoubleVar(value=50.0)
+        
+        ttk.Label(controls, text="Input column (x):").pack(anchor=tk.W)
+        ttk.Combobox(controls, textvariable=input_var, values=columns, state="readonly").pack(fill=tk.X, pady=(5, 10))
+        ttk.Label(controls, text="Output column (y):").pack(anchor=tk.W)
+        ttk.Combobox(controls, textvariable=output_var, values=columns, state="readonly").pack(fill=tk.X, pady=(5, 10))
+        ttk.Label(controls, text="Segment length (lines):").pack(anchor=tk.W)
+        ttk.Entry(controls, textvariable=nperseg_var).pack(fill=tk.X, pady=(5, 10))
+        ttk.Label(controls, text="Segment overlap (%):").pack(anchor=tk.W)
+        ttk.Entry(controls, textvariable=overlap_var).pack(fill=tk.X, pady=(5, 10))
+        ttk.Label(controls, text=f"Rows {start_idx + 1}-{end_idx}, window: {self.window_var.get()}\n"
+                                 f"(from the main analysis settings)", 
+                 font=("TkDefaultFont", 8)).pack(anchor=tk.W, pady=(0, 10))
+        
+        status = ttk.Label(controls, text="", foreground="blue", font=("TkDefaultFont", 8), wraplength=200)
+        
+        fig = Figure(figsize=(8, 7), dpi=100)
+        canvas = FigureCanvasTkAgg(fig, dialog)
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        toolbar = NavigationToolbar2Tk(canvas, dialog)
+        toolbar.update()
+        
+        state = {'result': None}
+        freq_hz = self.freq_var.get()
+        
+        def run():
+            try:
+                x = read_column(self.df, input_var.get(), start_idx, end_idx).astype(float)
+                y = read_column(self.df, output_var.get(), start_idx, end_idx).astype(float)
+                result = cross_spectral_analysis(x, y, freq_hz, self.window_var.get(), 
+                                                 nperseg_var.get(), overlap_var.get() / 100.0, 
+                                                 self.get_multitaper_params())
+            except Exception as e:
+                messagebox.showerror("Error", f"Transfer function analysis failed:\n{str(e)}", parent=dialog)
+                return
+            state['result'] = result
+            
+            f = result['frequencies'][1:]
+            fig.clear()
+            mag_ax, phase_ax, coh_ax = fig.subplots(3, 1, sharex=True)
+            mag_ax.semilogy(f, np.abs(result['h1'][1:]), label='H1', linewidth=1.2)
+            mag_ax.semilogy(f, np.abs(result['h2'][1:]), label='H2', linewidth=1.2, alpha=0.7)
+            mag_ax.set_ylabel('|H|')
+            mag_ax.set_title(f'Transfer Function: {input_var.get()} \u2192 {output_var.get()} '
+                             f'({result["n_segments"]} segments)')
+            mag_ax.legend()
+            phase_ax.plot(f, np.degrees(np.angle(result['h1'][1:])), linewidth=1.2)
+            phase_ax.set_ylabel('Phase H1 (deg)')
+            coh_ax.plot(f, result['coherence'][1:], color='#22d322', linewidth=1.2)
+            coh_ax.set_ylabel('Coherence')
+            coh_ax.set_ylim(0, 1.05)
+            coh_ax.set_xlabel('Frequency (Hz)')
+            for ax in (mag_ax, phase_ax, coh_ax):
+                ax.grid(True, alpha=0.3)
+            fig.tight_layout()
+            canvas.draw()
+            status.configure(text=f"{result['n_segments']} segments of {result['nperseg']} lines, "
+                                  f"window: {result['window']}, resolution {result['frequencies'][1]:.3g} Hz")
+        
+        def export():
+            if state['result'] is None:
+                messagebox.showerror("Error", "Run the analysis first.", parent=dialog)
+                return
+            file_path = filedialog.asksaveasfilename(
+                parent=dialog,
+                title="Export Transfer Function",
+                defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            )
+            if file_path:
+                try:
+                    cross_spectrum_table(state['result']).to_csv(file_path, index=False)
+                    messagebox.showinfo("Success", f"Data exported to {file_path}", parent=dialog)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}", parent=dialog)
+        
+        ttk.Button(controls, text="Run Analysis", command=run, 
+                  style="Accent.TButton").pack(fill=tk.X, pady=(10, 5))
+        ttk.Button(controls, text="Export Data (CSV)", command=export).pack(fill=tk.X)
+        status.pack(anchor=tk.W, pady=(10, 0))
+    
+    def open_tracking_dialog(self):
+        """Track the strongest peaks over time within the selected range"""
+        selected_range = self.get_selected_range()
+        if selected_range is None:
+            return
+        if not self.column_var.get():
+            messagebox.showerror("Error", "Please select a column to analyze.")
+            return
+        start_idx, end_idx = selected_range
+        column = self.column_var.get()
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"Peak Tracking - {column}")
+        dialog.geometry("1100x750")
+        
+        controls = ttk.Frame(dialog, padding="10")
+        controls.pack(side=tk.LEFT, fill=tk.Y)
+        
+        n_points = end_idx - start_idx
+        frame_var = tk.IntVar(value=min(1024, n_points))
+        hop_var = tk.IntVar(value=max(min(1024, n_points) // 4, 1))
+        peaks_var = tk.IntVar(value=max(self.peak_count_var.get(), 1))
+        jump_var = tk.StringVar()
+        gap_var = tk.IntVar(value=2)
+        min_frames_var = tk.IntVar(value=5)
+        
+        for label, var in [("Frame length (lines):", frame_var), ("Hop (lines):", hop_var),
+                           ("Peaks per frame:", peaks_var), ("Max jump (Hz, blank = 3 bins):", jump_var),
+                           ("Max gap (frames):", gap_var), ("Min track length (frames):", min_frames_var)]:
+            ttk.Label(controls, text=label).pack(anchor=tk.W)
+            ttk.Entry(controls, textvariable=var, width=20).pack(fill=tk.X, pady=(5, 10))
+        ttk.Label(controls, text=f"Rows {start_idx + 1}-{end_idx}, window: {self.window_var.get()}", 
+                 font=("TkDefaultFont", 8)).pack(anchor=tk.W, pady=(0, 10))
+        
+        status = ttk.Label(controls, text="", foreground="blue", font=("TkDefaultFont", 8), wraplength=200)
+        
+        fig = Figure(figsize=(8, 6), dpi=100)
+        canvas = FigureCanvasTkAgg(fig, dialog)
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        toolbar = NavigationToolbar2Tk(canvas, dialog)
+        toolbar.update()
+        
+        state = {'tracks': None}
+        freq_hz = self.freq_var.get()
+        
+        def selected_tracks():
+            summary = track_summary(state['tracks'], min_frames_var.get())
+            return state['tracks'][state['tracks']['Track_ID'].isin(summary['Track_ID'])], summary
+        
+        def run():
+            try:
+                data = read_column(self.df, column, start_idx, end_idx).astype(self.precision_var.get())
+                data = data[~np.isnan(data)]
+                max_jump = float(jump_var.get()) if jump_var.get().strip() else None
+                state['tracks'] = track_peaks(data, freq_hz, frame_var.get(), hop_var.get(), 
+                                              self.window_var.get(), self.get_peak_params(), 
+                                              peaks_var.get(), max_jump, gap_var.get(), 
+                                              self.get_multitaper_params())
+                tracks, summary = selected_tracks()
+            except Exception as e:
+                messagebox.showerror("Error", f"Peak tracking failed:\n{str(e)}", parent=dialog)
+                return
+            
+            fig.clear()
+            ax = fig.add_subplot(111)
+            colors = self.current_colors
+            for i, (_, track) in enumerate(tracks.groupby('Track_ID')):
+                ax.plot(track['Time_s'], track['Frequency_Hz'], '.-', markersize=2, linewidth=1, 
+                        color=colors[i % len(colors)])
+            ax.set_xlabel('Time (s)')
+            ax.set_ylabel('Frequency (Hz)')
+            ax.set_title(f'Peak Tracks: {column} ({len(summary)} tracks)')
+            ax.grid(True, alpha=0.3)
+            fig.tight_layout()
+            canvas.draw()
+            
+            n_frames = int(state['tracks']['Frame'].max()) + 1 if len(state['tracks']) else 0
+            status.configure(text=f"{n_frames} frames, {state['tracks']['Track_ID'].nunique()} tracks "
+                                  f"({len(summary)} with at least {min_frames_var.get()} frames)")
+        
+        def export():
+            if state['tracks'] is None:
+                messagebox.showerror("Error", "Run the tracking first.", parent=dialog)
+                return
+            file_path = filedialog.asksaveasfilename(
+                parent=dialog,
+                title="Export Track Table",
+                defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            )
+            if file_path:
+                try:
+                    tracks, summary = selected_tracks()
+                    tracks.to_csv(file_path, index=False)
+                    summary.to_csv(os.path.splitext(file_path)[0] + "_summary.csv", index=False)
+                    messagebox.showinfo("Success", f"Track table exported to {file_path}\n"
+                                                   f"(track summary next to it)", parent=dialog)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}", parent=dialog)
+        
+        ttk.Button(controls, text="Run Tracking", command=run, 
+                  style="Accent.TButton").pack(fill=tk.X, pady=(10, 5))
+        ttk.Button(controls, text="Export Tracks (CSV)", command=export).pack(fill=tk.X)
+        status.pack(anchor=tk.W, pady=(10, 0))
+    
+    def open_quality_dialog(self):
+        """Per-block data-quality scan of the selected range"""
+        selected_range = self.get_selected_range()
+        if selected_range is None:
+            return
+        if not self.column_var.get():
+            messagebox.showerror("Error", "Please select a column to analyze.")
+            return
+        start_idx, end_idx = selected_range
+        column = self.column_var.get()
+        
+        try:
+            report = scan_quality(read_column(self.df, column, start_idx, end_idx), start_row=start_idx + 1,
+                                  full_scale=getattr(self.df, 'full_scale', None))
+        except Exception as e:
+            messagebox.showerror("Error", f"Quality scan failed:\n{str(e)}")
+            return
+        blocks = report['blocks']
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"Data Quality - {column}")
+        dialog.geometry("1000x700")
+        
+        summary = ttk.Frame(dialog, padding="10")
+        summary.pack(side=tk.TOP, fill=tk.X)
+        issues = report['issues'] or ["No issues found"]
+        ttk.Label(summary, text=f"Rows {start_idx + 1}-{end_idx}, {report['n_blocks']} blocks of "
+                               f"{report['block_size']} samples", font=("TkDefaultFont", 9, "bold")).pack(anchor=tk.W)
+        for issue in issues:
+            ttk.Label(summary, text=f"- {issue}", foreground="orange" if report['issues'] else "green").pack(anchor=tk.W)
+        
+        fig = Figure(figsize=(8, 5), dpi=100)
+        ax_level, ax_flags = fig.subplots(2, 1, sharex=True)
+        rows = (blocks['Start_Row'] + blocks['End_Row']) / 2
+        ax_level.fill_between(rows, blocks['Mean'] - blocks['Std'], blocks['Mean'] + blocks['Std'], 
+                              alpha=0.3, color='steelblue', label='Mean ± Std')
+        ax_level.plot(rows, blocks['Mean'], color='steelblue', linewidth=1)
+        flagged = blocks['Nonstationary'].to_numpy()
+        ax_level.plot(rows[flagged], blocks['Mean'][flagged], 'o', color='red', markersize=4, 
+                      label='Non-stationary')
+        ax_level.set_ylabel('Block level')
+        ax_level.legend(fontsize=8)
+        ax_level.grid(True, alpha=0.3)
+        
+        for name, color in [('Missing', 'gray'), ('Clipped', 'red'), ('Flat', 'purple'), ('Spikes', 'orange')]:
+            if blocks[name].any():
+                ax_flags.plot(rows, blocks[name], color=color, linewidth=1, label=name)
+        ax_flags.set_xlabel('Row')
+        ax_flags.set_ylabel('Flagged samples per block')
+        if ax_flags.get_legend_handles_labels()[0]:
+            ax_flags.legend(fontsize=8)
+        ax_flags.grid(True, alpha=0.3)
+        fig.tight_layout()
+        
+        canvas = FigureCanvasTkAgg(fig, dialog)
+        canvas.draw()
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        
+        def export():
+            file_path = filedialog.asksaveasfilename(
+                parent=dialog,
+                title="Export Quality Report",
+                defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            )
+            if file_path:
+                try:
+                    blocks.to_csv(file_path, index=False)
+                    messagebox.showinfo("Success", f"Quality report exported to {file_path}", parent=dialog)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}", parent=dialog)
+        
+        ttk.Button(summary, text="Export Blocks (CSV)", command=export).pack(anchor=tk.E)
+    
+    def draw_limit_mask(self, frequencies, amplitudes):
+        """Draw the active limit mask on the analysis plot, mark the bins above it and return the check"""
+        for artist in self.limit_mask_artists:
+            artist.remove()
+        result = self.limit_mask.check(frequencies, amplitudes)
+        limit = self.limit_mask.on_grid(frequencies)
+        self.limit_mask_artists = self.ax.plot(frequencies[1:], limit[1:], color='red', linestyle='--', 
+                                               linewidth=1.2, label=f"Limit {self.limit_mask.name}".strip())
+        exceeded = np.flatnonzero(result['exceeded'][1:]) + 1  # DC is not plotted
+        if len(exceeded):
+            self.limit_mask_artists += self.ax.plot(frequencies[exceeded], amplitudes[exceeded], 'o', 
+                                                    color='red', markersize=4, label='Above limit')
+        self.ax.legend(handles=self.limit_mask_artists, fontsize=8)
+        return result
+    
+    def describe_limit_check(self, result):
+        """One line verdict of a limit mask check"""
+        name = f" '{self.limit_mask.name}'" if self.limit_mask.name else ""
+        if np.isnan(result['worst_margin_db']):
+            return f"Limit mask{name}: no bins within the mask"
+        verdict = "PASS" if result['passed'] else f"FAIL ({result['violating_bins']} bins above the limit)"
+        return (f"Limit mask{name}: {verdict}, worst margin {result['worst_margin_db']:+.1f} dB "
+                f"at {result['worst_frequency']:.2f} Hz")
+    
+    def open_limit_mask_dialog(self):
+        """Define the limit mask checked after each analysis and check files against it in batch"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Limit Mask")
+        dialog.geometry("1100x650")
+        
+        controls = ttk.Frame(dialog, padding="10")
+        controls.pack(side=tk.LEFT, fill=tk.Y)
+        
+        ttk.Label(controls, text="Corner points (frequency Hz, limit amplitude):").pack(anchor=tk.W)
+        points_text = tk.Text(controls, width=32, height=12)
+        points_text.pack(fill=tk.X, pady=(5, 5))
+        mask = self.limit_mask
+        if mask is not None:
+            points_text.insert('1.0', "\n".join(f"{f:g}, {limit:g}" for f, limit in zip(mask.frequencies, mask.limits)))
+        else:
+            points_text.insert('1.0', "# Between corners the limit is linear in log-amplitude\n10, 1.0\n100, 0.1\n400, 0.1")
+        name_var = tk.StringVar(value=mask.name if mask is not None else "")
+        log_frequency_var = tk.BooleanVar(value=mask.log_frequency if mask is not None else False)
+        name_frame = ttk.Frame(controls)
+        name_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(name_frame, text="Name:").pack(side=tk.LEFT)
+        ttk.Entry(name_frame, textvariable=name_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        ttk.Checkbutton(controls, text="Interpolate over log frequency", 
+                       variable=log_frequency_var).pack(anchor=tk.W, pady=(0, 10))
+        
+        status = ttk.Label(controls, text="No mask active" if mask is None else self.limit_mask_status(), 
+                          foreground="blue", font=("TkDefaultFont", 8), wraplength=260)
+        state = {'report': None}
+        
+        def current_mask():
+            return parse_mask(points_text.get('1.0', tk.END), log_frequency_var.get(), name_var.get().strip())
+        
+        def load():
+            file_path = filedialog.askopenfilename(parent=dialog, title="Load Limit Mask", 
+                                                   filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+            if file_path:
+                try:
+                    loaded = load_mask(file_path, log_frequency_var.get())
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to load mask:\n{str(e)}", parent=dialog)
+                    return
+                points_text.delete('1.0', tk.END)
+                points_text.insert('1.0', "\n".join(f"{f:g}, {limit:g}" 
+                                                    for f, limit in zip(loaded.frequencies, loaded.limits)))
+                name_var.set(loaded.name)
+        
+        def save():
+            try:
+                to_save = current_mask()
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid mask:\n{str(e)}", parent=dialog)
+                return
+            file_path = filedialog.asksaveasfilename(parent=dialog, title="Save Limit Mask", defaultextension=".csv",
+                                                     filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+            if file_path:
+                save_mask(file_path, to_save)
+        
+        def apply():
+            try:
+                self.limit_mask = current_mask()
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid mask:\n{str(e)}", parent=dialog)
+                return
+            status.configure(text=self.limit_mask_status())
+        
+        def remove():
+            self.limit_mask = None
+            for artist in self.limit_mask_artists:
+                artist.remove()
+            self.limit_mask_artists = []
+            if self.ax.get_legend() is not None:
+                self.ax.get_legend().remove()
+            self.canvas.draw_idle()
+            status.configure(text="No mask active")
+        
+        # Batch report
+        report_frame = ttk.Frame(dialog, padding="10")
+        report_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        report_tree = ttk.Treeview(report_frame, columns=REPORT_COLUMNS[:-1], show='headings')
+        for name in REPORT_COLUMNS[:-1]:
+            report_tree.heading(name, text=name.replace('_', ' '))
+            report_tree.column(name, width=90 if name not in ('File', 'Column') else 150)
+        report_tree.tag_configure('FAIL', foreground='red')
+        report_tree.tag_configure('ERROR', foreground='orange')
+        report_scroll = ttk.Scrollbar(report_frame, orient=tk.VERTICAL, command=report_tree.yview)
+        report_tree.configure(yscrollcommand=report_scroll.set)
+        report_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        report_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        def batch():
+            try:
+                batch_mask = current_mask()
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid mask:\n{str(e)}", parent=dialog)
+                return
+            file_paths = filedialog.askopenfilenames(
+                parent=dialog, title="Select Files to Check",
+                filetypes=[("Data files", "*.csv *.txt *.wav *.bin *.dat *.raw"), ("All files", "*.*")])
+            if not file_paths:
+                return
+            
+            def show_progress(done, total):
+                status.configure(text=f"Checked {done}/{total} files")
+                dialog.update_idletasks()
+            
+            settings = self.analysis_settings()
+            try:
+                report = check_files(list(file_paths), batch_mask, settings, self.freq_var.get(), 
+                                     progress=show_progress)
+            except Exception as e:
+                messagebox.showerror("Error", f"Batch check failed:\n{str(e)}", parent=dialog)
+                return
+            state['report'] = report
+            report_tree.delete(*report_tree.get_children())
+            for record in report.itertuples(index=False):
+                values = [value if isinstance(value, str) else ("" if pd.isna(value) else f"{value:.6g}") 
+                          for value in record[:-1]]
+                report_tree.insert('', tk.END, values=values, tags=(record.Result,))
+            failed = int((report['Result'] != 'PASS').sum())
+            status.configure(text=f"{len(report) - failed} of {len(report)} columns passed")
+        
+        def export():
+            if state['report'] is None:
+                messagebox.showerror("Error", "Run a batch check first.", parent=dialog)
+                return
+            file_path = filedialog.asksaveasfilename(
+                parent=dialog,
+                title="Export Pass/Fail Report",
+                defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            )
+            if file_path:
+                try:
+                    state['report'].to_csv(file_path, index=False)
+                    messagebox.showinfo("Success", f"Report exported to {file_path}", parent=dialog)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}", parent=dialog)
+        
+        for text, command in [("Load Mask...", load), ("Save Mask...", save), 
+                              ("Apply to Analyses", apply), ("Remove Mask", remove)]:
+            ttk.Button(controls, text=text, command=command).pack(fill=tk.X, pady=(0, 5))
+        ttk.Separator(controls).pack(fill=tk.X, pady=10)
+        ttk.Button(controls, text="Batch Check Files...", command=batch).pack(fill=tk.X, pady=(0, 5))
+        ttk.Button(controls, text="Export Report (CSV)", command=export).pack(fill=tk.X)
+        status.pack(anchor=tk.W, pady=(10, 0))
+    
+    def limit_mask_status(self):
+        """Status line of the active mask, with the verdict on the current analysis if there is one"""
+        if not hasattr(self, 'current_fft_data'):
+            return "Mask active: checked after each analysis"
+        data = self.current_fft_data
+        result = self.draw_limit_mask(data['frequencies'], data['amplitudes'])
+        self.canvas.draw_idle()
+        data['limit_check'] = self.describe_limit_check(result)
+        return data['limit_check']
+    
+    def open_report_dialog(self):
+        """Write PDF/HTML reports of many files in parallel with the current settings"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Reports")
+        dialog.geometry("700x450")
+        
+        controls = ttk.Frame(dialog, padding="10")
+        controls.pack(side=tk.LEFT, fill=tk.Y)
+        
+        state = {'files': [], 'results': None}
+        format_var = tk.StringVar(value=REPORT_FORMATS[0])
+        group_var = tk.StringVar(value="")
+        out_var = tk.StringVar(value=os.path.abspath('fft_reports'))
+        workers_var = tk.IntVar(value=os.cpu_count() or 1)
+        use_mask_var = tk.BooleanVar(value=self.limit_mask is not None)
+        
+        files_label = ttk.Label(controls, text="No files selected")
+        
+        def select_files():
+            file_paths = filedialog.askopenfilenames(
+                parent=dialog, title="Select Files to Report On",
+                filetypes=[("Data files", "*.csv *.txt *.wav *.bin *.dat *.raw"), ("All files", "*.*")])
+            if file_paths:
+                state['files'] = list(file_paths)
+                files_label.configure(text=f"{len(file_paths)} files selected")
+        
+        def select_out():
+            directory = filedialog.askdirectory(parent=dialog, title="Report Directory", initialdir=out_var.get())
+            if directory:
+                out_var.set(directory)
+        
+        ttk.Button(controls, text="Select Files...", command=select_files).pack(fill=tk.X)
+        files_label.pack(anchor=tk.W, pady=(5, 10))
+        ttk.Label(controls, text="Format:").pack(anchor=tk.W)
+        ttk.Combobox(controls, textvariable=format_var, values=REPORT_FORMATS, state="readonly", 
+                    width=18).pack(fill=tk.X, pady=(5, 10))
+        ttk.Label(controls, text="Group files by (regular expression):").pack(anchor=tk.W)
+        ttk.Entry(controls, textvariable=group_var, width=20).pack(fill=tk.X, pady=(5, 10))
+        ttk.Label(controls, text="Output directory:").pack(anchor=tk.W)
+        out_frame = ttk.Frame(controls)
+        out_frame.pack(fill=tk.X, pady=(5, 10))
+        ttk.Entry(out_frame, textvariable=out_var, width=20).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(out_frame, text="...", width=3, command=select_out).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(controls, text="Worker processes:").pack(anchor=tk.W)
+        ttk.Entry(controls, textvariable=workers_var, width=20).pack(fill=tk.X, pady=(5, 10))
+        ttk.Checkbutton(controls, text="Draw and check the limit mask", 
+                       variable=use_mask_var).pack(anchor=tk.W, pady=(0, 10))
+        
+        status = ttk.Label(controls, text="One report per file unless grouped", foreground="blue", 
+                          font=("TkDefaultFont", 8), wraplength=220)
+        
+        # Written reports
+        results_frame = ttk.Frame(dialog, padding="10")
+        results_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        results_tree = ttk.Treeview(results_frame, columns=('Report', 'Files', 'Status', 'Seconds'), 
+                                    show='headings')
+        for name in ('Report', 'Files', 'Status', 'Seconds'):
+            results_tree.heading(name, text=name)
+            results_tree.column(name, width=150 if name == 'Report' else 70)
+        results_tree.tag_configure('failed', foreground='red')
+        results_tree.pack(fill=tk.BOTH, expand=True)
+        
+        def generate():
+            if not state['files']:
+                messagebox.showerror("Error", "Please select files first.", parent=dialog)
+                return
+            try:
+                groups = group_files(state['files'], group_var.get().strip() or None)
+                workers = max(workers_var.get(), 1)
+            except (re.error, tk.TclError) as e:
+                messagebox.showerror("Error", f"Invalid report settings:\n{str(e)}", parent=dialog)
+                return
+            if use_mask_var.get() and self.limit_mask is None:
+                messagebox.showerror("Error", "No limit mask is active. Define one with Limit Mask...", 
+                                   parent=dialog)
+                return
+            
+            def show_progress(done, total):
+                status.configure(text=f"Written {done}/{total} reports")
+                dialog.update_idletasks()
+            
+            settings = self.analysis_settings()
+            try:
+                results = generate_reports(groups, out_var.get(), settings, self.freq_var.get(), format_var.get(),
+                                           self.limit_mask if use_mask_var.get() else None,
+                                           max(self.peak_count_var.get(), 1), workers, progress=show_progress)
+            except Exception as e:
+                messagebox.showerror("Error", f"Report generation failed:\n{str(e)}", parent=dialog)
+                return
+            results_tree.delete(*results_tree.get_children())
+            for row in results.itertuples(index=False):
+                results_tree.insert('', tk.END, values=(row.Report, row.Files, row.Status, format_cell(row.Seconds)),
+                                    tags=(row.Status,))
+            failed = int((results['Status'] != 'ok').sum())
+            status.configure(text=f"{len(results) - failed} reports written to {out_var.get()}"
+                                  + (f", {failed} failed" if failed else ""))
+        
+        ttk.Button(controls, text="Generate Reports", command=generate).pack(fill=tk.X)
+        status.pack(anchor=tk.W, pady=(10, 0))
+    
+    def open_envelope_dialog(self):
+        """Envelope spectrum of the selected range after band-pass demodulation"""
+        selected_range = self.get_selected_range()
+        if selected_range is None:
+            return
+        if not self.column_var.get():
+            messagebox.showerror("Error", "Please select a column to analyze.")
+            return
+        start_idx, end_idx = selected_range
+        freq_hz = self.freq_var.get()
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Envelope Analysis")
+        dialog.geometry("1100x750")
+        
+        controls = ttk.Frame(dialog, padding="10")
+        controls.pack(side=tk.LEFT, fill=tk.Y)
+        
+        low_var = tk.DoubleVar(value=round(freq_hz / 8, 3))
+        high_var = tk.DoubleVar(value=round(freq_hz / 4, 3))
+        max_freq_var = tk.DoubleVar(value=round(freq_hz / 16, 3))
+        all_columns_var = tk.BooleanVar(value=False)
+        
+        for label, var in [("Band low (Hz):", low_var), ("Band high (Hz):", high_var), 
+                           ("Show envelope spectrum up to (Hz):", max_freq_var)]:
+            ttk.Label(controls, text=label).pack(anchor=tk.W)
+            ttk.Entry(controls, textvariable=var, width=20).pack(fill=tk.X, pady=(5, 10))
+        ttk.Checkbutton(controls, text="All numeric columns", variable=all_columns_var).pack(anchor=tk.W)
+        ttk.Label(controls, text=f"Rows {start_idx + 1}-{end_idx}, window: {self.window_var.get()}", 
+                 font=("TkDefaultFont", 8)).pack(anchor=tk.W, pady=(10, 10))
+        
+        status = ttk.Label(controls, text="", foreground="blue", font=("TkDefaultFont", 8), wraplength=200)
+        
+        fig = Figure(figsize=(8, 6), dpi=100)
+        canvas = FigureCanvasTkAgg(fig, dialog)
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        toolbar = NavigationToolbar2Tk(canvas, dialog)
+        toolbar.update()
+        
+        state = {'table': None}
+        
+        def run():
+            columns = numeric_columns(self.df) if all_columns_var.get() else [self.column_var.get()]
+            try:
+                # Columns are demodulated together, so keep only rows valid in all of them
+                data = np.vstack([read_column(self.df, column, start_idx, end_idx) for column in columns])
+                data = data[:, ~np.isnan(data).any(axis=0)].astype(self.precision_var.get())
+                frequencies, amplitudes, _ = envelope_spectrum(data, freq_hz, low_var.get(), high_var.get(), 
+                                                               self.window_var.get(), 
+                                                               multitaper=self.get_multitaper_params())
+            except Exception as e:
+                messagebox.showerror("Error", f"Envelope analysis failed:\n{str(e)}", parent=dialog)
+                return
+            
+            fig.clear()
+            ax = fig.add_subplot(111)
+            shown = frequencies <= max_freq_var.get()
+            colors = self.current_colors
+            peak_params = self.get_peak_params()
+            for i, (column, amplitude) in enumerate(zip(columns, amplitudes)):
+                color = colors[i % len(colors)]
+                ax.plot(frequencies[shown], amplitude[shown], color=color, linewidth=1, label=str(column))
+                peaks_idx = [idx for idx in detect_peaks(amplitude, peak_params) if shown[idx]]
+                peaks_idx = sorted(peaks_idx, key=lambda idx: amplitude[idx], 
+                                   reverse=True)[:self.peak_count_var.get()]
+                ax.plot(frequencies[peaks_idx], amplitude[peaks_idx], 'o', color=color, markersize=4)
+                for idx in peaks_idx:
+                    ax.annotate(f'{frequencies[idx]:.2f} Hz', (frequencies[idx], amplitude[idx]), 
+                                textcoords="offset points", xytext=(0, 6), ha='center', fontsize=8)
+            ax.set_xlabel('Frequency (Hz)')
+            ax.set_ylabel('Envelope Amplitude')
+            ax.set_title(f'Envelope Spectrum ({low_var.get():g}-{high_var.get():g} Hz band)')
+            ax.grid(True, alpha=0.3)
+            ax.legend()
+            fig.tight_layout()
+            canvas.draw()
+            
+            table = pd.DataFrame({'Frequency_Hz': frequencies})
+            for column, amplitude in zip(columns, amplitudes):
+                table[f"{column}_Envelope_Amplitude"] = amplitude
+            state['table'] = table
+            status.configure(text=f"{data.shape[1]} samples, {len(columns)} columns, "
+                                  f"resolution {frequencies[1] - frequencies[0]:.4g} Hz")
+        
+        def export():
+            if state['table'] is None:
+                messagebox.showerror("Error", "Run the envelope analysis first.", parent=dialog)
+                return
+            file_path = filedialog.asksaveasfilename(
+                parent=dialog,
+                title="Export Envelope Spectrum",
+                defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            )
+            if file_path:
+                try:
+                    state['table'].to_csv(file_path, index=False)
+                    messagebox.showinfo("Success", f"Envelope spectrum exported to {file_path}", parent=dialog)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}", parent=dialog)
+        
+        ttk.Button(controls, text="Run Envelope Analysis", command=run, 
+                  style="Accent.TButton").pack(fill=tk.X, pady=(10, 5))
+        ttk.Button(controls, text="Export Spectrum (CSV)", command=export).pack(fill=tk.X)
+        status.pack(anchor=tk.W, pady=(10, 0))
+    
+    def open_octave_dialog(self):
+        """Fractional-octave band levels of the current analysis and the checked saved results"""
+        spectra = []
+        if hasattr(self, 'current_fft_data'):
+            spectra.append(self.current_fft_data)
+        # Summaries have no full spectrum to band
+        spectra.extend(self.fft_results[result_id] for result_id in self.get_checked_items() 
+                       if 'frequencies' in self.fft_results[result_id])
+        if not spectra:
+            messagebox.showerror("Error", "Run an analysis or check saved results first.")
+            return
+        
+        # Table columns need distinct names even if saved results share one
+        labels = []
+        for data in spectra:
+            label = data['display_name']
+            while label in labels:
+                label += "'"
+            labels.append(label)
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Octave Band Levels")
+        dialog.geometry("1000x650")
+        
+        controls = ttk.Frame(dialog, padding="10")
+        controls.pack(side=tk.LEFT, fill=tk.Y)
+        
+        ttk.Label(controls, text="Band width (octave):").pack(anchor=tk.W)
+        fraction_var = tk.StringVar(value='1/3')
+        fraction_combo = ttk.Combobox(controls, textvariable=fraction_var, values=list(OCTAVE_FRACTIONS), 
+                                      state="readonly", width=18)
+        fraction_combo.pack(fill=tk.X, pady=(5, 10))
+        ttk.Label(controls, text=f"{len(spectra)} spectra (current analysis and checked results)", 
+                 font=("TkDefaultFont", 8), wraplength=200).pack(anchor=tk.W, pady=(0, 10))
+        
+        fig = Figure(figsize=(8, 6), dpi=100)
+        canvas = FigureCanvasTkAgg(fig, dialog)
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        toolbar = NavigationToolbar2Tk(canvas, dialog)
+        toolbar.update()
+        
+        state = {'table': None}
+        
+        def compute():
+            # Spectra on the same frequency grid and window share one matrix product
+            groups = {}
+            for label, data in zip(labels, spectra):
+                frequencies = data['frequencies']
+                key = (len(frequencies), round(float(frequencies[1] - frequencies[0]), 12), data['window_func'])
+                groups.setdefault(key, []).append((label, data))
+            
+            tables = []
+            for (_, _, window_func), members in groups.items():
+                centers, lower, upper, rms = band_levels(members[0][1]['frequencies'], 
+                                                         np.vstack([d['amplitudes'] for _, d in members]), 
+                                                         fraction_var.get(), window_func)
+                tables.append((band_table(centers, lower, upper, rms, [label for label, _ in members]), 
+                               members))
+            return tables
+        
+        def run(event=None):
+            try:
+                tables = compute()
+            except Exception as e:
+                messagebox.showerror("Error", f"Band calculation failed:\n{str(e)}", parent=dialog)
+                return
+            
+            fig.clear()
+            ax = fig.add_subplot(111)
+            merged = None
+            for table, members in tables:
+                for label, data in members:
+                    ax.step(table['Center_Hz'], table[f"{label}_dB"], where='mid', 
+                            color=data['color'], linewidth=1.5, label=label)
+                merged = table if merged is None else merged.merge(
+                    table, on=['Center_Hz', 'Lower_Hz', 'Upper_Hz'], how='outer')
+            state['table'] = merged.sort_values('Center_Hz').reset_index(drop=True)
+            
+            ax.set_xscale('log')
+            ax.set_xlabel('Band Center Frequency (Hz)')
+            ax.set_ylabel('Band Level (dB re 1)')
+            ax.set_title(f'{fraction_var.get()} Octave Band Levels')
+            ax.grid(True, which='both', alpha=0.3)
+            ax.legend()
+            fig.tight_layout()
+            canvas.draw()
+        
+        def export():
+            if state['table'] is None:
+                return
+            file_path = filedialog.asksaveasfilename(
+                parent=dialog,
+                title="Export Band Levels",
+                defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            )
+            if file_path:
+                try:
+                    state['table'].to_csv(file_path, index=False)
+                    messagebox.showinfo("Success", f"Band levels exported to {file_path}", parent=dialog)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}", parent=dialog)
+        
+        fraction_combo.bind('<<ComboboxSelected>>', run)
+        ttk.Button(controls, text="Export Bands (CSV)", command=export).pack(fill=tk.X)
+        run()
+    
     def export_data(self):
         if not hasattr(self, 'current_fft_data'):
             messagebox.showerror("Error", "No FFT results to export. Run analysis first.")
@@ -1180,12 +2989,93 @@ class FFTAnalyzerApp:
         )
         
         if file_path:
-            try:
-                self.fig.savefig(file_path, dpi=300, bbox_inches='tight')
-                messagebox.showinfo("Success", f"Plot exported to {file_path}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Export failed:\n{str(e)}")
+            self.export_figure_in_background(self.fig, file_path, f"Plot exported to {file_path}")
+    
+    def export_figure_in_background(self, fig, file_path, success_message):
+        """Write a figure to file without blocking the UI
+        
+        Dense traces are reduced to the export resolution and, if enabled,
+        rasterized while axes and text stay vector. A message is shown
+        when the file has been written.
+        """
+        outcome = []
+        try:
+            export_figure_async(fig, file_path, outcome.append, dpi=EXPORT_DPI,
+                              rasterize=self.rasterize_export_var.get())
+        except Exception as e:
+            messagebox.showerror("Error", f"Export failed:\n{str(e)}")
+            return
+        
+        def check_done():
+            if not outcome:
+                self.root.after(100, check_done)
+            elif outcome[0] is None:
+                messagebox.showinfo("Success", success_message)
+            else:
+                messagebox.showerror("Error", f"Export failed:\n{str(outcome[0])}")
+        
+        self.root.after(100, check_done)
+    
+    def results_page_size(self):
+        """Number of result rows that fit in the visible part of the list"""
+        row_height = ttk.Style().lookup('Treeview', 'rowheight')
+        try:
+            row_height = int(row_height)
+        except (TypeError, ValueError):
+            row_height = 20
+        # One row's worth of height is taken by the headings
+        return max(self.results_tree.winfo_height() // row_height - 1, 1)
+    
+    def render_results(self):
+        """Show the slice of the results view at the current scroll offset"""
+        model = self.results_model
+        page_size = self.results_page_size()
+        total = len(model.view)
+        self.results_offset = max(min(self.results_offset, total - page_size), 0)
+        rows = model.visible_slice(self.results_offset, page_size)
+        
+        # Reuse the existing items, adding or deleting only the difference
+        items = list(self.results_tree.get_children())
+        for item in items[len(rows):]:
+            self.results_tree.delete(item)
+        for i in range(len(items), len(rows)):
+            items.append(self.results_tree.insert('', 'end'))
+        
+        for item, row in zip(items, rows):
+            checkbox_text = '☑' if model.is_checked(row['id']) else '☐'
+            self.results_tree.item(item, text=str(row['id']), 
+                                   values=(checkbox_text, row['name'], row['column'], row['window'], row['date']))
+        
+        if total:
+            self.results_scrollbar.set(self.results_offset / total, (self.results_offset + len(rows)) / total)
+        else:
+            self.results_scrollbar.set(0.0, 1.0)
+    
+    def scroll_results(self, action, amount, unit=None):
+        """Scrollbar and mouse wheel handler moving the visible slice of results"""
+        page_size = self.results_page_size()
+        if action == 'moveto':
+            self.results_offset = int(round(float(amount) * len(self.results_model.view)))
+        elif action == 'scroll':
+            step = page_size if unit == 'pages' else 1
+            self.results_offset += int(amount) * step
+        self.render_results()
+    
+    def apply_results_filter(self):
+        self.results_model.set_filter(self.results_filter_var.get(), 
+                                      self.results_column_filter_var.get(), 
+                                      self.results_window_filter_var.get())
+        self.results_offset = 0
+        self.render_results()
+    
+    def sort_results(self, key):
+        self.results_model.set_sort(key)
+        self.render_results()
+    
+    def update_results_filter_choices(self):
+        """Offer the columns and windows of the saved results as filter choices"""
+        self.results_column_filter['values'] = [ALL] + self.results_model.distinct('column')
+        self.results_window_filter['values'] = [ALL] + self.results_model.distinct('window')
     
     def on_treeview_click(self, event):
         """Handle clicks on the treeview to toggle checkboxes"""
@@ -1198,39 +3088,37 @@ class FFTAnalyzerApp:
             # Check if the Select column was clicked
             if column == '#1' and item:  # #1 is the Select column
                 # Toggle checkbox state
-                current_state = self.checkbox_states.get(item, False)
-                new_state = not current_state
-                self.checkbox_states[item] = new_state
+                result_id = int(self.results_tree.item(item, 'text'))
+                new_state = not self.results_model.is_checked(result_id)
+                self.results_model.set_checked([result_id], new_state)
                 
                 # Update display
                 checkbox_text = '☑' if new_state else '☐'
                 values = list(self.results_tree.item(item, 'values'))
                 values[0] = checkbox_text  # Update the checkbox column
                 self.results_tree.item(item, values=values)
+                
+                # Show or hide just this result in the combined plot
+                self.set_combined_visibility({result_id: new_state})
     
     def toggle_all_checkboxes(self):
-        """Toggle all checkboxes on/off"""
-        # Check if any items are currently checked
-        any_checked = any(self.checkbox_states.values())
-        
-        # If any are checked, uncheck all; otherwise check all
-        new_state = not any_checked
-        checkbox_text = '☑' if new_state else '☐'
+        """Check all results matching the filter, or uncheck everything if any are checked"""
+        model = self.results_model
+        if model.checked:
+            result_ids = list(model.checked)
+            new_state = False
+        else:
+            result_ids = list(model.view)
+            new_state = True
+        model.set_checked(result_ids, new_state)
+        self.render_results()
         
-        # Update all items
-        for item in self.results_tree.get_children():
-            self.checkbox_states[item] = new_state
-            values = list(self.results_tree.item(item, 'values'))
-            values[0] = checkbox_text
-            self.results_tree.item(item, values=values)
+        # One redraw for the whole batch
+        self.set_combined_visibility({result_id: new_state for result_id in result_ids})
     
     def get_checked_items(self):
-        """Get list of checked items"""
-        checked_items = []
-        for item in self.results_tree.get_children():
-            if self.checkbox_states.get(item, False):
-                checked_items.append(item)
-        return checked_items
+        """Get the IDs of the checked results"""
+        return self.results_model.checked_ids()
     
     def save_to_results(self):
         if not hasattr(self, 'current_fft_data'):
@@ -1239,17 +3127,12 @@ class FFTAnalyzerApp:
         
         try:
             # Generate unique ID
-            result_id = len(self.fft_results) + 1
+            result_id = self.results_model.add(self.current_fft_data)
             self.fft_results[result_id] = self.current_fft_data.copy()
             
-            # Add to treeview
-            item_id = self.results_tree.insert('', 'end', 
-                                text=str(result_id),
-                                values=('☐', self.current_fft_data['analysis_name'], 
-                                        self.current_fft_data['timestamp']))
-            
-            # Initialize checkbox state
-            self.checkbox_states[item_id] = False
+            # Show in the results list
+            self.update_results_filter_choices()
+            self.render_results()
             
             self.color_index += 1  # Move to next color for next analysis
             messagebox.showinfo("Success", "Results saved to Combined Results tab!")
@@ -1257,42 +3140,153 @@ class FFTAnalyzerApp:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save results:\n{str(e)}")
     
-    def plot_combined_results(self):
-        checked_items = self.get_checked_items()
-        if not checked_items:
-            messagebox.showwarning("Warning", "Please check some results to plot.")
+    def get_combined_line(self, result_id):
+        """Return the combined plot line of a saved result, creating it on first use"""
+        line = self.combined_lines.get(result_id)
+        if line is None:
+            data = self.fft_results[result_id]
+            frequencies, amplitudes = self.result_curve(data)
+            line = self.combined_ax.plot(frequencies, amplitudes, 
+                                         color=data['color'], linewidth=1.5, 
+                                         label=data['display_name'], alpha=0.8)[0]
+            self.combined_ax.set_yscale('log')
+            self.combined_lines[result_id] = line
+        return line
+    
+    def result_curve(self, data):
+        """Curve of a saved result: its spectrum without DC, or the binned maxima of a summary"""
+        if 'frequencies' in data:
+            return data['frequencies'][1:], data['amplitudes'][1:]
+        return summary_curve(data['summary'])
+    
+    def export_summaries(self):
+        """Write the compact summaries of the checked results to one archive file"""
+        summaries = [self.fft_results[result_id]['summary'] for result_id in self.get_checked_items() 
+                     if 'summary' in self.fft_results[result_id]]
+        if not summaries:
+            messagebox.showwarning("Warning", "Please check some results to export.")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Export Summaries",
+            defaultextension=".npz",
+            filetypes=[("NumPy archives", "*.npz"), ("All files", "*.*")]
+        )
+        if file_path:
+            try:
+                save_summaries(file_path, summaries)
+                messagebox.showinfo("Success", f"{len(summaries)} summaries exported to {file_path} "
+                                               f"({os.path.getsize(file_path) / 1024:.1f} KB)")
+            except Exception as e:
+                messagebox.showerror("Error", f"Export failed:\n{str(e)}")
+    
+    def import_summaries(self):
+        """Add archived summaries to the saved results; they plot as binned maximum curves"""
+        file_paths = filedialog.askopenfilenames(
+            title="Import Summaries",
+            filetypes=[("NumPy archives", "*.npz"), ("All files", "*.*")]
+        )
+        if not file_paths:
             return
         
         try:
-            self.combined_ax.clear()
-            self.combined_data = {}  # Clear previous combined data
-            self.combined_permanent_annotations.clear()  # Clear permanent annotations
+            imported = []
+            for file_path in file_paths:
+                for summary in load_summaries(file_path):
+                    meta = summary['meta']
+                    data = {
+                        'summary': summary,
+                        'column': meta.get('column', ''),
+                        'display_name': meta.get('display_name') or meta.get('column', ''),
+                        'analysis_name': meta.get('analysis_name') or os.path.basename(file_path),
+                        'window_func': meta.get('window_func', ''),
+                        'timestamp': meta.get('timestamp', ''),
+                        'color': self.current_colors[self.color_index % len(self.current_colors)]
+                    }
+                    imported.append(data)
+                    self.color_index += 1
+            # One view rebuild for the whole import instead of one per summary
+            for result_id, data in zip(self.results_model.add_many(imported), imported):
+                self.fft_results[result_id] = data
+            self.update_results_filter_choices()
+            self.render_results()
+            messagebox.showinfo("Success", f"Imported {len(imported)} summaries.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Import failed:\n{str(e)}")
+    
+    def set_combined_visibility(self, visibility):
+        """Show or hide result lines in the combined plot, redrawing only if something changed
+        
+        visibility maps result IDs to whether their line should be shown.
+        Lines are created the first time they are shown and kept afterwards.
+        """
+        changed = False
+        for result_id, visible in visibility.items():
+            if visible:
+                is_new = result_id not in self.combined_lines
+                line = self.get_combined_line(result_id)
+                changed |= is_new
+            else:
+                line = self.combined_lines.get(result_id)
+                if line is None:
+                    continue
             
-            for item in checked_items:
-                result_id = int(self.results_tree.item(item, 'text'))
+            if line.get_visible() != visible:
+                line.set_visible(visible)
+                changed = True
+            
+            # Keep hover data in sync with the visible lines
+            if visible:
                 data = self.fft_results[result_id]
-                
-                # Plot the data
-                self.combined_ax.semilogy(data['frequencies'][1:], data['amplitudes'][1:], 
-                                        color=data['color'], linewidth=1.5, 
-                                        label=data['display_name'], alpha=0.8)
-                
-                # Store data for hover functionality
+                frequencies, amplitudes = self.result_curve(data)
                 self.combined_data[result_id] = {
-                    'frequencies': data['frequencies'],
-                    'amplitudes': data['amplitudes'],
+                    'frequencies': frequencies,
+                    'amplitudes': amplitudes,
                     'display_name': data['display_name'],
                     'color': data['color']
                 }
-            
-            self.combined_ax.set_xlabel('Frequency (Hz)')
-            self.combined_ax.set_ylabel('Amplitude')
-            self.combined_ax.set_title('Combined FFT Results')
-            self.combined_ax.grid(True, alpha=0.3)
-            self.combined_ax.legend()
-            
+            else:
+                self.combined_data.pop(result_id, None)
+        
+        if changed:
+            self.refresh_combined_view()
+    
+    def remove_combined_lines(self, result_ids):
+        """Remove the combined plot lines of deleted results"""
+        changed = False
+        for result_id in result_ids:
+            line = self.combined_lines.pop(result_id, None)
+            self.combined_data.pop(result_id, None)
+            if line is not None:
+                line.remove()
+                changed = True
+        if changed:
+            self.refresh_combined_view()
+    
+    def refresh_combined_view(self):
+        """Update legend and limits for the visible lines and schedule a redraw"""
+        visible = [line for line in self.combined_lines.values() if line.get_visible()]
+        if visible:
+            self.combined_ax.legend(handles=visible)
+        elif self.combined_ax.get_legend() is not None:
+            self.combined_ax.get_legend().remove()
+        
+        self.combined_ax.relim(visible_only=True)
+        self.combined_ax.autoscale_view()
+        self.combined_canvas.draw_idle()
+    
+    def plot_combined_results(self):
+        checked_items = self.get_checked_items()
+        if not checked_items:
+            messagebox.showwarning("Warning", "Please check some results to plot.")
+            return
+        
+        try:
+            checked_ids = set(checked_items)
+            self.set_combined_visibility({result_id: result_id in checked_ids 
+                                          for result_id in self.fft_results})
+            self.refresh_combined_view()
             self.combined_fig.tight_layout()
-            self.combined_canvas.draw()
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to plot results:\n{str(e)}")
@@ -1304,27 +3298,21 @@ class FFTAnalyzerApp:
             return
         
         if messagebox.askyesno("Confirm", "Remove checked results?"):
-            for item in checked_items:
-                result_id = int(self.results_tree.item(item, 'text'))
-                if result_id in self.fft_results:
-                    del self.fft_results[result_id]
-                # Remove from checkbox states
-                if item in self.checkbox_states:
-                    del self.checkbox_states[item]
-                self.results_tree.delete(item)
+            for result_id in checked_items:
+                self.fft_results.pop(result_id, None)
+            self.results_model.remove(checked_items)
+            self.update_results_filter_choices()
+            self.render_results()
+            self.remove_combined_lines(checked_items)
     
     def clear_all_results(self):
         if messagebox.askyesno("Confirm", "Clear all saved results?"):
             self.fft_results.clear()
-            self.checkbox_states.clear()  # Clear checkbox states
-            for item in self.results_tree.get_children():
-                self.results_tree.delete(item)
-            self.combined_ax.clear()
-            self.combined_ax.set_xlabel('Frequency (Hz)')
-            self.combined_ax.set_ylabel('Amplitude')
-            self.combined_ax.set_title('Combined FFT Results')
-            self.combined_ax.grid(True, alpha=0.3)
-            self.combined_canvas.draw()
+            self.results_model.clear()
+            self.update_results_filter_choices()
+            self.render_results()
+            self.clear_combined_permanent_annotations()
+            self.remove_combined_lines(list(self.combined_lines))
     
     def export_combined_plot(self):
         if not self.fft_results:
@@ -1338,64 +3326,44 @@ class FFTAnalyzerApp:
         )
         
         if file_path:
-            try:
-                self.combined_fig.savefig(file_path, dpi=300, bbox_inches='tight')
-                messagebox.showinfo("Success", f"Combined plot exported to {file_path}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Export failed:\n{str(e)}")
+            self.export_figure_in_background(self.combined_fig, file_path,
+                                             f"Combined plot exported to {file_path}")
+    
+    def get_peak_params(self):
+        """Collect the current peak detection parameters from the settings UI"""
+        return {
+            'threshold_mode': self.threshold_mode_var.get(),
+            'relative_threshold': self.relative_threshold_var.get(),
+            'absolute_threshold': self.absolute_threshold_var.get(),
+            'statistical_factor': self.statistical_factor_var.get(),
+            'noise_margin_db': self.noise_margin_var.get(),
+            'noise_window': self.noise_window_var.get(),
+            'noise_percentile': self.noise_percentile_var.get(),
+            'min_distance': self.min_distance_var.get(),
+            'window_size': self.window_size_var.get(),
+            'skip_dc': self.skip_dc_var.get()
+        }
+    
+    def get_multitaper_params(self):
+        """Collect the current multitaper parameters from the settings UI"""
+        return {
+            'nw': self.multitaper_nw_var.get(),
+            'n_tapers': self.multitaper_tapers_var.get(),
+            'adaptive': self.multitaper_adaptive_var.get()
+        }
+    
+    def analysis_settings(self):
+        """Settings dictionary of the current window, precision, peak and multitaper choices for the batch tools"""
+        settings = dict(self.settings, window_function=self.window_var.get(), 
+                        processing_precision=self.precision_var.get())
+        settings.update({PEAK_SETTING_KEYS[param]: value for param, value in self.get_peak_params().items()})
+        settings.update({MULTITAPER_SETTING_KEYS[param]: value 
+                         for param, value in self.get_multitaper_params().items()})
+        return settings
     
     def detect_peaks_advanced(self, amplitude, frequencies):
         """Advanced peak detection using configurable settings"""
-        peaks_idx = []
-        
-        # Get settings
-        threshold_mode = self.threshold_mode_var.get()
-        min_distance = self.min_distance_var.get()
-        window_size = self.window_size_var.get()
-        skip_dc = self.skip_dc_var.get()
-        
-        # Determine start index (skip DC if requested)
-        start_idx = 1 if skip_dc else 0
-        
-        # Calculate threshold based on mode
-        if threshold_mode == "relative":
-            threshold = np.max(amplitude) * self.relative_threshold_var.get()
-        elif threshold_mode == "absolute":
-            threshold = self.absolute_threshold_var.get()
-        elif threshold_mode == "statistical":
-            mean_amp = np.mean(amplitude[start_idx:])
-            std_amp = np.std(amplitude[start_idx:])
-            threshold = mean_amp + self.statistical_factor_var.get() * std_amp
-        else:
-            threshold = 0  # Fallback
-        
-        # Find local maxima
-        for i in range(start_idx + window_size, len(amplitude) - window_size):
-            # Check if current point is a local maximum within the window
-            is_maximum = True
-            for j in range(-window_size, window_size + 1):
-                if j != 0 and amplitude[i] <= amplitude[i + j]:
-                    is_maximum = False
-                    break
-            
-            # Check if above threshold
-            if is_maximum and amplitude[i] > threshold:
-                # Check minimum distance from existing peaks
-                too_close = False
-                for existing_peak in peaks_idx:
-                    if abs(i - existing_peak) < min_distance:
-                        # Keep the higher peak
-                        if amplitude[i] > amplitude[existing_peak]:
-                            peaks_idx.remove(existing_peak)
-                        else:
-                            too_close = True
-                        break
-                
-                if not too_close:
-                    peaks_idx.append(i)
-        
-        return peaks_idx
+        return detect_peaks(amplitude, self.get_peak_params())
     
     def on_threshold_mode_changed(self, event=None):
         """Show/hide appropriate threshold setting frame based on mode"""
@@ -1405,6 +3373,7 @@ class FFTAnalyzerApp:
         self.relative_frame.pack_forget()
         self.absolute_frame.pack_forget()
         self.statistical_frame.pack_forget()
+        self.noise_floor_frame.pack_forget()
         
         # Show the appropriate frame
         if mode == "relative":
@@ -1413,6 +3382,8 @@ class FFTAnalyzerApp:
             self.absolute_frame.pack(fill=tk.X, pady=(5, 10))
         elif mode == "statistical":
             self.statistical_frame.pack(fill=tk.X, pady=(5, 10))
+        elif mode == "noise_floor":
+            self.noise_floor_frame.pack(fill=tk.X, pady=(5, 10))
     
     def update_relative_label(self, value):
         """Update relative threshold label"""
@@ -1424,6 +3395,11 @@ class FFTAnalyzerApp:
         val = float(value)
         self.stat_value_label.configure(text=f"{val:.1f}")
     
+    def update_noise_margin_label(self, value):
+        """Update noise floor margin label"""
+        val = float(value)
+        self.noise_margin_label.configure(text=f"{val:.1f}")
+    
     def update_distance_label(self, value):
         """Update minimum distance label"""
         val = int(float(value))
@@ -1482,6 +3458,39 @@ class FFTAnalyzerApp:
         self.face_color_label.configure(text='yellow')
         self.edge_color_label.configure(text='orange')
     
+    def configure_fft_backend(self):
+        """Apply the FFT backend setting and tune the current range length in the background"""
+        self.fft_selector = configure('fft_analyzer_settings.json', self.fft_backend_var.get())
+        self.fft_selector.request_tuning(max(self.lines_var.get(), 1), self.precision_var.get())
+    
+    def retune_fft_backend(self):
+        """Forget the tuned backends so each size class is benchmarked again"""
+        self.fft_selector.clear()
+        self.configure_fft_backend()
+        messagebox.showinfo("FFT Backend", "Tuning results cleared. Each size class is benchmarked again "
+                                           "in the background on its first analysis.")
+    
+    def configure_spectrum_cache(self):
+        """Open the spectrum cache at the configured directory and size bound"""
+        self.spectrum_cache = SpectrumCache(self.spectrum_cache_dir_var.get() or DEFAULT_CACHE_DIR, 
+                                            max(self.spectrum_cache_mb_var.get(), 1) * 1024 * 1024)
+        self.update_spectrum_cache_label()
+    
+    def update_spectrum_cache_label(self):
+        count, total = self.spectrum_cache.usage()
+        self.spectrum_cache_label.configure(text=f"{count} entries, {total / (1024 * 1024):.1f} MB")
+    
+    def select_spectrum_cache_dir(self):
+        directory = filedialog.askdirectory(title="Select Spectrum Cache Directory")
+        if directory:
+            self.spectrum_cache_dir_var.set(directory)
+            self.configure_spectrum_cache()
+    
+    def clear_spectrum_cache(self):
+        if messagebox.askyesno("Clear Cache", "Remove all cached spectra and peaks?"):
+            self.spectrum_cache.clear()
+            self.update_spectrum_cache_label()
+    
     def save_settings(self):
         # Save all peak detection settings
         self.settings['peak_labels_count'] = self.peak_count_var.get()
@@ -1489,6 +3498,9 @@ class FFTAnalyzerApp:
         self.settings['peak_relative_threshold'] = self.relative_threshold_var.get()
         self.settings['peak_absolute_threshold'] = self.absolute_threshold_var.get()
         self.settings['peak_statistical_factor'] = self.statistical_factor_var.get()
+        self.settings['peak_noise_margin_db'] = self.noise_margin_var.get()
+        self.settings['peak_noise_window'] = self.noise_window_var.get()
+        self.settings['peak_noise_percentile'] = self.noise_percentile_var.get()
         self.settings['peak_min_distance'] = self.min_distance_var.get()
         self.settings['peak_window_size'] = self.window_size_var.get()
         self.settings['skip_dc_component'] = self.skip_dc_var.get()
@@ -1497,6 +3509,21 @@ class FFTAnalyzerApp:
         # Save pin color settings
         self.settings['pin_face_color'] = self.pin_face_color_var.get()
         self.settings['pin_edge_color'] = self.pin_edge_color_var.get()
+        self.settings['index_db_path'] = self.index_db_var.get()
+        self.settings['processing_precision'] = self.precision_var.get()
+        self.settings['persist_preview_pyramid'] = self.persist_pyramid_var.get()
+        self.settings['quality_scan'] = self.quality_scan_var.get()
+        self.settings['memory_budget_mb'] = self.memory_budget_var.get()
+        self.settings['memory_strategy'] = self.memory_strategy_var.get()
+        self.settings['fft_backend'] = self.fft_backend_var.get()
+        self.configure_fft_backend()
+        self.settings['spectrum_cache'] = self.spectrum_cache_var.get()
+        self.settings['spectrum_cache_dir'] = self.spectrum_cache_dir_var.get()
+        self.settings['spectrum_cache_mb'] = self.spectrum_cache_mb_var.get()
+        self.configure_spectrum_cache()
+        self.settings['multitaper_nw'] = self.multitaper_nw_var.get()
+        self.settings['multitaper_tapers'] = self.multitaper_tapers_var.get()
+        self.settings['multitaper_adaptive'] = self.multitaper_adaptive_var.get()
         
         try:
             with open('fft_analyzer_settings.json', 'w') as f:
@@ -1524,6 +3551,10 @@ class FFTAnalyzerApp:
                         self.absolute_threshold_var.set(self.settings.get('peak_absolute_threshold', 0.001))
                     if hasattr(self, 'statistical_factor_var'):
                         self.statistical_factor_var.set(self.settings.get('peak_statistical_factor', 1.0))
+                    if hasattr(self, 'noise_margin_var'):
+                        self.noise_margin_var.set(self.settings.get('peak_noise_margin_db', 10.0))
+                        self.noise_window_var.set(self.settings.get('peak_noise_window', 65))
+                        self.noise_percentile_var.set(self.settings.get('peak_noise_percentile', 50))
                     if hasattr(self, 'min_distance_var'):
                         self.min_distance_var.set(self.settings.get('peak_min_distance', 10))
                     if hasattr(self, 'window_size_var'):
@@ -1543,10 +3574,38 @@ class FFTAnalyzerApp:
                         self.pin_edge_color_var.set(edge_color)
                         self.edge_color_button.configure(bg=edge_color)
                         self.edge_color_label.configure(text=edge_color)
+                    
+                    if hasattr(self, 'precision_var'):
+                        self.precision_var.set(self.settings.get('processing_precision', 'float64'))
+                    
+                    if hasattr(self, 'index_db_var'):
+                        self.index_db_var.set(self.settings.get('index_db_path', 'fft_spectral_index.db'))
+                    
+                    if hasattr(self, 'persist_pyramid_var'):
+                        self.persist_pyramid_var.set(self.settings.get('persist_preview_pyramid', False))
+                    
+                    if hasattr(self, 'quality_scan_var'):
+                        self.quality_scan_var.set(self.settings.get('quality_scan', True))
+                    if hasattr(self, 'memory_budget_var'):
+                        self.memory_budget_var.set(self.settings.get('memory_budget_mb', DEFAULT_MEMORY_BUDGET_MB))
+                        self.memory_strategy_var.set(self.settings.get('memory_strategy', 'auto'))
+                    if hasattr(self, 'fft_backend_var'):
+                        self.fft_backend_var.set(self.settings.get('fft_backend', 'auto'))
+                    if hasattr(self, 'spectrum_cache_var'):
+                        self.spectrum_cache_var.set(self.settings.get('spectrum_cache', True))
+                        self.spectrum_cache_dir_var.set(self.settings.get('spectrum_cache_dir', DEFAULT_CACHE_DIR))
+                        self.spectrum_cache_mb_var.set(self.settings.get('spectrum_cache_mb', DEFAULT_CACHE_MB))
+                    if hasattr(self, 'multitaper_nw_var'):
+                        self.multitaper_nw_var.set(self.settings.get('multitaper_nw', DEFAULT_MULTITAPER_PARAMS['nw']))
+                        self.multitaper_tapers_var.set(self.settings.get('multitaper_tapers', 0))
+                        self.multitaper_adaptive_var.set(self.settings.get('multitaper_adaptive', True))
         except Exception as e:
             print(f"Failed to load settings: {e}")
 
 def main():
+    # Needed for the analysis process pools in frozen executables
+    multiprocessing.freeze_support()
+    
     root = tk.Tk()
     
     # Configure ttk style
@@ -0,0 +1,117 @@
+"""Two-channel analysis: averaged cross-spectra, transfer functions and coherence.
+
+Both columns are cut into the same overlapping segments and transformed
+together with one batched FFT, then the auto- and cross-spectral
+densities are averaged over the segments (Welch's method). With the
+'multitaper' window every segment is tapered by the same DPSS tapers as
+the single-channel spectrum, and the cross-spectra are averaged over the
+tapers as well, weighted by their concentration ratios.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import rfftfreq
+
+import fft_backends
+from fft_core import DEFAULT_MULTITAPER_PARAMS, MULTITAPER, WINDOW_FUNCTIONS
+from multitaper import dpss_tapers, fit_parameters
+
+
+def segment_view(data, nperseg, overlap=0.5):
+    """Overlapping segments of the data as rows of a strided view (no copy)"""
+    step = max(int(nperseg * (1 - overlap)), 1)
+    return sliding_window_view(data, nperseg)[::step]
+
+
+def segment_tapers(window_func, nperseg, multitaper=None):
+    """(tapers, weights, description) applied to every segment
+
+    Each taper has unit energy; the weights of the per-taper spectra sum
+    to one. The description names the window actually used.
+    """
+    if window_func == MULTITAPER:
+        params = multitaper or DEFAULT_MULTITAPER_PARAMS
+        nw, k = fit_parameters(nperseg, params['nw'], params['n_tapers'])
+        tapers, ratios = dpss_tapers(nperseg, nw, k)
+        return tapers, ratios / np.sum(ratios), f"multitaper (NW={nw:g}, {k} tapers)"
+    if window_func in WINDOW_FUNCTIONS:
+        window = WINDOW_FUNCTIONS[window_func](nperseg)
+    elif window_func == 'none':
+        window = np.ones(nperseg)
+    else:
+        raise ValueError(f"Unknown window: {window_func}")
+    return (window / np.sqrt(np.sum(window ** 2)))[np.newaxis, :], np.ones(1), window_func
+
+
+def cross_spectral_analysis(x, y, freq_hz, window_func='hann', nperseg=1024, overlap=0.5, multitaper=None):
+    """Averaged auto/cross spectral densities, H1/H2 transfer functions and coherence
+
+    x is the input (reference) channel and y the output channel. Samples
+    missing in either channel are dropped from both. Returns a dictionary
+    of one-sided spectra over 'frequencies'; 'window' describes the
+    window used. multitaper holds the parameters of the 'multitaper'
+    window.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[valid], y[valid]
+
+    nperseg = min(int(nperseg), len(x))
+    if nperseg < 4:
+        raise ValueError("Not enough valid samples for a cross-spectrum.")
+
+    # Both channels' segments in one (2, segments, nperseg) stack for a single FFT call
+    segments = np.stack([segment_view(x, nperseg, overlap), segment_view(y, nperseg, overlap)])
+    segments = segments - segments.mean(axis=-1, keepdims=True)  # Remove the mean of each segment
+    tapers, weights, window = segment_tapers(window_func, nperseg, multitaper)
+    # (2, segments, tapers, bins): every tapered copy of both channels in the same FFT call
+    spectra = fft_backends.rfft(segments[..., np.newaxis, :] * tapers, axis=-1)
+    X, Y = spectra[0], spectra[1]
+
+    # Density scaling of unit-energy tapers, doubled for the one-sided spectrum except DC and Nyquist
+    scale = np.full(X.shape[-1], 2.0 / freq_hz)
+    scale[0] /= 2
+    if nperseg % 2 == 0:
+        scale[-1] /= 2
+
+    def average(products):
+        return np.mean(np.tensordot(products, weights, axes=([1], [0])), axis=0) * scale
+
+    gxx = average(np.abs(X) ** 2)
+    gyy = average(np.abs(Y) ** 2)
+    gxy = average(np.conj(X) * Y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h1 = gxy / gxx
+        h2 = gyy / np.conj(gxy)
+        coherence = np.abs(gxy) ** 2 / (gxx * gyy)
+
+    return {
+        'frequencies': rfftfreq(nperseg, 1.0 / freq_hz),
+        'gxx': gxx,
+        'gyy': gyy,
+        'gxy': gxy,
+        'h1': h1,
+        'h2': h2,
+        'coherence': np.clip(np.nan_to_num(coherence), 0.0, 1.0),
+        'n_segments': X.shape[0],
+        'nperseg': nperseg,
+        'window': window
+    }
+
+
+def cross_spectrum_table(result):
+    """Tabulate a cross_spectral_analysis() result for CSV export"""
+    return pd.DataFrame({
+        'Frequency_Hz': result['frequencies'],
+        'Gxx': result['gxx'],
+        'Gyy': result['gyy'],
+        'Gxy_Magnitude': np.abs(result['gxy']),
+        'Gxy_Phase_deg': np.degrees(np.angle(result['gxy'])),
+        'H1_Magnitude': np.abs(result['h1']),
+        'H1_Phase_deg': np.degrees(np.angle(result['h1'])),
+        'H2_Magnitude': np.abs(result['h2']),
+        'H2_Phase_deg': np.degrees(np.angle(result['h2'])),
+        'Coherence': result['coherence']
+    })
@@ -0,0 +1,216 @@
+"""Selectable FFT backends with per-size autotuning.
+
+The spectra in fft_core and the forward transforms of the cross-spectrum,
+envelope and non-uniform analyses go through rfft() here, which
+dispatches to scipy.fft, numpy.fft or pyFFTW (when installed). With
+autotuning on, lengths are grouped in power-of-two size classes. The
+first transform of an unknown class runs on scipy.fft while a background
+thread benchmarks every available backend and worker count at the class
+length; the fastest is remembered and saved in ``fft_backend.json`` next to the
+settings file, together with the FFTW wisdom, so the benchmark runs once
+per machine and size class and never delays a transform.
+
+Without configure() the transforms use scipy.fft on one worker, as
+before; worker processes of the sweep and watch-folder tools keep that
+behaviour unless they configure the backend themselves.
+"""
+import base64
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import scipy.fft
+
+try:
+    import pyfftw
+    import pyfftw.interfaces.scipy_fft
+except ImportError:
+    pyfftw = None
+
+BACKEND_FILE = 'fft_backend.json'
+BACKEND_CHOICES = ('auto', 'scipy', 'numpy', 'pyfftw')
+AUTOTUNE_MIN_LENGTH = 4096  # Shorter transforms are not worth a benchmark
+MAX_TUNED_SIZES = 64  # Size classes remembered; the oldest are forgotten first
+BENCHMARK_SECONDS = 0.2  # Rough time spent timing one backend and worker count
+
+
+def _scipy_rfft(x, axis, workers):
+    return scipy.fft.rfft(x, axis=axis, workers=workers)
+
+
+def _numpy_rfft(x, axis, workers):
+    return np.fft.rfft(x, axis=axis)
+
+
+def _pyfftw_rfft(x, axis, workers):
+    return pyfftw.interfaces.scipy_fft.rfft(x, axis=axis, workers=workers, planner_effort='FFTW_MEASURE')
+
+
+BACKENDS = {'scipy': _scipy_rfft, 'numpy': _numpy_rfft}
+if pyfftw is not None:
+    pyfftw.interfaces.cache.enable()  # Keep plans between calls of the same shape
+    BACKENDS['pyfftw'] = _pyfftw_rfft
+THREADED_BACKENDS = ('scipy', 'pyfftw')
+
+
+def available_backends():
+    return list(BACKENDS)
+
+
+def _worker_counts(backend):
+    cpus = os.cpu_count() or 1
+    if backend not in THREADED_BACKENDS or cpus == 1:
+        return [1]
+    return sorted({1, max(cpus // 2, 1), cpus})
+
+
+def size_class(n):
+    """Power-of-two size class of an n-point transform, the length it is tuned at"""
+    return 1 << max(int(n) - 1, 1).bit_length()
+
+
+def _is_class_key(key):
+    length = key.split(':', 1)[0]
+    return length.isdigit() and int(length) > 0 and int(length) & (int(length) - 1) == 0
+
+
+def benchmark(n, dtype, backends=None, seconds=BENCHMARK_SECONDS):
+    """Time an n-point rfft of the given dtype for each backend and worker count
+
+    Returns {(backend, workers): best seconds per transform}.
+    """
+    x = np.random.default_rng(0).standard_normal(n).astype(dtype)
+    timings = {}
+    for backend in backends or available_backends():
+        transform = BACKENDS[backend]
+        for workers in _worker_counts(backend):
+            transform(x, -1, workers)  # Warm-up; plans FFTW
+            best, spent = float('inf'), 0.0
+            while spent < seconds or best == float('inf'):
+                started = time.perf_counter()
+                transform(x, -1, workers)
+                elapsed = time.perf_counter() - started
+                best, spent = min(best, elapsed), spent + elapsed
+                if elapsed > seconds:
+                    break  # One call of a huge transform is enough
+            timings[(backend, workers)] = best
+    return timings
+
+
+class BackendSelector:
+    """Chooses the backend and worker count of each transform size
+
+    choices maps 'size class:dtype' to [backend, workers]. mode is 'auto'
+    (benchmark unknown size classes in the background) or the name of a
+    backend to always use.
+    """
+
+    def __init__(self, path=None, mode='scipy', workers=1):
+        self.path = path
+        self.mode = mode
+        self.workers = workers  # Threads of a fixed threaded backend
+        self.choices = {}
+        self.pending = set()  # Size classes being benchmarked
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def load(self):
+        """Read saved choices and FFTW wisdom, ignoring a missing or damaged file"""
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, TypeError, ValueError):
+            return
+        # Choices of single lengths from older files are dropped
+        choices = [(key, value) for key, value in saved.get('choices', {}).items()
+                   if _is_class_key(key) and value[0] in BACKENDS]
+        self.choices = dict(choices[-MAX_TUNED_SIZES:])
+        if pyfftw is not None and saved.get('fftw_wisdom'):
+            pyfftw.import_wisdom(tuple(base64.b64decode(w) for w in saved['fftw_wisdom']))
+
+    def save(self):
+        if not self.path:
+            return
+        saved = {'choices': self.choices}
+        if pyfftw is not None:
+            saved['fftw_wisdom'] = [base64.b64encode(w).decode('ascii') for w in pyfftw.export_wisdom()]
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(saved, f, indent=2)
+        except OSError:
+            pass  # Tuning is only an optimization; it is redone next time
+
+    def clear(self):
+        """Forget all tuned choices, so every size class is benchmarked again"""
+        with self.lock:
+            self.choices = {}
+            self.save()
+
+    def tune(self, n, dtype):
+        """Benchmark the size class of n now and remember the fastest backend"""
+        length = size_class(n)
+        key = f"{length}:{np.dtype(dtype).name}"
+        try:
+            timings = benchmark(length, dtype)  # Outside the lock: transforms go on meanwhile
+            with self.lock:
+                self.choices.pop(key, None)
+                self.choices[key] = list(min(timings, key=timings.get))
+                while len(self.choices) > MAX_TUNED_SIZES:
+                    self.choices.pop(next(iter(self.choices)))
+                self.save()
+        finally:
+            with self.lock:
+                self.pending.discard(key)
+
+    def request_tuning(self, n, dtype):
+        """Benchmark the size class of n on a background thread unless it is known or under way"""
+        if self.mode != 'auto' or n < AUTOTUNE_MIN_LENGTH or os.getpid() != self.pid:
+            return
+        key = f"{size_class(n)}:{np.dtype(dtype).name}"
+        with self.lock:
+            if key in self.choices or key in self.pending:
+                return
+            self.pending.add(key)
+        threading.Thread(target=self.tune, args=(n, dtype), daemon=True).start()
+
+    def select(self, n, dtype):
+        """(backend, workers) for an n-point transform of the given dtype; never waits for tuning"""
+        if self.mode != 'auto':
+            backend = self.mode if self.mode in BACKENDS else 'scipy'
+            workers = self.workers if backend in THREADED_BACKENDS else 1
+        elif n < AUTOTUNE_MIN_LENGTH:
+            return 'scipy', 1
+        else:
+            choice = self.choices.get(f"{size_class(n)}:{np.dtype(dtype).name}")
+            if choice is None:
+                self.request_tuning(n, dtype)
+                choice = ['scipy', 1]
+            backend, workers = choice
+        if os.getpid() != self.pid:
+            # Forked pool workers already run in parallel: one thread each and no tuning
+            return backend, 1
+        return backend, workers
+
+
+selector = BackendSelector()
+
+
+def configure(settings_path, mode='auto', workers=None):
+    """Use mode ('auto' or a backend name), persisting choices next to settings_path
+
+    A fixed threaded backend runs on workers threads (default: all CPUs).
+    """
+    global selector
+    directory = os.path.dirname(os.path.abspath(settings_path))
+    selector = BackendSelector(os.path.join(directory, BACKEND_FILE), mode, workers or os.cpu_count() or 1)
+    selector.load()
+    return selector
+
+
+def rfft(x, axis=-1):
+    """One-sided FFT of real input along axis with the selected backend"""
+    x = np.asarray(x)
+    backend, workers = selector.select(x.shape[axis], x.dtype)
+    return BACKENDS[backend](x, axis, workers)
@@ -0,0 +1,443 @@
+"""Core FFT computations shared by the GUI and the headless tools.
+
+Nothing in here touches Tk, so the same code path can be used by the
+analyzer window, command-line indexing and background processing.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy.fft import fftfreq
+from scipy.ndimage import percentile_filter
+from scipy.signal import firwin, upfirdn
+from scipy.signal.windows import blackman, hann, hamming
+
+import fft_backends
+from loaders import is_binary_file, is_wav_file, load_binary, load_wav
+from multitaper import DEFAULT_NW, multitaper_amplitudes, taper_count
+
+WINDOW_FUNCTIONS = {
+    'blackman': blackman,
+    'hann': hann,
+    'hamming': hamming,
+}
+
+# Multitaper (DPSS) estimation, selectable like a window function
+MULTITAPER = 'multitaper'
+WINDOW_CHOICES = ('none',) + tuple(WINDOW_FUNCTIONS) + (MULTITAPER,)
+
+# Multitaper parameters and the settings keys they are stored under; n_tapers 0 = 2NW - 1
+MULTITAPER_SETTING_KEYS = {
+    'nw': 'multitaper_nw',
+    'n_tapers': 'multitaper_tapers',
+    'adaptive': 'multitaper_adaptive',
+}
+
+DEFAULT_MULTITAPER_PARAMS = {
+    'nw': DEFAULT_NW,
+    'n_tapers': 0,
+    'adaptive': True,
+}
+
+# Decimation filter cutoff relative to the decimated Nyquist frequency
+DECIMATION_CUTOFF = 0.9
+DECIMATION_CHUNK_SIZE = 1 << 20  # Input samples filtered per chunk
+
+# Selectable processing precisions
+PRECISIONS = ('float64', 'float32')
+
+# Column names treated as a time base rather than a signal
+TIME_COLUMN_NAMES = ('time', 't', 'timestamp', 'time_s')
+
+# Peak detection parameters and the settings keys they are stored under
+PEAK_SETTING_KEYS = {
+    'threshold_mode': 'peak_threshold_mode',
+    'relative_threshold': 'peak_relative_threshold',
+    'absolute_threshold': 'peak_absolute_threshold',
+    'statistical_factor': 'peak_statistical_factor',
+    'noise_margin_db': 'peak_noise_margin_db',
+    'noise_window': 'peak_noise_window',
+    'noise_percentile': 'peak_noise_percentile',
+    'min_distance': 'peak_min_distance',
+    'window_size': 'peak_window_size',
+    'skip_dc': 'skip_dc_component',
+}
+
+DEFAULT_PEAK_PARAMS = {
+    'threshold_mode': 'relative',
+    'relative_threshold': 0.1,
+    'absolute_threshold': 0.001,
+    'statistical_factor': 1.0,
+    'noise_margin_db': 10.0,
+    'noise_window': 65,
+    'noise_percentile': 50,
+    'min_distance': 10,
+    'window_size': 3,
+    'skip_dc': True,
+}
+
+
+def peak_params_from_settings(settings):
+    """Build peak detection parameters from a saved settings dictionary"""
+    params = DEFAULT_PEAK_PARAMS.copy()
+    for param, key in PEAK_SETTING_KEYS.items():
+        if key in settings:
+            params[param] = settings[key]
+    return params
+
+
+def multitaper_params_from_settings(settings):
+    """Build multitaper parameters from a saved settings dictionary"""
+    params = DEFAULT_MULTITAPER_PARAMS.copy()
+    for param, key in MULTITAPER_SETTING_KEYS.items():
+        if key in settings:
+            params[param] = settings[key]
+    # Same types as the settings UI, so stored parameters compare equal
+    return {'nw': float(params['nw']), 'n_tapers': int(params['n_tapers']), 'adaptive': bool(params['adaptive'])}
+
+
+def fft_copies(window_func, multitaper=None):
+    """Transforms per segment: the number of tapers for multitaper, else one"""
+    if window_func == MULTITAPER:
+        params = multitaper or DEFAULT_MULTITAPER_PARAMS
+        return taper_count(params['nw'], params['n_tapers'])
+    return 1
+
+
+def as_float_array(data, dtype=None):
+    """Convert data to a float array, keeping float32 input unless a dtype is given"""
+    data = np.asarray(data)
+    if dtype is not None:
+        return data.astype(dtype, copy=False)
+    if data.dtype in (np.float32, np.float64):
+        return data
+    return data.astype(np.float64)
+
+
+def load_table(file_path, descriptor=None, dtype=None):
+    """Load a data file into a DataFrame, or a memory-mapped table for binary/WAV
+
+    With dtype='float32' the signal columns are held in single precision;
+    time columns always stay in double precision.
+    """
+    if is_wav_file(file_path):
+        table = load_wav(file_path)
+    elif is_binary_file(file_path):
+        table = load_binary(file_path, descriptor)
+    else:
+        table = pd.read_csv(file_path)
+        if dtype is not None and np.dtype(dtype) != np.float64:
+            columns = numeric_columns(table)
+            table[columns] = table[columns].astype(dtype)
+        return table
+
+    if dtype is not None:
+        table.dtype = np.dtype(dtype)
+    return table
+
+
+def read_column(table, column, start_idx=0, end_idx=None):
+    """Read a row slice of a column from a DataFrame or memory-mapped table"""
+    if isinstance(table, pd.DataFrame):
+        return table[column].iloc[start_idx:end_idx].values
+    return table.column_values(column, start_idx, end_idx)
+
+
+def extract_range(table, column, start_line, n_lines=None):
+    """Extract the valid samples of a column for a 1-based row range"""
+    start_idx = start_line - 1
+    end_idx = len(table) if n_lines is None else min(start_idx + n_lines, len(table))
+    data = as_float_array(read_column(table, column, start_idx, end_idx))
+    return data[~np.isnan(data)]  # Remove NaN values
+
+
+def get_window(window_func, n, dtype=np.float64):
+    """The named window of length n, or None for a rectangular window"""
+    if window_func in WINDOW_FUNCTIONS:
+        return WINDOW_FUNCTIONS[window_func](n).astype(dtype, copy=False)
+    return None
+
+
+def apply_window(data, window_func):
+    """Apply the named window function to the data"""
+    window = get_window(window_func, data.shape[-1], data.dtype)
+    if window is not None:
+        return data * window
+    return data
+
+
+def compute_spectrum(data, freq_hz, window_func='none', multitaper=None):
+    """Compute the single-sided amplitude spectrum of the data
+
+    Float32 input is processed in single precision throughout (complex64
+    FFT, float32 amplitudes); anything else in double precision.
+    multitaper holds the parameters of the 'multitaper' window (defaults
+    if None).
+    """
+    data = as_float_array(data)
+    n = len(data)
+    T = 1.0 / freq_hz
+    xf = fftfreq(n, T)[:n//2]
+    if window_func == MULTITAPER:
+        return xf, multitaper_amplitudes(data, **(multitaper or DEFAULT_MULTITAPER_PARAMS))[:n//2]
+    data = apply_window(data, window_func)
+
+    # Perform FFT; the one-sided transform gives the same bins as a full fft
+    yf = fft_backends.rfft(data)
+    amplitude = 2.0/n * np.abs(yf[:n//2])
+    return xf, amplitude
+
+
+def compute_spectrum_batch(segments, freq_hz, window_func='none', multitaper=None):
+    """Compute the amplitude spectra of equal-length segments (one per row) in one FFT call"""
+    segments = as_float_array(segments)
+    n = segments.shape[-1]
+    if window_func == MULTITAPER:
+        # All tapers of all segments in one FFT call
+        amplitudes = multitaper_amplitudes(segments, **(multitaper or DEFAULT_MULTITAPER_PARAMS))
+        return fftfreq(n, 1.0 / freq_hz)[:n//2], amplitudes[..., :n//2]
+    segments = apply_window(segments, window_func)
+
+    # Real input, so the one-sided rfft gives the same bins as fft at half the cost
+    yf = fft_backends.rfft(segments, axis=-1)
+    xf = fftfreq(n, 1.0 / freq_hz)[:n//2]
+    amplitude = 2.0/n * np.abs(yf[..., :n//2])
+    return xf, amplitude
+
+
+@lru_cache(maxsize=32)
+def design_decimation_filter(factor, taps_per_phase=20):
+    """Linear-phase anti-aliasing FIR for decimation by the given factor
+
+    The length is a multiple of the factor plus one, so the filter delay
+    falls on an output sample and chunks line up exactly.
+    """
+    numtaps = taps_per_phase * factor + 1
+    # Cut off slightly below the new Nyquist frequency to keep aliases out of band
+    return firwin(numtaps, DECIMATION_CUTOFF / factor, window='hamming')
+
+
+def decimate(data, factor, chunk_size=DECIMATION_CHUNK_SIZE):
+    """Anti-aliased polyphase decimation, processed in chunks of output samples
+
+    The result is aligned with the input (zero phase) and has
+    ceil(len(data) / factor) samples. Works on any sliceable array,
+    including memory-mapped data, without filtering the full-rate signal
+    in one piece.
+    """
+    factor = int(factor)
+    dtype = np.float32 if getattr(data, 'dtype', None) == np.float32 else np.float64
+    if factor <= 1:
+        return as_float_array(data, dtype)
+
+    h = design_decimation_filter(factor).astype(dtype)
+    delay = (len(h) - 1) // 2
+    n = len(data)
+    n_out = -(-n // factor)
+    out = np.empty(n_out, dtype=dtype)
+
+    # Outputs per chunk, so each chunk reads about chunk_size input samples
+    step = max(chunk_size // factor, 1)
+    for m0 in range(0, n_out, step):
+        m1 = min(m0 + step, n_out)
+        lo = m0 * factor - delay
+        hi = (m1 - 1) * factor + delay + 1
+        segment = np.asarray(data[max(lo, 0):min(hi, n)], dtype=dtype)
+        if lo < 0 or hi > n:
+            segment = np.concatenate((np.zeros(max(-lo, 0), dtype), segment, np.zeros(max(hi - n, 0), dtype)))
+        # upfirdn only evaluates the kept samples of the polyphase filter
+        filtered = upfirdn(h, segment, up=1, down=factor)
+        first = (len(h) - 1) // factor
+        out[m0:m1] = filtered[first:first + (m1 - m0)]
+    return out
+
+
+def precision_report(data, freq_hz, window_func='none', significant_db=-60.0, multitaper=None):
+    """Compare the float32 spectrum of the data against the float64 reference
+
+    Reports the largest amplitude error relative to the spectrum peak, the
+    largest per-bin relative error over bins within significant_db of the
+    peak, and whether the dominant frequency agrees.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    xf, reference = compute_spectrum(data, freq_hz, window_func, multitaper)
+    _, single = compute_spectrum(data.astype(np.float32), freq_hz, window_func, multitaper)
+    single = single.astype(np.float64)
+
+    peak = np.max(reference) if len(reference) else 0.0
+    error = np.abs(single - reference)
+    significant = reference >= peak * 10 ** (significant_db / 20.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = error[significant] / reference[significant]
+
+    return {
+        'n_points': len(data),
+        'max_error_vs_peak': float(np.max(error) / peak) if peak > 0 else 0.0,
+        'max_relative_error': float(np.max(relative)) if len(relative) else 0.0,
+        'significant_db': significant_db,
+        'n_significant_bins': int(np.count_nonzero(significant)),
+        'peak_frequency_float64': float(xf[np.argmax(reference)]) if len(xf) else 0.0,
+        'peak_frequency_float32': float(xf[np.argmax(single)]) if len(xf) else 0.0,
+        # Working set: samples, windowed copy, complex FFT output and half-length amplitudes
+        'bytes_float64': data.nbytes * 9 // 2,
+        'bytes_float32': data.nbytes * 9 // 4
+    }
+
+
+def noise_floor(amplitudes, window_bins, percentile=50):
+    """Local noise floor of a spectrum: a running percentile over window_bins bins
+
+    The median (percentile 50) follows a sloping 1/f floor while ignoring
+    the narrow peaks standing above it. 2-D input gets one floor per row.
+    """
+    amplitudes = np.asarray(amplitudes, dtype=float)
+    size = max(int(window_bins), 1) | 1  # Odd, so the window is centered on its bin
+    floor = np.empty_like(amplitudes)
+    # Row by row: the 1-D running filter is O(N log W), its N-D form is not
+    for row, out in zip(amplitudes.reshape(-1, amplitudes.shape[-1]), floor.reshape(-1, floor.shape[-1])):
+        percentile_filter(row, percentile, size=size, mode='nearest', output=out)
+    return floor
+
+
+def noise_floor_threshold(amplitudes, params):
+    """Per-bin threshold the configured margin (dB) above the local noise floor"""
+    floor = noise_floor(amplitudes, params['noise_window'], params['noise_percentile'])
+    return floor * 10.0 ** (params['noise_margin_db'] / 20.0)
+
+
+def detect_peaks(amplitude, params=None):
+    """Find local maxima above the configured threshold"""
+    params = params or DEFAULT_PEAK_PARAMS
+    peaks_idx = []
+
+    threshold_mode = params['threshold_mode']
+    min_distance = params['min_distance']
+    window_size = params['window_size']
+
+    # Determine start index (skip DC if requested)
+    start_idx = 1 if params['skip_dc'] else 0
+
+    # Calculate threshold based on mode
+    if threshold_mode == "relative":
+        threshold = np.max(amplitude) * params['relative_threshold']
+    elif threshold_mode == "absolute":
+        threshold = params['absolute_threshold']
+    elif threshold_mode == "statistical":
+        mean_amp = np.mean(amplitude[start_idx:])
+        std_amp = np.std(amplitude[start_idx:])
+        threshold = mean_amp + params['statistical_factor'] * std_amp
+    elif threshold_mode == "noise_floor":
+        threshold = noise_floor_threshold(amplitude, params)
+    else:
+        threshold = 0  # Fallback
+    threshold = np.broadcast_to(threshold, np.shape(amplitude))  # One value per bin
+
+    # Find local maxima
+    for i in range(start_idx + window_size, len(amplitude) - window_size):
+        # Check if current point is a local maximum within the window
+        is_maximum = True
+        for j in range(-window_size, window_size + 1):
+            if j != 0 and amplitude[i] <= amplitude[i + j]:
+                is_maximum = False
+                break
+
+        # Check if above threshold
+        if is_maximum and amplitude[i] > threshold[i]:
+            # Check minimum distance from existing peaks
+            too_close = False
+            for existing_peak in peaks_idx:
+                if abs(i - existing_peak) < min_distance:
+                    # Keep the higher peak
+                    if amplitude[i] > amplitude[existing_peak]:
+                        peaks_idx.remove(existing_peak)
+                    else:
+                        too_close = True
+                    break
+
+            if not too_close:
+                peaks_idx.append(i)
+
+    return peaks_idx
+
+
+def peak_thresholds(amplitudes, params, start_idx=0):
+    """Detection threshold of each spectrum row for the configured threshold mode
+
+    Returns one value per row with a trailing axis of length 1, or one
+    value per bin in noise floor mode; either broadcasts against amplitudes.
+    """
+    threshold_mode = params['threshold_mode']
+    if threshold_mode == "relative":
+        return np.max(amplitudes, axis=-1, keepdims=True) * params['relative_threshold']
+    if threshold_mode == "absolute":
+        return np.full(amplitudes.shape[:-1] + (1,), params['absolute_threshold'])
+    if threshold_mode == "statistical":
+        tail = amplitudes[..., start_idx:]
+        return (np.mean(tail, axis=-1, keepdims=True)
+                + params['statistical_factor'] * np.std(tail, axis=-1, keepdims=True))
+    if threshold_mode == "noise_floor":
+        return noise_floor_threshold(amplitudes, params)
+    return np.zeros(amplitudes.shape[:-1] + (1,))  # Fallback
+
+
+def detect_peaks_batch(amplitudes, params=None):
+    """Vectorized detect_peaks() over every row of a 2-D array of spectra
+
+    Returns a boolean mask of the same shape marking the peaks of each
+    row. The local maximum and threshold tests are evaluated for all rows
+    at once; the minimum distance rule, which depends on the peaks already
+    kept, is applied bin by bin across all rows simultaneously.
+    """
+    params = params or DEFAULT_PEAK_PARAMS
+    amplitudes = np.atleast_2d(amplitudes)
+    n_rows, n_bins = amplitudes.shape
+    window_size = int(params['window_size'])
+    min_distance = params['min_distance']
+    start_idx = 1 if params['skip_dc'] else 0
+
+    thresholds = np.broadcast_to(peak_thresholds(amplitudes, params, start_idx), amplitudes.shape)
+
+    # Local maxima: strictly above every neighbour within the window
+    candidates = np.zeros(amplitudes.shape, dtype=bool)
+    lo, hi = start_idx + window_size, n_bins - window_size
+    if hi > lo:
+        centers = amplitudes[:, lo:hi]
+        local = centers > thresholds[:, lo:hi]
+        # One contiguous comparison per neighbour offset
+        for j in range(1, window_size + 1):
+            local &= centers > amplitudes[:, lo - j:hi - j]
+            local &= centers > amplitudes[:, lo + j:hi + j]
+        candidates[:, lo:hi] = local
+
+    # Minimum distance: kept peaks are always at least min_distance apart, so a
+    # new candidate only competes with the last kept peak of its row
+    peaks = np.zeros(amplitudes.shape, dtype=bool)
+    last = np.full(n_rows, -np.iinfo(np.int64).max // 2)
+    by_bin = np.ascontiguousarray(candidates.T)  # Rows of candidates per bin
+    for i in np.flatnonzero(by_bin.any(axis=1)):
+        rows = np.flatnonzero(by_bin[i])
+        previous = last[rows]
+        close = i - previous < min_distance
+        # Close candidates replace the previous peak only if they are higher
+        higher = close & (amplitudes[rows, i] > amplitudes[rows, np.maximum(previous, 0)])
+        peaks[rows[higher], previous[higher]] = False
+        accept = rows[~close | higher]
+        peaks[accept, i] = True
+        last[accept] = i
+    return peaks
+
+
+def band_energies(frequencies, amplitude, band_edges):
+    """Sum the squared amplitude of the spectrum within each frequency band"""
+    edges = np.asarray(band_edges, dtype=float)
+    bounds = np.searchsorted(frequencies, edges)
+    power = np.concatenate(([0.0], np.cumsum(amplitude ** 2)))
+    return power[bounds[1:]] - power[bounds[:-1]]
+
+
+def numeric_columns(table):
+    """List the numeric data columns of a table, excluding time columns"""
+    if not isinstance(table, pd.DataFrame):
+        return list(table.columns)
+    return [col for col in table.select_dtypes(include=np.number).columns
+            if str(col).strip().lower() not in TIME_COLUMN_NAMES]
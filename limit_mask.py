@@ -0,0 +1,233 @@
+"""Spectral limit masks for pass/fail acceptance checks.
+
+A mask is a list of (frequency, limit amplitude) corner points. Between
+corners the limit is interpolated linearly in log-amplitude, over linear
+or (optionally) logarithmic frequency; outside the corners nothing is
+checked. The limit on a spectrum's frequency grid is computed once per
+grid and reused, so checking many spectra of the same length is a single
+vectorized comparison.
+
+Usage:
+    python limit_mask.py mask.csv data/*.csv --fs 1000 --out report.csv
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from fft_core import (compute_spectrum, extract_range, load_table, multitaper_params_from_settings,
+                      numeric_columns)
+from spectral_index import load_settings_file
+from timebase import table_sample_rate
+
+REPORT_COLUMNS = ['File', 'Column', 'Result', 'Worst_Margin_dB', 'Worst_Frequency_Hz', 'Violating_Bins', 'Error']
+
+
+class LimitMask:
+    def __init__(self, frequencies, limits, log_frequency=False, name=''):
+        frequencies = np.asarray(frequencies, dtype=float)
+        limits = np.asarray(limits, dtype=float)
+        if len(frequencies) < 2 or len(frequencies) != len(limits):
+            raise ValueError("A limit mask needs at least two (frequency, limit) points.")
+        if np.any(limits <= 0):
+            raise ValueError("Limit amplitudes must be positive.")
+        if log_frequency and np.any(frequencies <= 0):
+            raise ValueError("Frequencies must be positive for a log-frequency mask.")
+        order = np.argsort(frequencies, kind='stable')
+        self.frequencies = frequencies[order]
+        self.limits = limits[order]
+        self.log_frequency = log_frequency
+        self.name = name
+        self._grids = {}  # (n_bins, first frequency, spacing) -> limit per bin
+
+    def limit_at(self, frequencies):
+        """Limit at arbitrary frequencies; NaN outside the mask"""
+        frequencies = np.asarray(frequencies, dtype=float)
+        x, corners = frequencies, self.frequencies
+        if self.log_frequency:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x, corners = np.log10(frequencies), np.log10(corners)
+        limit = 10.0 ** np.interp(x, corners, np.log10(self.limits))
+        inside = (frequencies >= self.frequencies[0]) & (frequencies <= self.frequencies[-1])
+        return np.where(inside, limit, np.nan)
+
+    def on_grid(self, frequencies):
+        """Limit over a spectrum's frequencies, cached per evenly spaced grid"""
+        frequencies = np.asarray(frequencies, dtype=float)
+        if len(frequencies) < 2:
+            return self.limit_at(frequencies)
+        key = (len(frequencies), round(float(frequencies[0]), 12), round(float(frequencies[1] - frequencies[0]), 12))
+        if key not in self._grids:
+            if len(self._grids) >= 16:
+                self._grids.pop(next(iter(self._grids)))
+            self._grids[key] = self.limit_at(frequencies)
+        return self._grids[key]
+
+    def check(self, frequencies, amplitudes):
+        """Compare one spectrum or one spectrum per row against the mask
+
+        Returns a dictionary of per-row arrays: 'passed', 'worst_margin_db'
+        (amplitude over limit in dB, positive = violation, NaN if the mask
+        covers no bin), 'worst_frequency' and 'violating_bins', plus the
+        'exceeded' boolean mask with the shape of amplitudes.
+        """
+        limit = self.on_grid(frequencies)
+        amplitudes = np.asarray(amplitudes, dtype=float)
+        rows = np.atleast_2d(amplitudes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin = 20.0 * np.log10(rows / limit)
+        covered = ~np.isnan(limit)
+        exceeded = (margin > 0) & covered
+
+        worst_margin = np.full(len(rows), np.nan)
+        worst_frequency = np.full(len(rows), np.nan)
+        if covered.any():
+            masked = np.where(covered, margin, -np.inf)
+            worst = np.argmax(masked, axis=1)
+            worst_margin = masked[np.arange(len(rows)), worst]
+            worst_frequency = np.asarray(frequencies, dtype=float)[worst]
+        result = {
+            'passed': ~exceeded.any(axis=1),
+            'worst_margin_db': worst_margin,
+            'worst_frequency': worst_frequency,
+            'violating_bins': exceeded.sum(axis=1),
+            'exceeded': exceeded
+        }
+        if amplitudes.ndim == 1:
+            result = {key: value[0] for key, value in result.items()}
+        return result
+
+    def to_frame(self):
+        return pd.DataFrame({'Frequency_Hz': self.frequencies, 'Limit': self.limits})
+
+
+def parse_mask(text, log_frequency=False, name=''):
+    """Mask from lines of 'frequency, limit' (blank lines and # comments ignored)"""
+    points = []
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            fields = line.replace(',', ' ').replace(';', ' ').split()
+            points.append((float(fields[0]), float(fields[1])))
+    if not points:
+        raise ValueError("The limit mask has no points.")
+    frequencies, limits = zip(*points)
+    return LimitMask(frequencies, limits, log_frequency, name)
+
+
+def load_mask(path, log_frequency=False):
+    """Mask from a CSV file whose first two columns are frequency and limit"""
+    table = pd.read_csv(path, comment='#')
+    if table.shape[1] < 2:
+        raise ValueError("A mask file needs a frequency and a limit column.")
+    name = os.path.splitext(os.path.basename(path))[0]
+    return LimitMask(table.iloc[:, 0].values, table.iloc[:, 1].values, log_frequency, name)
+
+
+def save_mask(path, mask):
+    mask.to_frame().to_csv(path, index=False)
+
+
+def check_file(file_path, mask, settings, freq_hz, columns=None):
+    """Check every (or the given) numeric column of one file; returns report records
+
+    Columns of the same length share one frequency grid and are checked
+    together in one comparison.
+    """
+    multitaper = multitaper_params_from_settings(settings)
+    window_func = settings.get('window_function', 'none')
+    table = load_table(file_path, dtype=settings.get('processing_precision', 'float64'))
+    freq_hz = table_sample_rate(table, freq_hz)
+
+    spectra = {}
+    for column in columns or numeric_columns(table):
+        if column not in table.columns:
+            continue
+        data = extract_range(table, column, 1)
+        if len(data) >= 2:
+            spectra[column] = compute_spectrum(data, freq_hz, window_func, multitaper)
+
+    records = []
+    by_grid = {}
+    for column, (frequencies, amplitude) in spectra.items():
+        by_grid.setdefault(len(frequencies), []).append(column)
+    for names in by_grid.values():
+        frequencies = spectra[names[0]][0]
+        result = mask.check(frequencies, np.vstack([spectra[name][1] for name in names]))
+        for i, column in enumerate(names):
+            records.append({
+                'File': os.path.basename(file_path),
+                'Column': column,
+                'Result': 'PASS' if result['passed'][i] else 'FAIL',
+                'Worst_Margin_dB': float(result['worst_margin_db'][i]),
+                'Worst_Frequency_Hz': float(result['worst_frequency'][i]),
+                'Violating_Bins': int(result['violating_bins'][i])
+            })
+    return records
+
+
+def check_files(file_paths, mask, settings, freq_hz, columns=None, workers=None, progress=None):
+    """Check many files in a process pool and return the pass/fail report as a DataFrame
+
+    A file that cannot be analyzed gets one 'ERROR' row. The progress
+    callback receives (files done, total files).
+    """
+    workers = workers or os.cpu_count() or 1
+    records = []
+    done = 0
+
+    def collect(file_path, outcome):
+        nonlocal done
+        try:
+            records.extend(outcome())
+        except Exception as e:
+            records.append({'File': os.path.basename(file_path), 'Result': 'ERROR', 'Error': str(e)})
+        done += 1
+        if progress:
+            progress(done, len(file_paths))
+
+    if workers == 1 or len(file_paths) < 2:
+        for file_path in file_paths:
+            collect(file_path, lambda: check_file(file_path, mask, settings, freq_hz, columns))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as pool:
+            futures = {pool.submit(check_file, file_path, mask, settings, freq_hz, columns): file_path
+                       for file_path in file_paths}
+            for future in as_completed(futures):
+                collect(futures[future], future.result)
+
+    report = pd.DataFrame(records, columns=REPORT_COLUMNS)
+    return report.sort_values(['File', 'Column'], kind='stable', ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check spectra of data files against a limit mask")
+    parser.add_argument('mask', help="CSV of frequency (Hz) and limit amplitude corner points")
+    parser.add_argument('files', nargs='+', help="Data files to check")
+    parser.add_argument('--fs', type=float, default=1000.0,
+                        help="Acquisition frequency (Hz) for files without their own sample rate or time column")
+    parser.add_argument('--columns', default=None, help="Comma separated columns (default: all numeric)")
+    parser.add_argument('--log-frequency', action='store_true',
+                        help="Interpolate the mask over log frequency instead of linear frequency")
+    parser.add_argument('--settings', default='fft_analyzer_settings.json',
+                        help="Settings file providing the window function and precision")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('--out', default=None, help="Write the report to this CSV file")
+    args = parser.parse_args(argv)
+
+    mask = load_mask(args.mask, args.log_frequency)
+    columns = [c.strip() for c in args.columns.split(',')] if args.columns else None
+    report = check_files(args.files, mask, load_settings_file(args.settings), args.fs, columns, args.workers)
+    if args.out:
+        report.to_csv(args.out, index=False)
+    print(report.to_string(index=False))
+    failed = (report['Result'] != 'PASS').sum()
+    print(f"{len(report) - failed} passed, {failed} failed or errored")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
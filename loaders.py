@@ -0,0 +1,142 @@
+"""Memory-mapped loaders for raw binary and WAV recordings.
+
+The samples stay on disk behind ``np.memmap``; only the rows of the range
+being analyzed are paged in and converted to floating point.
+
+Raw binary files are described by a small JSON sidecar named after the
+file (``recording.bin.json``)::
+
+    {"dtype": "int16", "channels": 4, "sample_rate": 20000,
+     "scale": 0.001, "offset": 0.0, "header_bytes": 0,
+     "channel_names": ["Thrust", "Current", "Load_Cell_1", "Load_Cell_2"]}
+
+Only ``dtype``, ``channels`` and ``sample_rate`` are required. Integer
+recordings know their full scale from the sample type; ``"full_scale":
+[low, high]`` (in scaled units) sets it explicitly, e.g. for float
+samples or an ADC range narrower than the sample type.
+"""
+import json
+import os
+
+import numpy as np
+from scipy.io import wavfile
+
+BINARY_EXTENSIONS = ('.bin', '.raw', '.dat')
+WAV_EXTENSIONS = ('.wav',)
+BINARY_DTYPES = ('int16', 'int32', 'float32', 'float64')
+
+DEFAULT_DESCRIPTOR = {
+    'dtype': 'int16',
+    'channels': 1,
+    'sample_rate': 1000.0,
+    'scale': 1.0,
+    'offset': 0.0,
+    'header_bytes': 0,
+    'byte_order': 'little',
+}
+
+
+class MemmapTable:
+    """Column view over an interleaved sample matrix that is read lazily"""
+
+    def __init__(self, samples, columns, sample_rate, scale=1.0, offset=0.0, source_path=None, full_scale=None):
+        self.samples = samples  # (frames, channels) array, usually a np.memmap
+        self.columns = list(columns)
+        self.sample_rate = float(sample_rate)
+        self.scale = scale
+        self.offset = offset
+        self.source_path = source_path
+        self.dtype = np.dtype(np.float64)  # Precision of the values handed out
+        if full_scale is None and np.issubdtype(samples.dtype, np.integer):
+            info = np.iinfo(samples.dtype)
+            full_scale = sorted((info.min * scale + offset, info.max * scale + offset))
+        self.full_scale = tuple(float(v) for v in full_scale) if full_scale is not None else None  # Scaled rails
+
+    def __len__(self):
+        return self.samples.shape[0]
+
+    def column_values(self, column, start_idx=0, end_idx=None):
+        """Read a scaled row slice of one channel"""
+        channel = self.columns.index(column)
+        values = np.array(self.samples[start_idx:end_idx, channel], dtype=self.dtype)
+        if self.scale != 1.0:
+            values *= self.scale
+        if self.offset:
+            values += self.offset
+        return values
+
+
+def descriptor_path(file_path):
+    """Path of the JSON descriptor sidecar for a raw binary file"""
+    return file_path + '.json'
+
+
+def is_binary_file(file_path):
+    return os.path.splitext(file_path)[1].lower() in BINARY_EXTENSIONS
+
+
+def is_wav_file(file_path):
+    return os.path.splitext(file_path)[1].lower() in WAV_EXTENSIONS
+
+
+def read_descriptor(file_path):
+    """Read the sidecar descriptor of a raw binary file, or None if missing"""
+    path = descriptor_path(file_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_descriptor(file_path, descriptor):
+    with open(descriptor_path(file_path), 'w') as f:
+        json.dump(descriptor, f, indent=2)
+
+
+def load_binary(file_path, descriptor=None):
+    """Memory-map a raw interleaved binary recording"""
+    descriptor = descriptor or read_descriptor(file_path)
+    if descriptor is None:
+        raise ValueError(f"No descriptor found for raw binary file (expected {descriptor_path(file_path)})")
+    desc = DEFAULT_DESCRIPTOR.copy()
+    desc.update(descriptor)
+
+    if desc['dtype'] not in BINARY_DTYPES:
+        raise ValueError(f"Unsupported sample type '{desc['dtype']}' (use one of {', '.join(BINARY_DTYPES)})")
+    dtype = np.dtype(desc['dtype']).newbyteorder('<' if desc['byte_order'] == 'little' else '>')
+    channels = int(desc['channels'])
+    header_bytes = int(desc['header_bytes'])
+
+    frame_bytes = dtype.itemsize * channels
+    n_frames = (os.path.getsize(file_path) - header_bytes) // frame_bytes
+    if n_frames <= 0:
+        raise ValueError("File contains no complete sample frames.")
+
+    samples = np.memmap(file_path, dtype=dtype, mode='r', offset=header_bytes,
+                        shape=(n_frames, channels))
+    columns = desc.get('channel_names') or [f"Channel_{i + 1}" for i in range(channels)]
+    if len(columns) != channels:
+        raise ValueError(f"Descriptor lists {len(columns)} channel names for {channels} channels.")
+
+    return MemmapTable(samples, columns, desc['sample_rate'], desc['scale'], desc['offset'], file_path,
+                       desc.get('full_scale'))
+
+
+def load_wav(file_path):
+    """Memory-map a WAV recording, scaling integer PCM to full-scale units"""
+    sample_rate, samples = wavfile.read(file_path, mmap=True)
+    if samples.ndim == 1:
+        samples = samples.reshape(-1, 1)
+
+    scale = 1.0
+    if np.issubdtype(samples.dtype, np.integer):
+        if samples.dtype == np.uint8:
+            # 8-bit PCM is unsigned with a mid-scale zero
+            return MemmapTable(samples, _wav_columns(samples), sample_rate, 1.0 / 128, -1.0, file_path)
+        scale = 1.0 / (2 ** (8 * samples.dtype.itemsize - 1))
+
+    return MemmapTable(samples, _wav_columns(samples), sample_rate, scale, 0.0, file_path)
+
+
+def _wav_columns(samples):
+    return [f"Channel_{i + 1}" for i in range(samples.shape[1])]
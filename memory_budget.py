@@ -0,0 +1,189 @@
+"""Memory budget guard for the single-range analysis.
+
+The full-resolution path holds the samples, their NaN-free copy, the
+windowed copy, the complex FFT output, the amplitudes and the frequency
+axis of the whole range at once. Before anything is read, the peak of
+that working set is estimated from the range length and precision; if it
+exceeds the budget, the range is analyzed with one of two strategies that
+only ever hold a bounded part of it:
+
+- averaged: the range is cut into segments that fit the budget and their
+  power spectra are averaged (Welch). The full band is kept at a coarser
+  frequency resolution.
+- decimated: the range is low-pass filtered and decimated in chunks until
+  its FFT fits. The frequency resolution is kept over a narrower band.
+"""
+import numpy as np
+
+from fft_core import MULTITAPER, WINDOW_FUNCTIONS, compute_spectrum_batch, decimate
+
+DEFAULT_MEMORY_BUDGET_MB = 1024
+MEMORY_STRATEGIES = ('auto', 'averaged', 'decimated')
+READ_CHUNK = 1 << 20  # Raw samples read per pass over the range
+SEGMENTS_PER_CALL = 8  # Averaged segments transformed per FFT call
+QUALITY_BYTES_PER_SAMPLE = 56  # Float copies and masks held by scan_quality()
+TAPERED_WINDOWS = tuple(WINDOW_FUNCTIONS) + (MULTITAPER,)  # Segments overlap by half
+
+
+def fft_bytes_per_sample(itemsize, copies=1):
+    """Bytes per sample of the FFT stage: windowed copies, complex outputs, amplitudes and frequencies
+
+    copies is the number of tapered copies transformed together (the
+    tapers of a multitaper spectrum), one for an ordinary window.
+    """
+    return 4 * itemsize * copies + 8
+
+
+def estimate_full_bytes(n, itemsize, decimation=1, copies=1):
+    """Peak working set of the full-resolution path for n samples
+
+    The range, its NaN mask and NaN-free copy are held at the full rate;
+    the FFT stage runs on the decimated samples.
+    """
+    read_bytes = n * (2 * itemsize + 1)
+    n_fft = -(-n // max(decimation, 1))
+    decimated_bytes = n_fft * itemsize if decimation > 1 else 0
+    return read_bytes + decimated_bytes + n_fft * fft_bytes_per_sample(itemsize, copies)
+
+
+def format_bytes(n_bytes):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n_bytes < 1024 or unit == 'GB':
+            return f"{n_bytes:.0f} {unit}" if unit == 'B' else f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024.0
+
+
+class ValidSamples:
+    """Sliceable view of the NaN-free samples of a row range, read in chunks
+
+    read(start, end) returns raw rows of the range. One counting pass
+    records how many valid samples each chunk holds, after which any
+    slice of the valid samples is read from the chunks it overlaps, so
+    decimate() and the segment loop never need the whole range in memory.
+    """
+
+    def __init__(self, read, n_rows, dtype=np.float64, chunk_size=READ_CHUNK):
+        self.read = read
+        self.n_rows = n_rows
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+        counts = [np.count_nonzero(~np.isnan(np.asarray(read(start, min(start + chunk_size, n_rows)), dtype=float)))
+                  for start in range(0, n_rows, chunk_size)]
+        self.offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __getitem__(self, key):
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            raise ValueError("Only contiguous slices are supported.")
+        if stop <= start:
+            return np.empty(0, dtype=self.dtype)
+        first = np.searchsorted(self.offsets, start, side='right') - 1
+        last = np.searchsorted(self.offsets, stop, side='left')
+        raw = np.asarray(self.read(first * self.chunk_size, min(last * self.chunk_size, self.n_rows)),
+                         dtype=self.dtype)
+        valid = raw[~np.isnan(raw)]
+        return valid[start - self.offsets[first]:stop - self.offsets[first]]
+
+
+def averaged_segment_length(n, itemsize, budget_bytes, copies=1):
+    """Longest power-of-two segment whose batched FFT fits the budget, at most n"""
+    # Each batch holds the samples it spans, its segments, their windowed copies, the rfft
+    # outputs and amplitudes, next to the raw chunks read to fill it
+    per_sample = SEGMENTS_PER_CALL * (4 * copies + 1) * itemsize
+    available = budget_bytes - 2 * READ_CHUNK * itemsize
+    length = 1 << int(np.log2(max(available // per_sample, 2)))
+    return int(min(length, 1 << int(np.log2(max(n, 2)))))
+
+
+def averaged_spectrum(samples, freq_hz, window_func, segment_length, multitaper=None):
+    """Welch-averaged amplitude spectrum of the samples in segments of segment_length
+
+    Windowed segments overlap by half. Averaging is done on power, so a
+    stationary sine keeps its amplitude. Returns (frequencies,
+    amplitudes, n_segments).
+    """
+    n = len(samples)
+    step = segment_length // 2 if window_func in TAPERED_WINDOWS else segment_length
+    starts = np.arange(0, n - segment_length + 1, step)
+    power = None
+    for i in range(0, len(starts), SEGMENTS_PER_CALL):
+        batch = starts[i:i + SEGMENTS_PER_CALL]
+        block = samples[int(batch[0]):int(batch[-1]) + segment_length]
+        segments = np.stack([block[s - batch[0]:s - batch[0] + segment_length] for s in batch])
+        frequencies, amplitudes = compute_spectrum_batch(segments, freq_hz, window_func, multitaper)
+        batch_power = np.sum(amplitudes.astype(np.float64) ** 2, axis=0)
+        power = batch_power if power is None else power + batch_power
+    return frequencies, np.sqrt(power / len(starts)).astype(amplitudes.dtype), len(starts)
+
+
+def plan_analysis(n, itemsize, budget_bytes, strategy='auto', decimation=1, quality_scan=False, copies=1):
+    """Choose how to analyze n samples within the memory budget
+
+    Returns a dictionary with the 'strategy' ('full', 'averaged' or
+    'decimated'), its parameters ('segment_length', 'decimation'), the
+    estimated bytes of the full path and of the chosen one, whether the
+    quality scan fits, and a human-readable 'reason'. copies is the
+    number of tapered copies per transform (see fft_bytes_per_sample).
+    """
+    decimation = max(int(decimation), 1)
+    full_bytes = estimate_full_bytes(n, itemsize, decimation, copies)
+    scan_fits = quality_scan and full_bytes + n * QUALITY_BYTES_PER_SAMPLE <= budget_bytes
+    plan = {'strategy': 'full', 'decimation': decimation, 'segment_length': None,
+            'full_bytes': full_bytes, 'bytes': full_bytes, 'quality_scan': scan_fits, 'reason': ''}
+    if full_bytes <= budget_bytes:
+        if quality_scan and not scan_fits:
+            plan['reason'] = (f"Data quality scan skipped: it would need another "
+                              f"{format_bytes(n * QUALITY_BYTES_PER_SAMPLE)} (budget {format_bytes(budget_bytes)})")
+        return plan
+
+    # A user-chosen decimation shows interest in the low band: keep decimating
+    if strategy == 'auto':
+        strategy = 'decimated' if decimation > 1 else 'averaged'
+    needs = (f"The full-resolution analysis of {n:,} samples needs about {format_bytes(full_bytes)}, "
+             f"over the {format_bytes(budget_bytes)} memory budget")
+
+    if strategy == 'decimated':
+        # Chunked reads and decimation hold a few read chunks; the rest goes to the FFT
+        overhead = 4 * READ_CHUNK * itemsize
+        per_sample = fft_bytes_per_sample(itemsize, copies) + itemsize
+        factor = max(decimation, 2, int(-(-n * per_sample // max(budget_bytes - overhead, per_sample))))
+        n_out = -(-n // factor)
+        plan.update(strategy='decimated', decimation=factor, bytes=overhead + n_out * per_sample,
+                    reason=f"{needs}. Decimated by {factor} in chunks instead: the frequency resolution is "
+                           f"kept, the band is limited to 1/{factor} of the original.")
+    else:
+        length = averaged_segment_length(n, itemsize, budget_bytes, copies)
+        plan.update(strategy='averaged', decimation=1, segment_length=length,
+                    bytes=SEGMENTS_PER_CALL * length * (4 * copies + 1) * itemsize + 2 * READ_CHUNK * itemsize,
+                    reason=f"{needs}. Averaged the spectra of {length:,}-sample segments instead: the full "
+                           f"band is kept at {n / length:.0f}x coarser frequency resolution.")
+    plan['quality_scan'] = False
+    if quality_scan:
+        plan['reason'] += " The data quality scan was skipped."
+    return plan
+
+
+def run_plan(plan, read, n_rows, freq_hz, window_func, dtype=np.float64, multitaper=None):
+    """Analyze rows [0, n_rows) of read(start, end) with a chunked plan
+
+    Returns (frequencies, amplitudes, n_valid, info), where n_valid is the
+    number of NaN-free samples used and info describes what was done.
+    """
+    samples = ValidSamples(read, n_rows, dtype)
+    n_valid = len(samples)
+    if n_valid == 0:
+        raise ValueError("No valid data found in selected range.")
+
+    if plan['strategy'] == 'decimated':
+        factor = plan['decimation']
+        data = decimate(samples, factor)
+        frequencies, amplitudes = compute_spectrum_batch(data[np.newaxis, :], freq_hz / factor, window_func,
+                                                         multitaper)
+        return frequencies, amplitudes[0], n_valid, f"decimated by {factor} ({len(data)} points)"
+
+    length = min(plan['segment_length'], 1 << int(np.log2(max(n_valid, 2))))
+    frequencies, amplitudes, n_segments = averaged_spectrum(samples, freq_hz, window_func, length, multitaper)
+    return frequencies, amplitudes, n_valid, f"{n_segments} averaged segments of {length} points"
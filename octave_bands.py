@@ -0,0 +1,100 @@
+"""Fractional-octave band levels of amplitude spectra.
+
+Band centers and edges follow the base-10 series of IEC 61260 / ANSI
+S1.11 (octave ratio 10^0.3, reference 1 kHz). The bins of a spectrum
+are summed into bands with a sparse bin-to-band matrix that is built
+once per (number of bins, bin width, fraction), so the band levels of
+many spectra of the same shape are a single sparse matrix product.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from fft_core import get_window
+
+OCTAVE_FRACTIONS = {'1/1': 1, '1/3': 3, '1/12': 12}
+OCTAVE_RATIO = 10 ** 0.3
+REFERENCE_FREQUENCY = 1000.0
+
+
+def band_edges(fraction, f_min, f_max):
+    """Center, lower and upper frequencies of the 1/fraction octave bands covering [f_min, f_max]"""
+    b = int(fraction)
+    if f_min <= 0 or f_max <= f_min:
+        raise ValueError("The frequency range must be positive and increasing.")
+    # Band index x gives the center 1 kHz * G^(x/b) (odd b) or G^((2x+1)/(2b)) (even b)
+    offset = 0.0 if b % 2 else 0.5
+    to_index = lambda f: np.log(f / REFERENCE_FREQUENCY) / np.log(OCTAVE_RATIO) * b - offset
+    indices = np.arange(np.floor(to_index(f_min)), np.ceil(to_index(f_max)) + 1)
+    centers = REFERENCE_FREQUENCY * OCTAVE_RATIO ** ((indices + offset) / b)
+    half_band = OCTAVE_RATIO ** (1.0 / (2 * b))
+    lower, upper = centers / half_band, centers * half_band
+    keep = (upper > f_min) & (lower < f_max)
+    return centers[keep], lower[keep], upper[keep]
+
+
+@lru_cache(maxsize=32)
+def band_matrix(n_bins, bin_width, fraction):
+    """Sparse (bands x bins) matrix summing spectrum bins k * bin_width into their bands
+
+    Returns (centers, lower, upper, matrix). The DC bin and bands holding
+    no bin are left out.
+    """
+    frequencies = np.arange(n_bins) * bin_width
+    f_max = frequencies[-1] if n_bins > 1 else bin_width
+    centers, lower, upper = band_edges(fraction, bin_width, f_max + bin_width / 2)
+
+    # Each bin belongs to the band whose [lower, upper) interval contains it
+    bins = np.arange(1, n_bins)
+    band = np.searchsorted(upper, frequencies[bins], side='right')
+    inside = (band < len(centers))
+    bins, band = bins[inside], band[inside]
+    inside = frequencies[bins] >= lower[band]
+    bins, band = bins[inside], band[inside]
+
+    used = np.unique(band)
+    row = np.searchsorted(used, band)
+    matrix = csr_matrix((np.ones(len(bins)), (row, bins)), shape=(len(used), n_bins))
+    return centers[used], lower[used], upper[used], matrix
+
+
+def band_levels(frequencies, amplitudes, fraction, window_func='none'):
+    """RMS level in each fractional-octave band of one or more amplitude spectra
+
+    amplitudes holds one spectrum per row (or a single 1-D spectrum) over
+    the evenly spaced frequencies, as produced by compute_spectrum(). A
+    bin of amplitude A contributes A^2 / 2, the mean square of a sine of
+    that amplitude, divided by the power gain of the window the spectrum
+    was computed with. Returns (centers, lower, upper, rms) with one rms
+    row per spectrum.
+    """
+    frequencies = np.asarray(frequencies, dtype=float)
+    if len(frequencies) < 2:
+        raise ValueError("At least two frequency bins are needed for band levels.")
+    bin_width = round(float(frequencies[1] - frequencies[0]), 12)  # Rounded so equal grids share a matrix
+    centers, lower, upper, matrix = band_matrix(len(frequencies), bin_width, OCTAVE_FRACTIONS.get(fraction, fraction))
+
+    amplitudes = np.asarray(amplitudes, dtype=float)
+    power = np.atleast_2d(amplitudes) ** 2 / 2.0
+    window = get_window(window_func, 2 * len(frequencies))
+    if window is not None:
+        power /= np.mean(window ** 2)
+    rms = np.sqrt(matrix.dot(power.T).T)
+    return centers, lower, upper, rms[0] if amplitudes.ndim == 1 else rms
+
+
+def level_db(rms, reference=1.0):
+    """Band levels in dB relative to the reference RMS value"""
+    with np.errstate(divide='ignore'):
+        return 20.0 * np.log10(np.asarray(rms) / reference)
+
+
+def band_table(centers, lower, upper, rms, names):
+    """Tabulate band levels of several spectra, one RMS and dB column pair per name"""
+    table = pd.DataFrame({'Center_Hz': centers, 'Lower_Hz': lower, 'Upper_Hz': upper})
+    for name, values in zip(names, np.atleast_2d(rms)):
+        table[f"{name}_RMS"] = values
+        table[f"{name}_dB"] = level_db(values)
+    return table
@@ -0,0 +1,150 @@
+"""Peak tracking over time.
+
+The selected range is cut into frames whose spectra are computed in
+batched FFTs, the peaks of all frames are found at once with
+detect_peaks_batch(), and the strongest peaks of consecutive frames are
+linked into tracks by minimum-cost frequency matching.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.optimize import linear_sum_assignment
+
+from fft_core import as_float_array, compute_spectrum_batch, detect_peaks_batch
+
+FRAMES_PER_BLOCK = 1024  # Frames transformed per FFT call, bounding temporary memory
+
+
+def frame_spectra(data, freq_hz, frame_length, hop, window_func='hann', multitaper=None):
+    """Amplitude spectra of overlapping frames
+
+    Returns (frame center times in seconds, frequencies, amplitudes) with
+    one amplitude row per frame, kept in the precision of the input data.
+    """
+    data = as_float_array(data)
+    if len(data) < frame_length:
+        raise ValueError(f"The range has fewer samples ({len(data)}) than one frame ({frame_length}).")
+    frames = sliding_window_view(data, frame_length)[::max(int(hop), 1)]
+
+    blocks = []
+    for i in range(0, len(frames), FRAMES_PER_BLOCK):
+        frequencies, amplitudes = compute_spectrum_batch(frames[i:i + FRAMES_PER_BLOCK], freq_hz, window_func,
+                                                          multitaper)
+        blocks.append(amplitudes.astype(data.dtype, copy=False))
+
+    times = (np.arange(len(frames)) * max(int(hop), 1) + frame_length / 2.0) / freq_hz
+    return times, frequencies, np.vstack(blocks)
+
+
+def strongest_peaks(amplitudes, peak_mask, frequencies, count):
+    """Frequencies and amplitudes of the strongest peaks of every frame
+
+    Returns two (frames, count) arrays sorted by descending amplitude and
+    padded with NaN where a frame has fewer peaks. Peak frequencies are
+    refined by quadratic interpolation between neighbouring bins.
+    """
+    n_frames, n_bins = amplitudes.shape
+    count = min(count, n_bins)
+    masked = np.where(peak_mask, amplitudes, -np.inf)
+    idx = np.argpartition(-masked, count - 1, axis=1)[:, :count]
+    values = np.take_along_axis(masked, idx, axis=1)
+    order = np.argsort(-values, axis=1)
+    idx = np.take_along_axis(idx, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+    valid = np.isfinite(values)
+
+    # Quadratic (parabolic) interpolation of the peak position
+    left = np.take_along_axis(amplitudes, np.clip(idx - 1, 0, n_bins - 1), axis=1)
+    center = np.take_along_axis(amplitudes, idx, axis=1)
+    right = np.take_along_axis(amplitudes, np.clip(idx + 1, 0, n_bins - 1), axis=1)
+    curvature = left - 2 * center + right
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offset = np.where(curvature < 0, 0.5 * (left - right) / curvature, 0.0)
+    offset = np.clip(np.nan_to_num(offset), -0.5, 0.5)
+    bin_width = frequencies[1] - frequencies[0] if len(frequencies) > 1 else 0.0
+
+    peak_freqs = np.where(valid, frequencies[idx] + offset * bin_width, np.nan)
+    peak_amps = np.where(valid, values, np.nan)
+    return peak_freqs, peak_amps
+
+
+def link_tracks(times, peak_freqs, peak_amps, max_jump_hz, max_gap_frames=2):
+    """Link per-frame peaks into tracks
+
+    Each frame's peaks are matched to the active tracks by minimum total
+    frequency change (Hungarian assignment); matches further than
+    max_jump_hz apart are rejected. Unmatched peaks start new tracks, and
+    tracks unseen for more than max_gap_frames frames are closed.
+    Returns the track table as a DataFrame.
+    """
+    records = {'Track_ID': [], 'Frame': [], 'Time_s': [], 'Frequency_Hz': [], 'Amplitude': []}
+    track_ids = np.empty(0, dtype=int)
+    track_freq = np.empty(0)
+    track_last = np.empty(0, dtype=int)
+    next_id = 1
+
+    for frame in range(len(times)):
+        present = ~np.isnan(peak_freqs[frame])
+        freqs = peak_freqs[frame][present]
+        amps = peak_amps[frame][present]
+
+        # Close tracks that have been missing for too long
+        alive = frame - track_last <= max_gap_frames + 1
+        track_ids, track_freq, track_last = track_ids[alive], track_freq[alive], track_last[alive]
+
+        assigned = np.full(len(freqs), -1)
+        if len(track_ids) and len(freqs):
+            cost = np.abs(track_freq[:, np.newaxis] - freqs[np.newaxis, :])
+            rows, cols = linear_sum_assignment(cost)
+            ok = cost[rows, cols] <= max_jump_hz
+            rows, cols = rows[ok], cols[ok]
+            assigned[cols] = rows
+            track_freq[rows] = freqs[cols]
+            track_last[rows] = frame
+
+        # Unmatched peaks start new tracks
+        new = np.flatnonzero(assigned < 0)
+        if len(new):
+            assigned[new] = np.arange(len(track_ids), len(track_ids) + len(new))
+            track_ids = np.concatenate((track_ids, np.arange(next_id, next_id + len(new))))
+            track_freq = np.concatenate((track_freq, freqs[new]))
+            track_last = np.concatenate((track_last, np.full(len(new), frame)))
+            next_id += len(new)
+
+        records['Track_ID'].append(track_ids[assigned])
+        records['Frame'].append(np.full(len(freqs), frame))
+        records['Time_s'].append(np.full(len(freqs), times[frame]))
+        records['Frequency_Hz'].append(freqs)
+        records['Amplitude'].append(amps)
+
+    table = pd.DataFrame({key: np.concatenate(value) if value else np.empty(0)
+                          for key, value in records.items()})
+    return table.sort_values(['Track_ID', 'Frame'], kind='stable').reset_index(drop=True)
+
+
+def track_summary(table, min_frames=1):
+    """One row per track with its duration and frequency/amplitude statistics"""
+    if table.empty:
+        return pd.DataFrame(columns=['Track_ID', 'Frames', 'Start_s', 'End_s', 'Mean_Frequency_Hz',
+                                     'Frequency_Drift_Hz', 'Max_Amplitude'])
+    grouped = table.groupby('Track_ID')
+    summary = pd.DataFrame({
+        'Frames': grouped['Frame'].count(),
+        'Start_s': grouped['Time_s'].min(),
+        'End_s': grouped['Time_s'].max(),
+        'Mean_Frequency_Hz': grouped['Frequency_Hz'].mean(),
+        'Frequency_Drift_Hz': grouped['Frequency_Hz'].last() - grouped['Frequency_Hz'].first(),
+        'Max_Amplitude': grouped['Amplitude'].max()
+    }).reset_index()
+    return summary[summary['Frames'] >= min_frames].reset_index(drop=True)
+
+
+def track_peaks(data, freq_hz, frame_length, hop, window_func='hann', peak_params=None,
+                peaks_per_frame=5, max_jump_hz=None, max_gap_frames=2, multitaper=None):
+    """Frame the data, detect peaks in every frame and link them into tracks"""
+    times, frequencies, amplitudes = frame_spectra(data, freq_hz, frame_length, hop, window_func, multitaper)
+    peak_mask = detect_peaks_batch(amplitudes, peak_params)
+    peak_freqs, peak_amps = strongest_peaks(amplitudes, peak_mask, frequencies, peaks_per_frame)
+    if max_jump_hz is None:
+        max_jump_hz = 3 * freq_hz / frame_length  # Three frequency bins
+    return link_tracks(times, peak_freqs, peak_amps, max_jump_hz, max_gap_frames)
@@ -0,0 +1,87 @@
+"""High-resolution figure export.
+
+The figure is copied on the calling (GUI) thread, dense traces in the copy
+are reduced to min/max pairs per output pixel and optionally rasterized,
+and the file is written on a background thread so the window stays
+responsive. Axes, labels and annotations stay vector in PDF/SVG output.
+"""
+import pickle
+import threading
+
+import numpy as np
+
+EXPORT_DPI = 300
+VECTOR_FORMATS = ('.pdf', '.svg', '.eps', '.ps')
+
+
+def minmax_decimate(x, y, x_min, x_max, n_buckets):
+    """Reduce a trace to its minimum and maximum within each of n_buckets x intervals
+
+    The x values must be ascending. Points outside [x_min, x_max] are
+    dropped, except the nearest one on each side so the trace still runs
+    to the axis edges. Returns the input unchanged if it is already small.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    lo = max(np.searchsorted(x, x_min, side='left') - 1, 0)
+    hi = min(np.searchsorted(x, x_max, side='right') + 1, len(x))
+    if hi - lo <= 4 * n_buckets or x_max <= x_min:
+        return x, y
+
+    xs, ys = x[lo:hi], y[lo:hi]
+    buckets = np.clip(((xs - x_min) / (x_max - x_min) * n_buckets).astype(int), -1, n_buckets)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(xs)])) - 1
+
+    # Minimum at the start of each bucket and maximum at its end
+    out_x = np.empty(2 * len(starts))
+    out_y = np.empty(2 * len(starts))
+    out_x[0::2] = xs[starts]
+    out_x[1::2] = xs[ends]
+    out_y[0::2] = np.minimum.reduceat(ys, starts)
+    out_y[1::2] = np.maximum.reduceat(ys, starts)
+    return out_x, out_y
+
+
+def prepare_export_figure(fig, dpi=EXPORT_DPI, rasterize=True, decimate=True, min_points=1000):
+    """Return an independent copy of the figure ready for export
+
+    Lines with more than min_points points are decimated to the pixel
+    width of their axes at the export resolution and, if requested,
+    rasterized. The original figure is left untouched.
+    """
+    export_fig = pickle.loads(pickle.dumps(fig))
+    for ax in export_fig.axes:
+        width_px = max(int(ax.get_position().width * export_fig.get_figwidth() * dpi), 1)
+        x_min, x_max = ax.get_xlim()
+        for line in ax.get_lines():
+            x, y = line.get_xdata(), line.get_ydata()
+            if np.ndim(x) != 1 or len(x) <= min_points:
+                continue
+            if decimate:
+                line.set_data(*minmax_decimate(x, y, x_min, x_max, width_px))
+            if rasterize:
+                line.set_rasterized(True)
+    return export_fig
+
+
+def export_figure_async(fig, file_path, on_done, dpi=EXPORT_DPI, rasterize=True, decimate=True):
+    """Write a copy of the figure to file on a background thread
+
+    on_done(error) is called from the worker thread when writing finishes,
+    with error None on success; GUI callers should hand it back to their
+    event loop rather than touching widgets from it.
+    """
+    export_fig = prepare_export_figure(fig, dpi, rasterize, decimate)
+
+    def write():
+        try:
+            export_fig.savefig(file_path, dpi=dpi, bbox_inches='tight')
+        except Exception as e:
+            on_done(e)
+        else:
+            on_done(None)
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,119 @@
+"""Multi-resolution min/max pyramid for the time-domain preview.
+
+Level 0 holds the minimum and maximum of every block of ``base`` samples;
+each further level combines ``factor`` blocks of the level below. The
+pyramid is built in one pass over the column (read in chunks, so memory
+mapped files are never loaded whole), after which any view of any width
+is drawn from about two values per screen pixel.
+"""
+import json
+import os
+import re
+
+import numpy as np
+
+PYRAMID_BASE = 64  # Samples per block of the finest level
+PYRAMID_FACTOR = 4  # Blocks combined per step to the next level
+BUILD_CHUNK = 1 << 22  # Samples read per pass while building
+
+
+def _block_minmax(mins, maxs, factor):
+    """Combine factor consecutive blocks, padding the last block with NaN"""
+    pad = -len(mins) % factor
+    if pad:
+        mins = np.concatenate((mins, np.full(pad, np.nan)))
+        maxs = np.concatenate((maxs, np.full(pad, np.nan)))
+    # fmin/fmax ignore NaN unless a whole block is NaN
+    return (np.fmin.reduce(mins.reshape(-1, factor), axis=1),
+            np.fmax.reduce(maxs.reshape(-1, factor), axis=1))
+
+
+class MinMaxPyramid:
+    def __init__(self, n_samples, levels, base=PYRAMID_BASE, factor=PYRAMID_FACTOR):
+        self.n_samples = n_samples
+        self.levels = levels  # [(mins, maxs), ...] from finest to coarsest
+        self.base = base
+        self.factor = factor
+
+    @classmethod
+    def build(cls, read, n_samples, base=PYRAMID_BASE, factor=PYRAMID_FACTOR, chunk_size=BUILD_CHUNK):
+        """Build the pyramid from read(start, end), which returns a row slice of the column"""
+        chunk_size = max(chunk_size // base, 1) * base
+        mins, maxs = [], []
+        for start in range(0, n_samples, chunk_size):
+            values = np.asarray(read(start, min(start + chunk_size, n_samples)), dtype=float)
+            chunk_mins, chunk_maxs = _block_minmax(values, values, base)
+            mins.append(chunk_mins)
+            maxs.append(chunk_maxs)
+
+        level = (np.concatenate(mins) if mins else np.empty(0),
+                 np.concatenate(maxs) if maxs else np.empty(0))
+        levels = [level]
+        while len(level[0]) > 1:
+            level = _block_minmax(level[0], level[1], factor)
+            levels.append(level)
+        return cls(n_samples, levels, base, factor)
+
+    def block_size(self, level):
+        return self.base * self.factor ** level
+
+    def query(self, start, end, n_pixels):
+        """Min/max envelope of rows [start, end) at about n_pixels resolution
+
+        Returns (x, y) with each block's minimum and maximum as consecutive
+        points at its first row index, ready to draw as one line, or None
+        when the range is short enough to draw the raw samples.
+        """
+        start = max(int(start), 0)
+        end = min(int(end), self.n_samples)
+        if end - start <= 4 * n_pixels:
+            return None
+
+        # Coarsest level still giving at least one block per pixel
+        level = 0
+        while (level + 1 < len(self.levels)
+               and (end - start) / self.block_size(level + 1) >= n_pixels):
+            level += 1
+        size = self.block_size(level)
+        mins, maxs = self.levels[level]
+        first, last = start // size, min(-(-end // size), len(mins))
+
+        x = np.repeat(np.arange(first, last) * size, 2)
+        y = np.empty(2 * (last - first))
+        y[0::2] = mins[first:last]
+        y[1::2] = maxs[first:last]
+        return x, y
+
+    def save(self, path, signature):
+        """Write the pyramid with the signature of the data it was built from"""
+        arrays = {}
+        for i, (mins, maxs) in enumerate(self.levels):
+            arrays[f"mins_{i}"] = mins
+            arrays[f"maxs_{i}"] = maxs
+        np.savez(path, signature=json.dumps(signature, sort_keys=True), n_samples=self.n_samples,
+                 base=self.base, factor=self.factor, n_levels=len(self.levels), **arrays)
+
+    @classmethod
+    def load(cls, path, signature):
+        """Read a saved pyramid, or return None if it is missing or out of date"""
+        try:
+            with np.load(path) as saved:
+                if str(saved['signature']) != json.dumps(signature, sort_keys=True):
+                    return None
+                levels = [(saved[f"mins_{i}"], saved[f"maxs_{i}"]) for i in range(int(saved['n_levels']))]
+                return cls(int(saved['n_samples']), levels, int(saved['base']), int(saved['factor']))
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def pyramid_path(file_path, column):
+    """Sidecar file holding the pyramid of one column of a data file"""
+    safe_column = re.sub(r'[^\w.-]+', '_', str(column))
+    return f"{file_path}.{safe_column}.minmax.npz"
+
+
+def file_signature(file_path, column, base=PYRAMID_BASE, factor=PYRAMID_FACTOR):
+    """Identity of the data a pyramid was built from, to detect stale sidecars"""
+    stat = os.stat(file_path)
+    return {'path': os.path.abspath(file_path), 'column': str(column), 'mtime': stat.st_mtime,
+            'size': stat.st_size, 'base': base, 'factor': factor}
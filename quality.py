@@ -0,0 +1,209 @@
+"""Data-quality scan of a column range before spectral analysis.
+
+One vectorized pass over the samples finds missing-value runs, clipping
+at the signal rails, flat-lines from stuck sensors, isolated spikes and
+blocks whose level or spread departs from the rest of the record
+(non-stationarity). Results are summarized for the whole range and per
+block of ``block_size`` samples.
+
+Clipping is judged against the recording's full scale when it is known
+(integer WAV/binary samples, or a descriptor ``full_scale``). Otherwise a
+run at the data's own extreme only counts when it is long and the signal
+runs into it steeply: the rounded top of a clean, quantized slow signal
+also repeats its extreme value, but approaches it in small steps.
+"""
+import numpy as np
+import pandas as pd
+
+QUALITY_BLOCK = 4096  # Samples per block for spikes and stationarity
+CLIP_MIN_RUN = 3  # Consecutive samples at the full scale that count as clipping
+CLIP_MIN_RUN_UNSCALED = 8  # Consecutive samples at the data's extreme, when the full scale is unknown
+CLIP_EDGE_RATIO = 0.5  # Slope into or out of such a run, relative to the typical non-zero step
+CLIP_EDGE_SAMPLES = 4  # Samples next to the run over which that slope is measured
+FLAT_MIN_RUN = 32  # Consecutive identical samples that count as a flat-line
+SPIKE_SIGMA = 6.0  # Deviation from the block mean, in block standard deviations
+LEVEL_SHIFT_SIGMA = 3.0  # Block mean shift, in typical block standard deviations
+SPREAD_RATIO = 3.0  # Block standard deviation ratio to the typical one
+
+
+def _runs(mask):
+    """Start indices and lengths of the runs of True in a boolean array"""
+    if len(mask) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    # Segment boundaries; segments alternate in value starting with mask[0]
+    bounds = np.concatenate(([0], np.flatnonzero(mask[1:] != mask[:-1]) + 1, [len(mask)]))
+    first = 0 if mask[0] else 1
+    starts = bounds[first:-1:2]
+    return starts, bounds[first + 1::2] - starts
+
+
+def _runs_mask(n, starts, lengths):
+    """Boolean mask covering the given runs"""
+    if len(starts) == 0:
+        return np.zeros(n, dtype=bool)
+    marks = np.bincount(starts, minlength=n + 1) - np.bincount(starts + lengths, minlength=n + 1)
+    return np.cumsum(marks[:-1]) > 0
+
+
+def _per_block(mask, block_size, n_blocks):
+    padded = np.zeros(n_blocks * block_size, dtype=bool)
+    padded[:len(mask)] = mask
+    return padded.reshape(n_blocks, block_size).sum(axis=1)
+
+
+def _steep_edges(data, starts, lengths, typical_step):
+    """True for runs approached or left at a slope of at least CLIP_EDGE_RATIO typical steps
+
+    The slope is averaged over the CLIP_EDGE_SAMPLES samples outside each
+    end of the run, so quantization of the last step does not decide it.
+    """
+    n = len(data)
+    ends = starts + lengths  # First sample after each run
+    before = starts - 1 - CLIP_EDGE_SAMPLES
+    after = ends + CLIP_EDGE_SAMPLES
+    entry = np.where(before >= 0, np.abs(data[np.maximum(starts - 1, 0)] - data[np.maximum(before, 0)]), 0.0)
+    leave = np.where(after < n, np.abs(data[np.minimum(after, n - 1)] - data[np.minimum(ends, n - 1)]), 0.0)
+    slope = np.fmax(np.nan_to_num(entry), np.nan_to_num(leave)) / CLIP_EDGE_SAMPLES
+    return slope >= CLIP_EDGE_RATIO * typical_step
+
+
+def scan_quality(data, block_size=QUALITY_BLOCK, clip_min_run=CLIP_MIN_RUN, flat_min_run=FLAT_MIN_RUN,
+                 spike_sigma=SPIKE_SIGMA, start_row=1, full_scale=None):
+    """Scan samples (NaN = missing) for quality problems
+
+    Returns a dictionary of whole-range counts, a list of human-readable
+    'issues', and a per-block DataFrame under 'blocks'. start_row is the
+    row number of the first sample, used for the block row ranges.
+    full_scale is the (low, high) range of the recording, if known; see
+    the module docstring for how clipping is found without it.
+    """
+    data = np.asarray(data, dtype=float)
+    n = len(data)
+    if n == 0:
+        raise ValueError("No samples to scan.")
+    missing = np.isnan(data)
+    nan_starts, nan_lengths = _runs(missing)
+    valid = data[~missing]
+
+    # Clipping: runs of samples sitting on the full scale, or steeply reached runs at the extremes
+    clipped = np.zeros(n, dtype=bool)
+    flat = np.zeros(n, dtype=bool)
+    low = high = np.nan
+    if len(valid):
+        if full_scale is not None:
+            low, high = full_scale
+            tolerance = 1e-6 * (high - low)
+            with np.errstate(invalid='ignore'):
+                at_rail = (data <= low + tolerance) | (data >= high - tolerance)
+            starts, lengths = _runs(at_rail)
+            keep = lengths >= clip_min_run
+        else:
+            low, high = valid.min(), valid.max()
+            at_rail = (data == low) | (data == high)
+            starts, lengths = _runs(at_rail)
+            steps = np.abs(np.diff(valid))
+            steps = steps[steps > 0]
+            keep = lengths >= max(clip_min_run, CLIP_MIN_RUN_UNSCALED)
+            if keep.any() and len(steps):
+                keep[keep] = _steep_edges(data, starts[keep], lengths[keep], np.median(steps))
+        if high > low:
+            clipped = _runs_mask(n, starts[keep], lengths[keep])
+
+        # Flat-lines: runs of identical consecutive values away from the rails
+        same = np.zeros(n, dtype=bool)
+        same[1:] = data[1:] == data[:-1]
+        starts, lengths = _runs(same)
+        starts, lengths = starts - 1, lengths + 1  # A run of k equal steps spans k + 1 samples
+        keep = lengths >= flat_min_run
+        flat = _runs_mask(n, starts[keep], lengths[keep]) & ~clipped
+    flat_starts, flat_lengths = _runs(flat)
+
+    # Block statistics from one reshape of the zero-filled samples
+    n_blocks = -(-n // block_size)
+    filled = np.zeros(n_blocks * block_size)
+    filled[:n] = np.where(missing, 0.0, data)
+    present = np.zeros(n_blocks * block_size, dtype=bool)
+    present[:n] = ~missing
+    blocks = filled.reshape(n_blocks, block_size)
+    counts = present.reshape(n_blocks, block_size).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = blocks.sum(axis=1) / counts
+        stds = np.sqrt(np.maximum((blocks ** 2).sum(axis=1) / counts - means ** 2, 0.0))
+
+    # Spikes: isolated samples far from their block's mean
+    deviation = np.abs(blocks - means[:, np.newaxis])
+    with np.errstate(invalid='ignore'):
+        spikes = (deviation > spike_sigma * stds[:, np.newaxis]) & present.reshape(n_blocks, block_size)
+    spikes = spikes.reshape(-1)[:n] & ~clipped & ~flat
+
+    # Non-stationarity: block level or spread far from the typical block
+    usable = counts >= max(block_size // 4, 2)
+    nonstationary = np.zeros(n_blocks, dtype=bool)
+    if usable.sum() >= 3:
+        typical_mean = np.median(means[usable])
+        typical_std = np.median(stds[usable])
+        if typical_std > 0:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                shifted = np.abs(means - typical_mean) > LEVEL_SHIFT_SIGMA * typical_std
+                spread = (stds > SPREAD_RATIO * typical_std) | (stds < typical_std / SPREAD_RATIO)
+            nonstationary = usable & (shifted | spread)
+
+    block_starts = np.arange(n_blocks) * block_size
+    table = pd.DataFrame({
+        'Block': np.arange(1, n_blocks + 1),
+        'Start_Row': start_row + block_starts,
+        'End_Row': start_row + np.minimum(block_starts + block_size, n) - 1,
+        'Missing': _per_block(missing, block_size, n_blocks),
+        'Clipped': _per_block(clipped, block_size, n_blocks),
+        'Flat': _per_block(flat, block_size, n_blocks),
+        'Spikes': _per_block(spikes, block_size, n_blocks),
+        'Mean': means,
+        'Std': stds,
+        'Nonstationary': nonstationary
+    })
+
+    report = {
+        'n_samples': n,
+        'block_size': block_size,
+        'missing': int(missing.sum()),
+        'missing_runs': len(nan_starts),
+        'longest_missing_run': int(nan_lengths.max()) if len(nan_lengths) else 0,
+        'clipped': int(clipped.sum()),
+        'clipped_at_rails': (int((clipped & (data <= low + (high - low) / 2)).sum()),
+                             int((clipped & (data > low + (high - low) / 2)).sum())),
+        'rails': (float(low), float(high)),
+        'flat': int(flat.sum()),
+        'longest_flat_run': int(flat_lengths.max()) if len(flat_lengths) else 0,
+        'first_flat_row': int(start_row + flat_starts[np.argmax(flat_lengths)]) if len(flat_lengths) else None,
+        'spikes': int(spikes.sum()),
+        'nonstationary_blocks': int(nonstationary.sum()),
+        'n_blocks': n_blocks,
+        'blocks': table
+    }
+    report['issues'] = _issues(report)
+    return report
+
+
+def _issues(report):
+    n = report['n_samples']
+    issues = []
+    if report['missing']:
+        issues.append(f"{report['missing']} missing samples in {report['missing_runs']} runs "
+                      f"(longest {report['longest_missing_run']})")
+    if report['clipped']:
+        rails = [f"{rail:.6g}" for rail, count in zip(report['rails'], report['clipped_at_rails']) if count]
+        issues.append(f"{report['clipped']} samples clipped at {' and '.join(rails)} "
+                      f"({100.0 * report['clipped'] / n:.2f}%)")
+    if report['flat']:
+        issues.append(f"{report['flat']} samples in flat-lines (longest {report['longest_flat_run']} "
+                      f"from row {report['first_flat_row']})")
+    if report['spikes']:
+        issues.append(f"{report['spikes']} spikes")
+    if report['nonstationary_blocks']:
+        issues.append(f"{report['nonstationary_blocks']} of {report['n_blocks']} blocks non-stationary")
+    return issues
+
+
+def describe_quality(report):
+    """One-line summary of scan_quality() results"""
+    return "; ".join(report['issues']) if report['issues'] else "no issues found"
@@ -0,0 +1,372 @@
+"""Headless PDF/HTML reports of many data files, rendered in parallel.
+
+Every numeric column of each file is analyzed with the parameters of the
+saved ``fft_analyzer_settings.json``. A report covers one file, or one
+group of files (e.g. all measurements of one motor), and holds a summary
+table, an overlay of the group's spectra, one spectrum per column with
+its peaks and the peak tables; an optional limit mask is drawn on every
+plot and its verdict added to the tables.
+
+Reports are independent, so each is written by its own worker process.
+Figures are drawn on the non-interactive Agg canvas without pyplot, and
+each worker builds its figure templates once and only updates their
+lines and labels for every plot after that. Traces are reduced to the
+plot's pixel width before drawing.
+
+Usage:
+    python report.py data/*.csv --fs 1000 --out reports/ --format pdf --group "(M\\d+)_"
+"""
+import argparse
+import base64
+import html
+import io
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from fft_core import (compute_spectrum, detect_peaks, extract_range, load_table,
+                      multitaper_params_from_settings, numeric_columns, peak_params_from_settings)
+from limit_mask import load_mask
+from plot_export import minmax_decimate
+from spectral_index import load_settings_file
+from timebase import table_sample_rate
+
+REPORT_FORMATS = ('pdf', 'html')
+FIGURE_SIZE = (10, 5)  # Inches, plots
+PAGE_SIZE = (8.27, 11.69)  # Inches, A4 table pages
+HTML_DPI = 100
+TRACE_PIXELS = 2000  # Trace points kept per spectrum: min/max pairs over this many x intervals
+TABLE_ROWS_PER_PAGE = 45
+PEAK_COLUMNS = ['File', 'Column', 'Rank', 'Frequency_Hz', 'Amplitude']
+RESULT_COLUMNS = ['Report', 'Files', 'Path', 'Status', 'Seconds', 'Error']
+
+# Figure templates of this process, built on first use and reused for every plot
+_templates = {}
+
+
+class PlotTemplate:
+    """A spectrum figure whose lines are updated in place for every plot
+
+    Traces reuse a growing pool of lines, unused lines are hidden; the
+    peak markers and limit line are single lines set or emptied.
+    """
+
+    def __init__(self, size=FIGURE_SIZE):
+        self.fig = Figure(figsize=size)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_xlabel('Frequency (Hz)')
+        self.ax.set_ylabel('Amplitude')
+        self.ax.set_yscale('log')
+        self.ax.grid(True, which='both', alpha=0.3)
+        self.lines = []
+        self.peaks, = self.ax.plot([], [], 'ro', markersize=4, label='Peaks')
+        self.limit, = self.ax.plot([], [], color='red', linestyle='--', linewidth=1.2, label='Limit')
+
+    def line(self, i):
+        while len(self.lines) <= i:
+            self.lines.append(self.ax.plot([], [], linewidth=1.0)[0])
+        return self.lines[i]
+
+    def draw(self, title, traces, peaks=None, limit=None):
+        """Show traces [(label, frequencies, amplitudes)], optional peak points and limit curve
+
+        Returns the figure, ready to be saved.
+        """
+        for i, (label, frequencies, amplitudes) in enumerate(traces):
+            line = self.line(i)
+            line.set_data(frequencies, amplitudes)
+            line.set_label(label)
+            line.set_visible(True)
+        for line in self.lines[len(traces):]:
+            line.set_data([], [])
+            line.set_visible(False)
+        self.peaks.set_data(*(peaks if peaks is not None else ([], [])))
+        self.limit.set_data(*(limit if limit is not None else ([], [])))
+
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+        self.ax.set_title(title)
+        handles = self.lines[:len(traces)] if len(traces) > 1 else []
+        handles += [artist for artist in (self.peaks, self.limit) if len(artist.get_xdata())]
+        if handles:
+            self.ax.legend(handles=handles, fontsize=8, loc='upper right')
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+        self.fig.tight_layout()
+        return self.fig
+
+
+class TableTemplate:
+    """A table page; only the table artist is replaced between pages"""
+
+    def __init__(self, size=PAGE_SIZE):
+        self.fig = Figure(figsize=size)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_axes([0.05, 0.03, 0.9, 0.9])
+        self.ax.axis('off')
+        self.title = self.fig.suptitle('')
+        self.table = None
+
+    def draw(self, title, frame):
+        if self.table is not None:
+            self.table.remove()
+        self.title.set_text(title)
+        if len(frame.columns) == 0:
+            frame = pd.DataFrame({'': ['No data']})
+        cells = [[format_cell(value) for value in row] for row in frame.itertuples(index=False)]
+        self.table = self.ax.table(cellText=cells or [[''] * len(frame.columns)], colLabels=list(frame.columns),
+                                   loc='upper center', cellLoc='left')
+        self.table.auto_set_font_size(False)
+        self.table.set_fontsize(7)
+        return self.fig
+
+
+def template(kind):
+    if kind not in _templates:
+        _templates[kind] = PlotTemplate() if kind == 'plot' else TableTemplate()
+    return _templates[kind]
+
+
+def format_cell(value):
+    if isinstance(value, (float, np.floating)):
+        return "" if np.isnan(value) else f"{value:.6g}"
+    return str(value)
+
+
+def group_files(file_paths, pattern=None):
+    """Reports to write as {name: file paths}
+
+    Without a pattern every file gets its own report. With a regular
+    expression, files whose names give the same match (its first group,
+    if it has one) share a report; files that do not match stay alone.
+    """
+    groups = {}
+    for file_path in file_paths:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        match = re.search(pattern, os.path.basename(file_path)) if pattern else None
+        if match:
+            name = match.group(1) if match.groups() else match.group(0)
+        groups.setdefault(name, []).append(file_path)
+    return groups
+
+
+def analyze_report_file(file_path, settings, freq_hz, mask=None, max_peaks=10):
+    """Spectra, peaks and limit verdicts of every numeric column of one file
+
+    Returns one dictionary per column. The traces are already reduced to
+    TRACE_PIXELS intervals, so a report holds little more than its plots.
+    """
+    peak_params = peak_params_from_settings(settings)
+    multitaper = multitaper_params_from_settings(settings)
+    window_func = settings.get('window_function', 'none')
+    table = load_table(file_path, dtype=settings.get('processing_precision', 'float64'))
+    freq_hz = table_sample_rate(table, freq_hz)
+    name = os.path.basename(file_path)
+
+    columns = []
+    for column in numeric_columns(table):
+        data = extract_range(table, column, 1)
+        if len(data) < 2:
+            continue
+        xf, amplitude = compute_spectrum(data, freq_hz, window_func, multitaper)
+        if len(xf) < 3:
+            continue  # Fewer than two bins besides DC, nothing to plot
+        peaks_idx = sorted(detect_peaks(amplitude, peak_params),
+                           key=lambda idx: amplitude[idx], reverse=True)[:max_peaks]
+        entry = {
+            'file': name,
+            'column': column,
+            'freq_hz': freq_hz,
+            'n_points': len(data),
+            'trace': minmax_decimate(xf[1:], amplitude[1:], xf[1], xf[-1], TRACE_PIXELS),
+            'peaks': pd.DataFrame({'File': name, 'Column': column, 'Rank': np.arange(1, len(peaks_idx) + 1),
+                                   'Frequency_Hz': xf[peaks_idx], 'Amplitude': amplitude[peaks_idx]},
+                                  columns=PEAK_COLUMNS)
+        }
+        if mask is not None:
+            result = mask.check(xf, amplitude)
+            entry.update(limit_result='PASS' if result['passed'] else 'FAIL',
+                         worst_margin_db=float(result['worst_margin_db']))
+        columns.append(entry)
+    return columns
+
+
+def summary_frame(columns, mask=None):
+    records = []
+    for entry in columns:
+        record = {'File': entry['file'], 'Column': entry['column'], 'Sample_Rate_Hz': entry['freq_hz'],
+                  'Points': entry['n_points']}
+        if len(entry['peaks']):
+            top = entry['peaks'].iloc[0]
+            record.update(Top_Frequency_Hz=top['Frequency_Hz'], Top_Amplitude=top['Amplitude'])
+        if mask is not None:
+            record.update(Limit=entry['limit_result'], Worst_Margin_dB=entry['worst_margin_db'])
+        records.append(record)
+    return pd.DataFrame(records)
+
+
+def report_plots(name, columns, mask=None):
+    """(title, traces, peaks, limit) of every plot of a report: overlays first, then each column"""
+    plots = []
+    by_column = {}
+    for entry in columns:
+        by_column.setdefault(entry['column'], []).append(entry)
+    files = sorted({entry['file'] for entry in columns})
+
+    def limit_curve(traces):
+        if mask is None:
+            return None
+        frequencies = np.unique(np.concatenate([trace[1] for trace in traces]))
+        return frequencies, mask.limit_at(frequencies)
+
+    # One file: all its columns together; several files: each column across the files
+    if len(files) == 1 and len(columns) > 1:
+        traces = [(entry['column'], *entry['trace']) for entry in columns]
+        plots.append((f"{name}: all columns", traces, None, limit_curve(traces)))
+    elif len(files) > 1:
+        for column, entries in by_column.items():
+            if len(entries) > 1:
+                traces = [(entry['file'], *entry['trace']) for entry in entries]
+                plots.append((f"{name}: {column} across {len(entries)} files", traces, None, limit_curve(traces)))
+
+    for entry in columns:
+        traces = [(entry['column'], *entry['trace'])]
+        peaks = (entry['peaks']['Frequency_Hz'].values, entry['peaks']['Amplitude'].values)
+        title = f"{entry['file']}: {entry['column']}"
+        if mask is not None:
+            title += f" (limit {entry['limit_result']}, margin {entry['worst_margin_db']:+.1f} dB)"
+        plots.append((title, traces, peaks, limit_curve(traces)))
+    return plots
+
+
+def table_pages(frame, rows=TABLE_ROWS_PER_PAGE):
+    return [frame.iloc[start:start + rows] for start in range(0, max(len(frame), 1), rows)]
+
+
+def write_pdf(path, name, columns, mask=None):
+    plot = template('plot')
+    table = template('table')
+    created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with PdfPages(path, metadata={'Title': f"FFT report {name}"}) as pdf:
+        for page in table_pages(summary_frame(columns, mask)):
+            pdf.savefig(table.draw(f"FFT report {name} - {created}", page))
+        for title, traces, peaks, limit in report_plots(name, columns, mask):
+            pdf.savefig(plot.draw(title, traces, peaks, limit))
+        peaks = pd.concat([entry['peaks'] for entry in columns] or [pd.DataFrame(columns=PEAK_COLUMNS)],
+                          ignore_index=True)
+        for page in table_pages(peaks):
+            pdf.savefig(table.draw(f"{name}: peaks", page))
+
+
+def write_html(path, name, columns, mask=None):
+    plot = template('plot')
+    created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    parts = [f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>FFT report {html.escape(name)}</title>",
+             "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;font-size:small}"
+             "td,th{border:1px solid #ccc;padding:2px 6px}img{max-width:100%}</style></head><body>",
+             f"<h1>FFT report {html.escape(name)}</h1><p>{created}</p>",
+             summary_frame(columns, mask).to_html(index=False, float_format=format_cell)]
+    for title, traces, peaks, limit in report_plots(name, columns, mask):
+        image = io.BytesIO()
+        plot.draw(title, traces, peaks, limit).savefig(image, format='png', dpi=HTML_DPI)
+        parts.append(f"<h2>{html.escape(title)}</h2>"
+                     f"<img src=\"data:image/png;base64,{base64.b64encode(image.getvalue()).decode('ascii')}\">")
+    parts.append("<h2>Peaks</h2>")
+    for entry in columns:
+        parts.append(f"<h3>{html.escape(entry['file'])}: {html.escape(str(entry['column']))}</h3>")
+        parts.append(entry['peaks'].drop(columns=['File', 'Column']).to_html(index=False, float_format=format_cell))
+    parts.append("</body></html>")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(parts))
+
+
+def write_report(name, file_paths, out_dir, settings, freq_hz, fmt='pdf', mask=None, max_peaks=10):
+    """Analyze the files of one report and write it; runs in a worker process
+
+    Returns the result row of the report.
+    """
+    started = time.perf_counter()
+    columns = []
+    for file_path in file_paths:
+        columns.extend(analyze_report_file(file_path, settings, freq_hz, mask, max_peaks))
+    path = os.path.join(out_dir, f"{name}_report.{fmt}")
+    (write_html if fmt == 'html' else write_pdf)(path, name, columns, mask)
+    return {'Report': name, 'Files': len(file_paths), 'Path': path, 'Status': 'ok',
+            'Seconds': round(time.perf_counter() - started, 3)}
+
+
+def generate_reports(groups, out_dir, settings, freq_hz, fmt='pdf', mask=None, max_peaks=10,
+                     workers=None, progress=None):
+    """Write one report per group of {name: file paths} over a process pool
+
+    Returns a DataFrame with one row per report; a report that fails gets
+    a 'failed' row with the error. The progress callback receives
+    (reports done, total reports).
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format '{fmt}'.")
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    rows = []
+
+    def collect(name, outcome):
+        try:
+            rows.append(outcome())
+        except Exception as e:
+            rows.append({'Report': name, 'Files': len(groups[name]), 'Status': 'failed', 'Error': str(e)})
+        if progress:
+            progress(len(rows), len(groups))
+
+    if workers == 1 or len(groups) < 2:
+        for name, file_paths in groups.items():
+            collect(name, lambda: write_report(name, file_paths, out_dir, settings, freq_hz, fmt, mask, max_peaks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(groups))) as pool:
+            futures = {pool.submit(write_report, name, file_paths, out_dir, settings, freq_hz, fmt, mask,
+                                   max_peaks): name
+                       for name, file_paths in groups.items()}
+            for future in as_completed(futures):
+                collect(futures[future], future.result)
+
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS).sort_values('Report', kind='stable', ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write PDF/HTML spectrum reports of data files in parallel")
+    parser.add_argument('files', nargs='+', help="Data files to report on")
+    parser.add_argument('--out', default='fft_reports', help="Output directory")
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='pdf', help="Report format")
+    parser.add_argument('--group', default=None,
+                        help="Regular expression on file names; files with the same match (or first group) "
+                             "share one report (default: one report per file)")
+    parser.add_argument('--fs', type=float, default=1000.0,
+                        help="Acquisition frequency (Hz) for files without their own sample rate or time column")
+    parser.add_argument('--settings', default='fft_analyzer_settings.json',
+                        help="Settings file providing window and peak detection parameters")
+    parser.add_argument('--mask', default=None, help="Limit mask CSV drawn on the plots and checked")
+    parser.add_argument('--log-frequency', action='store_true',
+                        help="Interpolate the limit mask over log frequency")
+    parser.add_argument('--max-peaks', type=int, default=10, help="Peaks reported per column")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all CPUs)")
+    args = parser.parse_args(argv)
+
+    mask = load_mask(args.mask, args.log_frequency) if args.mask else None
+    groups = group_files(args.files, args.group)
+    print(f"Writing {len(groups)} reports to {args.out}")
+    results = generate_reports(groups, args.out, load_settings_file(args.settings), args.fs, args.format, mask,
+                               args.max_peaks, args.workers,
+                               progress=lambda done, total: print(f"{done}/{total} reports written"))
+    print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""In-memory model behind the Combined Results list.
+
+Holds the metadata and check state of every saved result and keeps a
+filtered, sorted list of result IDs (the view). The Treeview only shows
+the slice of the view that fits on screen, so the widget cost does not
+grow with the number of saved results.
+"""
+
+SORT_KEYS = ('id', 'name', 'column', 'window', 'date')
+ALL = 'All'
+
+
+class ResultsModel:
+    def __init__(self):
+        self.rows = {}
+        self.checked = set()
+        self.next_id = 1
+        self.filter_text = ''
+        self.filter_column = ALL
+        self.filter_window = ALL
+        self.sort_key = 'id'
+        self.sort_reverse = False
+        self.view = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, data):
+        """Add a saved result's metadata and return its new, never reused ID"""
+        return self.add_many([data])[0]
+
+    def add_many(self, items):
+        """Add several results, rebuilding the view once, and return their IDs in order"""
+        result_ids = []
+        for data in items:
+            result_id = self.next_id
+            self.next_id += 1
+            self.rows[result_id] = {
+                'id': result_id,
+                'name': str(data.get('analysis_name', '')),
+                'column': str(data.get('column', '')),
+                'window': str(data.get('window_func', '')),
+                'date': str(data.get('timestamp', ''))
+            }
+            result_ids.append(result_id)
+        self.refresh()
+        return result_ids
+
+    def remove(self, result_ids):
+        for result_id in result_ids:
+            self.rows.pop(result_id, None)
+            self.checked.discard(result_id)
+        self.refresh()
+
+    def clear(self):
+        self.rows.clear()
+        self.checked.clear()
+        self.view = []
+
+    def is_checked(self, result_id):
+        return result_id in self.checked
+
+    def set_checked(self, result_ids, state):
+        """Set the check state of the given results"""
+        if state:
+            self.checked.update(result_ids)
+        else:
+            self.checked.difference_update(result_ids)
+
+    def checked_ids(self):
+        """Checked result IDs in view order, followed by checked ones hidden by the filter"""
+        visible = [result_id for result_id in self.view if result_id in self.checked]
+        hidden = sorted(self.checked.difference(visible))
+        return visible + hidden
+
+    def distinct(self, field):
+        """Sorted distinct values of a field, for filter choices"""
+        return sorted({row[field] for row in self.rows.values()})
+
+    def set_filter(self, text='', column=ALL, window=ALL):
+        """Filter on a case-insensitive substring of name or date, and on column and window"""
+        self.filter_text = text.strip().lower()
+        self.filter_column = column
+        self.filter_window = window
+        self.refresh()
+
+    def set_sort(self, key):
+        """Sort by a field; choosing the current sort field again reverses the order"""
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {key}")
+        if key == self.sort_key:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_key = key
+            self.sort_reverse = False
+        self.refresh()
+
+    def matches(self, row):
+        if self.filter_column != ALL and row['column'] != self.filter_column:
+            return False
+        if self.filter_window != ALL and row['window'] != self.filter_window:
+            return False
+        if self.filter_text:
+            return self.filter_text in row['name'].lower() or self.filter_text in row['date'].lower()
+        return True
+
+    def refresh(self):
+        """Rebuild the view from the current filter and sort order"""
+        rows = [row for row in self.rows.values() if self.matches(row)]
+        key = self.sort_key
+        if key == 'id':
+            rows.sort(key=lambda row: row['id'], reverse=self.sort_reverse)
+        else:
+            # Ties keep ID order
+            rows.sort(key=lambda row: (row[key].lower(), row['id']), reverse=self.sort_reverse)
+        self.view = [row['id'] for row in rows]
+
+    def visible_slice(self, offset, count):
+        """The rows of the view from offset, at most count of them"""
+        return [self.rows[result_id] for result_id in self.view[offset:offset + count]]
@@ -0,0 +1,277 @@
+"""SQLite index of spectral peaks and band energies for test campaigns.
+
+Each indexed file (CSV, WAV or described raw binary) is analyzed once per
+numeric column, and the detected peaks and band energies are stored so that
+range queries such as "which runs had a peak near 142 Hz above X?" never
+have to reopen the data files.
+
+Usage:
+    python spectral_index.py index campaign.db data/*.csv --fs 1000 --window hann
+    python spectral_index.py query campaign.db --fmin 140 --fmax 144 --amin 0.01
+"""
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+from fft_core import (DEFAULT_MULTITAPER_PARAMS, DEFAULT_PEAK_PARAMS, MULTITAPER, WINDOW_CHOICES, band_energies,
+                      compute_spectrum, detect_peaks, extract_range, load_table, multitaper_params_from_settings,
+                      numeric_columns, peak_params_from_settings)
+
+DEFAULT_BAND_EDGES = (0, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    n_rows INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    column_name TEXT NOT NULL,
+    freq_hz REAL NOT NULL,
+    window_func TEXT NOT NULL,
+    start_line INTEGER NOT NULL,
+    n_lines INTEGER NOT NULL,
+    max_amplitude REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS peaks (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    frequency REAL NOT NULL,
+    amplitude REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS band_energies (
+    analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    band_low REAL NOT NULL,
+    band_high REAL NOT NULL,
+    energy REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_file ON analyses(file_id);
+CREATE INDEX IF NOT EXISTS idx_analyses_column ON analyses(column_name);
+CREATE INDEX IF NOT EXISTS idx_peaks_freq_amp ON peaks(frequency, amplitude);
+CREATE INDEX IF NOT EXISTS idx_peaks_analysis ON peaks(analysis_id);
+CREATE INDEX IF NOT EXISTS idx_bands_range ON band_energies(band_low, band_high, energy);
+CREATE INDEX IF NOT EXISTS idx_bands_analysis ON band_energies(analysis_id);
+"""
+
+
+class SpectralIndex:
+    """Peak and band energy index stored in a local SQLite database"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def is_current(self, file_path, params):
+        """Check whether a file is already indexed with the same parameters"""
+        stat = os.stat(file_path)
+        row = self.conn.execute(
+            "SELECT mtime, size, params FROM files WHERE path = ?",
+            (os.path.abspath(file_path),)).fetchone()
+        return (row is not None and row['mtime'] == stat.st_mtime
+                and row['size'] == stat.st_size and row['params'] == json.dumps(params, sort_keys=True))
+
+    def index_file(self, file_path, freq_hz, window_func='none', peak_params=None,
+                   start_line=1, n_lines=None, columns=None,
+                   band_edges=DEFAULT_BAND_EDGES, max_peaks=50, force=False, multitaper=None):
+        """Analyze every numeric column of a file and store its peaks and band energies
+
+        Returns the number of columns indexed, or 0 if the file was already
+        up to date. multitaper holds the parameters of the 'multitaper'
+        window.
+        """
+        peak_params = peak_params or DEFAULT_PEAK_PARAMS
+        params = {
+            'freq_hz': freq_hz,
+            'window_func': window_func,
+            'peak_params': peak_params,
+            'start_line': start_line,
+            'n_lines': n_lines,
+            'columns': columns,
+            'band_edges': list(band_edges),
+            'max_peaks': max_peaks
+        }
+        if window_func == MULTITAPER:
+            multitaper = multitaper or DEFAULT_MULTITAPER_PARAMS
+            params['multitaper'] = multitaper
+        if not force and self.is_current(file_path, params):
+            return 0
+
+        df = load_table(file_path)
+        freq_hz = getattr(df, 'sample_rate', None) or freq_hz  # Binary/WAV files carry their own rate
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+
+        # Keep only the bands below the Nyquist frequency
+        edges = np.asarray(band_edges, dtype=float)
+        edges = edges[edges <= freq_hz / 2.0]
+
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            file_id = self.conn.execute(
+                "INSERT INTO files (path, mtime, size, n_rows, params, indexed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, stat.st_mtime, stat.st_size, len(df), json.dumps(params, sort_keys=True),
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"))).lastrowid
+
+            indexed = 0
+            for column in columns or numeric_columns(df):
+                data = extract_range(df, column, start_line, n_lines)
+                if len(data) < 2:
+                    continue
+
+                xf, amplitude = compute_spectrum(data, freq_hz, window_func, multitaper)
+                peaks_idx = detect_peaks(amplitude, peak_params)
+                peaks_idx = sorted(peaks_idx, key=lambda idx: amplitude[idx], reverse=True)[:max_peaks]
+
+                analysis_id = self.conn.execute(
+                    "INSERT INTO analyses (file_id, column_name, freq_hz, window_func, start_line, n_lines, max_amplitude) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (file_id, str(column), freq_hz, window_func, start_line, len(data),
+                     float(np.max(amplitude)))).lastrowid
+
+                self.conn.executemany(
+                    "INSERT INTO peaks (analysis_id, rank, frequency, amplitude) VALUES (?, ?, ?, ?)",
+                    [(analysis_id, rank + 1, float(xf[idx]), float(amplitude[idx]))
+                     for rank, idx in enumerate(peaks_idx)])
+
+                if len(edges) > 1:
+                    energies = band_energies(xf, amplitude, edges)
+                    self.conn.executemany(
+                        "INSERT INTO band_energies (analysis_id, band_low, band_high, energy) VALUES (?, ?, ?, ?)",
+                        [(analysis_id, float(low), float(high), float(energy))
+                         for low, high, energy in zip(edges[:-1], edges[1:], energies)])
+                indexed += 1
+
+        return indexed
+
+    def index_files(self, file_paths, freq_hz, window_func='none', peak_params=None,
+                    progress=None, **kwargs):
+        """Index a corpus of files, returning a (path, columns indexed or error) list"""
+        results = []
+        for i, file_path in enumerate(file_paths):
+            try:
+                results.append((file_path, self.index_file(file_path, freq_hz, window_func,
+                                                           peak_params, **kwargs)))
+            except Exception as e:
+                results.append((file_path, e))
+            if progress:
+                progress(i + 1, len(file_paths), file_path)
+        return results
+
+    def query_peaks(self, freq_min, freq_max, amp_min=None, amp_max=None,
+                    column=None, limit=1000):
+        """Find indexed peaks within a frequency and amplitude range"""
+        sql = ("SELECT f.path, a.column_name, a.window_func, p.rank, p.frequency, p.amplitude "
+               "FROM peaks p JOIN analyses a ON a.id = p.analysis_id JOIN files f ON f.id = a.file_id "
+               "WHERE p.frequency BETWEEN ? AND ?")
+        args = [freq_min, freq_max]
+        if amp_min is not None:
+            sql += " AND p.amplitude >= ?"
+            args.append(amp_min)
+        if amp_max is not None:
+            sql += " AND p.amplitude <= ?"
+            args.append(amp_max)
+        if column:
+            sql += " AND a.column_name = ?"
+            args.append(column)
+        sql += " ORDER BY p.amplitude DESC LIMIT ?"
+        args.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, args)]
+
+    def query_bands(self, freq_min, freq_max, energy_min=None, column=None, limit=1000):
+        """Find indexed band energies for bands overlapping a frequency range"""
+        sql = ("SELECT f.path, a.column_name, b.band_low, b.band_high, b.energy "
+               "FROM band_energies b JOIN analyses a ON a.id = b.analysis_id JOIN files f ON f.id = a.file_id "
+               "WHERE b.band_low < ? AND b.band_high > ?")
+        args = [freq_max, freq_min]
+        if energy_min is not None:
+            sql += " AND b.energy >= ?"
+            args.append(energy_min)
+        if column:
+            sql += " AND a.column_name = ?"
+            args.append(column)
+        sql += " ORDER BY b.energy DESC LIMIT ?"
+        args.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, args)]
+
+    def stats(self):
+        """Count the indexed files, analyses and peaks"""
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('files', 'analyses', 'peaks')}
+
+
+def load_settings_file(path):
+    """Load saved analyzer settings, returning an empty dict if unavailable"""
+    if path and os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index FFT peaks of CSV files into SQLite and query them")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = subparsers.add_parser('index', help="Analyze files and store their peaks")
+    index_parser.add_argument('db', help="SQLite database path")
+    index_parser.add_argument('files', nargs='+', help="Data files to index")
+    index_parser.add_argument('--fs', type=float, default=1000.0, help="Acquisition frequency (Hz)")
+    index_parser.add_argument('--window', default='none', choices=WINDOW_CHOICES)
+    index_parser.add_argument('--settings', default='fft_analyzer_settings.json',
+                              help="Settings file providing peak detection parameters")
+    index_parser.add_argument('--force', action='store_true', help="Reindex files that are up to date")
+
+    query_parser = subparsers.add_parser('query', help="Query indexed peaks")
+    query_parser.add_argument('db', help="SQLite database path")
+    query_parser.add_argument('--fmin', type=float, required=True)
+    query_parser.add_argument('--fmax', type=float, required=True)
+    query_parser.add_argument('--amin', type=float)
+    query_parser.add_argument('--amax', type=float)
+    query_parser.add_argument('--column')
+    query_parser.add_argument('--limit', type=int, default=100)
+
+    args = parser.parse_args(argv)
+
+    with SpectralIndex(args.db) as index:
+        if args.command == 'index':
+            settings = load_settings_file(args.settings)
+            peak_params = peak_params_from_settings(settings)
+            for path, result in index.index_files(args.files, args.fs, args.window, peak_params,
+                                                  force=args.force,
+                                                  multitaper=multitaper_params_from_settings(settings)):
+                if isinstance(result, Exception):
+                    print(f"{path}: failed ({result})")
+                elif result == 0:
+                    print(f"{path}: up to date")
+                else:
+                    print(f"{path}: {result} columns indexed")
+        else:
+            for row in index.query_peaks(args.fmin, args.fmax, args.amin, args.amax,
+                                         args.column, args.limit):
+                print(f"{row['path']}\t{row['column_name']}\t{row['frequency']:.2f} Hz\t{row['amplitude']:.3e}")
+
+
+if __name__ == "__main__":
+    main()
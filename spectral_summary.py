@@ -0,0 +1,97 @@
+"""Compact spectral summaries for long-term archiving.
+
+A summary keeps what trend analysis needs from a full spectrum in a few
+kilobytes: the maximum and mean amplitude in log-spaced frequency bins,
+the strongest peaks and the energy in fixed frequency bands. Summaries
+are stored as float32 in ``.npz`` files, several per file, each with its
+JSON metadata (name, column, window, sample rate, range, date).
+"""
+import json
+
+import numpy as np
+
+from fft_core import band_energies
+from spectral_index import DEFAULT_BAND_EDGES
+
+SUMMARY_BINS = 256  # Log-spaced bins between the first non-zero bin and Nyquist
+SUMMARY_PEAKS = 20  # Strongest peaks kept
+SUMMARY_ARRAYS = ('bin_max', 'bin_mean', 'peak_frequencies', 'peak_amplitudes', 'band_edges', 'band_energies')
+
+
+def summarize_spectrum(frequencies, amplitudes, peaks_idx=(), meta=None, n_bins=SUMMARY_BINS,
+                       top_k=SUMMARY_PEAKS, band_edges=DEFAULT_BAND_EDGES):
+    """Summary of one amplitude spectrum over evenly spaced frequencies
+
+    peaks_idx are the detected peaks, of which the top_k highest are
+    kept. Log bins narrower than the frequency spacing hold no bin and
+    are NaN.
+    """
+    frequencies = np.asarray(frequencies, dtype=float)
+    amplitudes = np.asarray(amplitudes, dtype=float)
+    if len(frequencies) < 3:
+        raise ValueError("At least three frequency bins are needed for a summary.")
+    f_min, f_max = frequencies[1], frequencies[-1]
+    edges = np.geomspace(f_min, f_max, n_bins + 1)
+    edges[-1] = np.nextafter(f_max, np.inf)  # Keep the last bin in the last band
+
+    # Bin boundaries as indices; empty bins share their boundary with the next bin
+    bounds = np.searchsorted(frequencies, edges)
+    filled = bounds[1:] > bounds[:-1]
+    starts = bounds[:-1][filled]
+    values = amplitudes[:bounds[-1]]
+    bin_max = np.full(n_bins, np.nan)
+    bin_mean = np.full(n_bins, np.nan)
+    if len(starts):
+        bin_max[filled] = np.maximum.reduceat(values, starts)
+        bin_mean[filled] = np.add.reduceat(values, starts) / np.diff(bounds)[filled]
+
+    peaks_idx = np.asarray(peaks_idx, dtype=int)
+    top = peaks_idx[np.argsort(amplitudes[peaks_idx])[::-1][:top_k]] if len(peaks_idx) else peaks_idx
+    band_edges = np.asarray([edge for edge in band_edges if edge <= f_max] + [f_max], dtype=float)
+    band_edges = np.unique(band_edges)
+
+    return {
+        'meta': dict(meta or {}, f_min=float(f_min), f_max=float(f_max), n_bins=n_bins,
+                     bin_width=float(frequencies[1] - frequencies[0])),
+        'bin_max': bin_max.astype(np.float32),
+        'bin_mean': bin_mean.astype(np.float32),
+        'peak_frequencies': frequencies[top].astype(np.float32),
+        'peak_amplitudes': amplitudes[top].astype(np.float32),
+        'band_edges': band_edges.astype(np.float32),
+        'band_energies': band_energies(frequencies, amplitudes, band_edges).astype(np.float32)
+    }
+
+
+def summary_bin_centers(summary):
+    """Geometric center frequency of each log bin"""
+    meta = summary['meta']
+    edges = np.geomspace(meta['f_min'], meta['f_max'], meta['n_bins'] + 1)
+    return np.sqrt(edges[:-1] * edges[1:])
+
+
+def summary_curve(summary, statistic='max'):
+    """(frequencies, amplitudes) of the filled bins, ready to plot"""
+    values = summary['bin_max'] if statistic == 'max' else summary['bin_mean']
+    filled = ~np.isnan(values)
+    return summary_bin_centers(summary)[filled], values[filled].astype(float)
+
+
+def save_summaries(path, summaries):
+    """Write a list of summaries to one compressed .npz file"""
+    arrays = {'count': len(summaries)}
+    for i, summary in enumerate(summaries):
+        arrays[f"{i}_meta"] = json.dumps(summary['meta'], default=str)
+        for name in SUMMARY_ARRAYS:
+            arrays[f"{i}_{name}"] = summary[name]
+    np.savez_compressed(path, **arrays)
+
+
+def load_summaries(path):
+    """Read the summaries written by save_summaries()"""
+    with np.load(path, allow_pickle=False) as saved:
+        summaries = []
+        for i in range(int(saved['count'])):
+            summary = {name: saved[f"{i}_{name}"] for name in SUMMARY_ARRAYS}
+            summary['meta'] = json.loads(str(saved[f"{i}_meta"]))
+            summaries.append(summary)
+    return summaries
@@ -0,0 +1,147 @@
+"""Persistent, content-addressed cache of computed spectra and peaks.
+
+An entry is keyed by a hash of the source samples (read in chunks, so
+huge ranges are never held whole) plus every parameter the result
+depends on. Entries are single ``.npz`` files spread over 256 sub-
+directories, written to a temporary name and renamed into place, so
+several analyzers may share one cache directory, e.g. on a network
+drive. Reading an entry refreshes its modification time; once the cache
+grows beyond its size bound the least recently used entries are removed.
+
+The directory is only walked when needed: the total size is counted once,
+then kept up to date from the entries this process writes. Entries written
+by other processes are picked up by a rescan when the bound is reached or
+after RESCAN_SECONDS.
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+CACHE_VERSION = 1  # Part of every key; bump when cached results change meaning
+HASH_CHUNK = 1 << 20  # Rows hashed per read
+DEFAULT_CACHE_DIR = 'fft_spectrum_cache'
+DEFAULT_CACHE_MB = 512
+EVICT_TO = 0.9  # Eviction frees space down to this fraction of the bound, so it does not run on every write
+RESCAN_SECONDS = 600.0  # Age of the size total before it is recounted, for writes of other processes
+
+
+def digest_rows(read, n_rows, digest=None, chunk_size=HASH_CHUNK):
+    """Feed rows [0, n_rows) of read(start, end) into a sha1 digest, chunk by chunk"""
+    digest = digest or hashlib.sha1()
+    for start in range(0, n_rows, chunk_size):
+        values = np.asarray(read(start, min(start + chunk_size, n_rows)))
+        if values.dtype.kind not in 'biuf':
+            values = values.astype(np.float64)
+        values = np.ascontiguousarray(values)
+        digest.update(values.dtype.str.encode('ascii'))
+        digest.update(values.view(np.uint8))
+    return digest
+
+
+def cache_key(digest, params):
+    """Key of a result computed from the digested samples with the given parameters"""
+    digest = digest.copy()
+    digest.update(json.dumps({'version': CACHE_VERSION, **params}, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SpectrumCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total = None  # Bytes in the cache, counted on the first write
+        self.counted_at = 0.0
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.npz")
+
+    def get(self, key):
+        """(arrays, meta) stored under key, or None"""
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                arrays = {name: saved[name] for name in saved.files if name != 'meta'}
+                meta = json.loads(str(saved['meta']))
+            os.utime(path)  # Most recently used
+        except (OSError, KeyError, ValueError):
+            return None  # Missing, evicted meanwhile or damaged: recompute
+        return arrays, meta
+
+    def put(self, key, arrays, meta=None):
+        """Store arrays and a JSON-serializable meta dictionary under key"""
+        path = self.path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary, 'wb') as f:
+                np.savez(f, meta=json.dumps(meta or {}, default=str), **arrays)
+            size = os.path.getsize(temporary)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return  # A cache that cannot be written only costs the speed-up
+
+        if self.total is None or time.time() - self.counted_at > RESCAN_SECONDS:
+            self.total = self.usage()[1]
+            self.counted_at = time.time()
+        else:
+            self.total += size - replaced
+        if self.total > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        """(path, size, last use) of every entry"""
+        entries = []
+        try:
+            subdirectories = [entry.path for entry in os.scandir(self.directory) if entry.is_dir()]
+        except OSError:
+            return entries
+        for subdirectory in subdirectories:
+            try:
+                for entry in os.scandir(subdirectory):
+                    if entry.name.endswith('.npz'):
+                        stat = entry.stat()
+                        entries.append((entry.path, stat.st_size, stat.st_mtime))
+            except OSError:
+                continue
+        return entries
+
+    def usage(self):
+        """(number of entries, total bytes)"""
+        entries = self.entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def evict(self):
+        """Remove least recently used entries of an over-full cache down to EVICT_TO of its bound"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                if total <= EVICT_TO * self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # Already evicted by another process
+                total -= size
+        self.total = total
+        self.counted_at = time.time()
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.total = 0
+        self.counted_at = time.time()
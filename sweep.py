@@ -0,0 +1,209 @@
+"""Parallel sweep of the FFT analysis over start offsets, lengths and windows.
+
+The source column is placed in a ``multiprocessing.shared_memory`` block
+that every worker attaches to once, so only the small job descriptions
+travel between processes. Jobs sharing a length and window are stacked
+and transformed with a single 2-D FFT inside each worker.
+
+The column is shared as read, missing samples included, so start lines
+are file rows. A job whose rows hold missing samples is analyzed on its
+valid samples, like the main analysis, and its spectrum is interpolated
+onto the frequency grid of the full length so waterfall rows line up.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from scipy.fft import fftfreq
+
+from fft_core import compute_spectrum, compute_spectrum_batch, detect_peaks
+
+# Source column attached by each worker process
+_shared_block = None
+_shared_data = None
+
+
+def build_sweep_jobs(n_rows, start_first, start_last, start_step, lengths, windows):
+    """Enumerate (start_line, n_lines, window) combinations that fit in the data"""
+    jobs = []
+    for length in lengths:
+        for window in windows:
+            for start_line in range(start_first, start_last + 1, max(start_step, 1)):
+                if start_line - 1 + length <= n_rows:
+                    jobs.append((start_line, length, window))
+    return jobs
+
+
+def _attach_shared(name, shape, dtype):
+    global _shared_block, _shared_data
+    _shared_block = shared_memory.SharedMemory(name=name)
+    _shared_data = np.ndarray(shape, dtype=dtype, buffer=_shared_block.buf)
+
+
+def _run_jobs(data, jobs, freq_hz, peak_params, max_peaks, multitaper=None):
+    """Analyze a list of jobs against the source column"""
+    results = []
+    groups = {}
+    for job in jobs:
+        groups.setdefault((job[1], job[2]), []).append(job[0])
+
+    for (length, window), start_lines in groups.items():
+        # Gather all segments of this length as rows of one matrix
+        starts = np.asarray(start_lines) - 1
+        segments = data[starts[:, np.newaxis] + np.arange(length)]
+        valid = ~np.isnan(segments)
+        n_valid = valid.sum(axis=1)
+        complete = n_valid == length
+        xf = fftfreq(length, 1.0 / freq_hz)[:length//2]
+        spectra = iter(compute_spectrum_batch(segments[complete], freq_hz, window, multitaper)[1]
+                       if complete.any() else ())
+
+        for start_line, segment, row_valid, count in zip(start_lines, segments, valid, n_valid):
+            if count == length:
+                amplitude = next(spectra)
+            elif count >= 2:
+                xf_valid, amplitude = compute_spectrum(segment[row_valid], freq_hz, window, multitaper)
+                amplitude = np.interp(xf, xf_valid, amplitude)
+            else:
+                continue  # Nothing left to analyze in this window
+            peaks_idx = sorted(detect_peaks(amplitude, peak_params),
+                               key=lambda idx: amplitude[idx], reverse=True)[:max_peaks]
+            results.append({
+                'start_line': start_line,
+                'n_lines': length,
+                'n_valid': int(count),
+                'window_func': window,
+                'frequencies': xf,
+                'amplitudes': amplitude.astype(np.float32),
+                'peaks': [(float(xf[idx]), float(amplitude[idx])) for idx in peaks_idx]
+            })
+    return results
+
+
+def _run_chunk(jobs, freq_hz, peak_params, max_peaks, multitaper):
+    return _run_jobs(_shared_data, jobs, freq_hz, peak_params, max_peaks, multitaper)
+
+
+def run_sweep(data, freq_hz, jobs, peak_params=None, max_peaks=10, workers=None, progress=None, multitaper=None):
+    """Run all sweep jobs over a process pool sharing the source column
+
+    Returns one result dictionary per job, sorted by window, length and
+    start line. The progress callback receives (jobs done, total jobs);
+    multitaper holds the parameters of 'multitaper' jobs.
+    """
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+    if not jobs:
+        return []
+
+    # Small sweeps are not worth starting processes for
+    if workers == 1 or len(jobs) < 2 * workers:
+        results = _run_jobs(data, jobs, freq_hz, peak_params, max_peaks, multitaper)
+        if progress:
+            progress(len(jobs), len(jobs))
+        return _sort_results(results)
+
+    block = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    try:
+        np.ndarray(data.shape, dtype=data.dtype, buffer=block.buf)[:] = data
+
+        # Several chunks per worker keep the pool busy and progress moving;
+        # sorting first keeps equal-length jobs together for batching
+        ordered = sorted(jobs, key=lambda job: (job[1], job[2], job[0]))
+        chunk_size = -(-len(ordered) // (workers * 4))
+        chunks = [ordered[i:i + chunk_size] for i in range(0, len(ordered), chunk_size)]
+
+        results = []
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared,
+                                 initargs=(block.name, data.shape, data.dtype)) as pool:
+            futures = {pool.submit(_run_chunk, chunk, freq_hz, peak_params, max_peaks, multitaper): len(chunk)
+                       for chunk in chunks}
+            for future in as_completed(futures):
+                results.extend(future.result())
+                done += futures[future]
+                if progress:
+                    progress(done, len(jobs))
+        return _sort_results(results)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def run_sweep_async(data, freq_hz, jobs, on_done, progress=None, **kwargs):
+    """Run run_sweep() on a background thread
+
+    on_done(results, error) and progress(done, total) are called from the
+    worker thread; GUI callers should hand them back to their event loop
+    rather than touching widgets from them.
+    """
+    def sweep():
+        try:
+            results = run_sweep(data, freq_hz, jobs, progress=progress, **kwargs)
+        except Exception as e:
+            on_done(None, e)
+        else:
+            on_done(results, None)
+
+    thread = threading.Thread(target=sweep, daemon=True)
+    thread.start()
+    return thread
+
+
+def _sort_results(results):
+    return sorted(results, key=lambda r: (r['window_func'], r['n_lines'], r['start_line']))
+
+
+def waterfall_matrix(results, n_lines, window_func):
+    """Stack the spectra of one (length, window) combination for a waterfall plot
+
+    Returns (start_lines, frequencies, amplitudes) with one amplitude row
+    per start line.
+    """
+    rows = [r for r in results if r['n_lines'] == n_lines and r['window_func'] == window_func]
+    if not rows:
+        return np.array([]), np.array([]), np.empty((0, 0))
+    start_lines = np.array([r['start_line'] for r in rows])
+    return start_lines, rows[0]['frequencies'], np.vstack([r['amplitudes'] for r in rows])
+
+
+def peak_table(results, freq_hz=None):
+    """Flatten the per-job peak lists into a DataFrame"""
+    records = []
+    for r in results:
+        for rank, (frequency, amplitude) in enumerate(r['peaks'], start=1):
+            record = {
+                'Start_Line': r['start_line'],
+                'N_Lines': r['n_lines'],
+                'N_Valid': r['n_valid'],
+                'Window': r['window_func'],
+                'Rank': rank,
+                'Frequency_Hz': frequency,
+                'Amplitude': amplitude
+            }
+            if freq_hz:
+                record['Start_Time_s'] = (r['start_line'] - 1) / freq_hz
+            records.append(record)
+    return pd.DataFrame(records)
+
+
+def export_sweep(results, file_path, freq_hz=None):
+    """Export the sweep peak table as CSV, or all spectra and peaks as .npz"""
+    if file_path.lower().endswith('.npz'):
+        arrays = {}
+        for n_lines, window_func in sorted({(r['n_lines'], r['window_func']) for r in results}):
+            start_lines, frequencies, amplitudes = waterfall_matrix(results, n_lines, window_func)
+            key = f"{window_func}_{n_lines}"
+            arrays[f"start_lines_{key}"] = start_lines
+            arrays[f"frequencies_{key}"] = frequencies
+            arrays[f"amplitudes_{key}"] = amplitudes
+        table = peak_table(results, freq_hz)
+        for column in table.columns:
+            values = table[column].to_numpy()
+            arrays[f"peaks_{column}"] = values.astype(str) if values.dtype == object else values
+        np.savez_compressed(file_path, **arrays)
+    else:
+        peak_table(results, freq_hz).to_csv(file_path, index=False)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_service import AnalysisService, SpectrumBatcher
+from fft_core import MULTITAPER, compute_spectrum
+
+
+def tone(n=2048, fs=1000.0, frequency=125.0):
+    return np.sin(2 * np.pi * frequency * np.arange(n) / fs)
+
+
+def test_spectrum_and_peaks_are_cached():
+    service = AnalysisService()
+    params = {'data': tone().tolist(), 'fs': 1000.0, 'window': 'hann', 'max_peaks': 3}
+    result = service.analyze(dict(params))
+    assert not result['cached']
+    assert result['peak_frequencies'][0] == pytest.approx(125.0, abs=0.5)
+    np.testing.assert_allclose(result['amplitudes'], compute_spectrum(tone(), 1000.0, 'hann')[1])
+
+    again = service.analyze(dict(params))
+    assert again['cached']
+    assert service.stats()['cache_hits'] == 1
+    assert not service.analyze(dict(params, window='none'))['cached']
+
+
+def test_file_columns_are_read(tmp_path):
+    path = tmp_path / 'run.csv'
+    pd.DataFrame({'time': np.arange(2048) / 500.0, 'x': tone(fs=500.0)}).to_csv(path, index=False)
+    result = AnalysisService().analyze({'file': str(path), 'column': 'x', 'fs': 500.0, 'start_line': 1025})
+    assert result['n_points'] == 1024
+    assert result['peak_frequencies'][0] == pytest.approx(125.0, abs=0.5)
+
+
+def test_multitaper_parameters_come_from_the_settings():
+    service = AnalysisService({'window_function': MULTITAPER, 'multitaper_nw': 2, 'multitaper_adaptive': False})
+    result = service.analyze({'data': tone().tolist(), 'fs': 1000.0})
+    expected = compute_spectrum(tone(), 1000.0, MULTITAPER, {'nw': 2.0, 'n_tapers': 0, 'adaptive': False})[1]
+    np.testing.assert_allclose(result['amplitudes'], expected)
+
+
+@pytest.mark.parametrize('params', [
+    {'data': [1.0, 2.0, 3.0], 'window': 'kaiser'},
+    {'data': [1.0, 2.0, 3.0], 'precision': 'float16'},
+    {'data': [1.0, 2.0, 3.0], 'fs': 0},
+    {'data': [1.0]},
+    {'file': 'missing-column.csv'},
+    {},
+])
+def test_invalid_requests(params, tmp_path):
+    if 'file' in params:
+        path = tmp_path / params['file']
+        pd.DataFrame({'x': np.zeros(4)}).to_csv(path, index=False)
+        params = {'file': str(path)}
+    with pytest.raises(ValueError):
+        AnalysisService().analyze(params)
+
+
+def test_concurrent_requests_share_one_fft():
+    batcher = SpectrumBatcher(max_wait=0.2)
+    segments = np.random.default_rng(0).standard_normal((6, 512))
+    futures = [batcher.submit(segment, 'hann') for segment in segments]
+    odd = batcher.submit(np.zeros(256), 'hann')
+    for segment, future in zip(segments, futures):
+        np.testing.assert_allclose(future.result(timeout=10), compute_spectrum(segment, 1.0, 'hann')[1])
+    odd.result(timeout=10)
+    assert batcher.spectra == 7 and batcher.batches == 2
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from scipy.signal import freqz, lfilter
+
+from cross_spectrum import cross_spectral_analysis
+
+
+def channels(n=20000):
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal(n)
+    return x, lfilter([0.5, 0.3], [1.0], x) + 0.01 * rng.standard_normal(n)
+
+
+def test_welch_h1_matches_the_filter_response():
+    x, y = channels()
+    result = cross_spectral_analysis(x, y, 1000.0, 'hann', 1024, overlap=0.5)
+    assert result['n_segments'] == (len(x) - 1024) // 512 + 1
+    assert result['nperseg'] == 1024
+
+    _, response = freqz([0.5, 0.3], [1.0], worN=result['frequencies'], fs=1000.0)
+    passband = result['frequencies'] < 400  # The filter gain falls to 0.2 at Nyquist
+    np.testing.assert_allclose(np.abs(result['h1'][passband]), np.abs(response[passband]), rtol=0.02)
+    np.testing.assert_allclose(np.angle(result['h1'][passband][1:]), np.angle(response[passband][1:]), atol=0.02)
+    assert result['coherence'][passband][1:].min() > 0.99
+    # With little output noise H1 and H2 agree
+    np.testing.assert_allclose(result['h2'][passband][1:], result['h1'][passband][1:], rtol=0.01)
+
+
+def test_multitaper_uses_dpss_tapers():
+    x, y = channels()
+    welch = cross_spectral_analysis(x, y, 1000.0, 'hann', 1024)
+    tapered = cross_spectral_analysis(x, y, 1000.0, 'multitaper', 1024, multitaper={'nw': 3.0, 'n_tapers': 0,
+                                                                                     'adaptive': True})
+    assert tapered['window'] == 'multitaper (NW=3, 5 tapers)'
+    assert np.median(tapered['gxx'][1:-1]) == pytest.approx(np.median(welch['gxx'][1:-1]), rel=0.05)
+    np.testing.assert_allclose(tapered['h1'][5:-5], welch['h1'][5:-5], rtol=0.05, atol=0.01)
+
+
+def test_multitaper_coherence_from_a_single_segment():
+    x, y = channels(1024)
+    result = cross_spectral_analysis(x, y, 1000.0, 'multitaper', 1024)
+    assert result['n_segments'] == 1
+    assert np.median(result['coherence'][1:]) > 0.99
+
+
+def test_unknown_window_is_rejected():
+    x, y = channels(4096)
+    with pytest.raises(ValueError):
+        cross_spectral_analysis(x, y, 1000.0, 'kaiser')
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from envelope import band_mask, envelope_signal, envelope_spectrum
+
+FS = 10000.0
+
+
+def modulated(n=20000, carrier=2000.0, rate=37.0, depth=0.5):
+    t = np.arange(n) / FS
+    envelope = 1.0 + depth * np.cos(2 * np.pi * rate * t)
+    low_tone = 3.0 * np.sin(2 * np.pi * 50.0 * t)  # Outside the band, filtered out
+    return envelope * np.sin(2 * np.pi * carrier * t) + low_tone, envelope
+
+
+def test_envelope_of_an_amplitude_modulated_carrier():
+    data, expected = modulated()
+    envelope = envelope_signal(data, FS, 1500.0, 2500.0)
+    inner = slice(1000, -1000)  # Away from the record edges
+    np.testing.assert_allclose(envelope[inner], expected[inner], atol=0.02)
+
+
+def test_envelope_spectrum_shows_the_modulation():
+    data, _ = modulated(depth=0.4)
+    frequencies, amplitude, _ = envelope_spectrum(data, FS, 1500.0, 2500.0, 'none')
+    peak = np.argmax(amplitude[1:]) + 1
+    assert frequencies[peak] == pytest.approx(37.0, abs=0.5)
+    assert amplitude[peak] == pytest.approx(0.4, rel=0.05)
+
+
+def test_blocks_match_the_single_transform():
+    data, _ = modulated(n=50000)
+    columns = np.vstack([data, 0.5 * data])
+    whole = envelope_signal(columns, FS, 1500.0, 2500.0)
+    blocked = envelope_signal(columns, FS, 1500.0, 2500.0, block=4096)
+    assert blocked.shape == whole.shape == (2, 50000)
+    np.testing.assert_allclose(blocked[:, 2000:-2000], whole[:, 2000:-2000], atol=1e-3)
+
+
+def test_band_must_fit_below_nyquist():
+    with pytest.raises(ValueError):
+        band_mask(1024, FS, 2000.0, 6000.0)
+    mask = band_mask(1024, FS, 1000.0, 2000.0)
+    assert mask[0] == 0.0 and mask.max() == pytest.approx(2.0)
@@ -0,0 +1,91 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+import fft_backends
+from fft_backends import AUTOTUNE_MIN_LENGTH, MAX_TUNED_SIZES, BackendSelector, size_class
+
+
+def wait_for_tuning(selector, timeout=30.0):
+    deadline = time.time() + timeout
+    while selector.pending and time.time() < deadline:
+        time.sleep(0.01)
+    assert not selector.pending
+
+
+def test_size_class_is_next_power_of_two():
+    assert size_class(4096) == 4096
+    assert size_class(4097) == 8192
+    assert size_class(5000) == 8192
+
+
+def test_select_never_benchmarks_inline(monkeypatch, tmp_path):
+    calls = []
+
+    def slow_benchmark(n, dtype, backends=None, seconds=None):
+        calls.append(n)
+        time.sleep(0.2)
+        return {('numpy', 1): 0.001, ('scipy', 1): 0.002}
+
+    monkeypatch.setattr(fft_backends, 'benchmark', slow_benchmark)
+    selector = BackendSelector(str(tmp_path / 'fft_backend.json'), mode='auto')
+    started = time.perf_counter()
+    assert selector.select(5000, np.float64) == ('scipy', 1)
+    assert time.perf_counter() - started < 0.1
+    # Other lengths of the same class do not start another benchmark
+    selector.select(6000, np.float64)
+    wait_for_tuning(selector)
+    assert calls == [8192]
+    assert selector.select(7000, np.float64) == ('numpy', 1)
+    assert json.load(open(tmp_path / 'fft_backend.json'))['choices'] == {'8192:float64': ['numpy', 1]}
+
+
+def test_stored_size_classes_are_capped(monkeypatch):
+    monkeypatch.setattr(fft_backends, 'benchmark', lambda n, dtype: {('scipy', 1): 1.0})
+    selector = BackendSelector(mode='auto')
+    for power in range(12, 12 + MAX_TUNED_SIZES + 5):
+        selector.tune(1 << power, np.float64)
+    assert len(selector.choices) == MAX_TUNED_SIZES
+    assert f"{1 << 12}:float64" not in selector.choices
+
+
+def test_length_keys_of_older_files_are_dropped(tmp_path):
+    path = tmp_path / 'fft_backend.json'
+    path.write_text(json.dumps({'choices': {'5000:float64': ['numpy', 1], '8192:float64': ['numpy', 1]}}))
+    selector = BackendSelector(str(path), mode='auto')
+    selector.load()
+    assert list(selector.choices) == ['8192:float64']
+
+
+@pytest.mark.parametrize('backend', fft_backends.available_backends())
+def test_backends_agree(backend):
+    x = np.random.default_rng(0).standard_normal(AUTOTUNE_MIN_LENGTH)
+    np.testing.assert_allclose(fft_backends.BACKENDS[backend](x, -1, 1), np.fft.rfft(x), atol=1e-9)
+
+
+def test_other_analyses_use_the_selected_backend(monkeypatch):
+    from cross_spectrum import cross_spectral_analysis
+    from envelope import envelope_spectrum
+    from timebase import compute_nonuniform_spectrum
+
+    lengths = []
+
+    def counting_rfft(x, axis, workers):
+        lengths.append(x.shape[axis])
+        return np.fft.rfft(x, axis=axis)
+
+    monkeypatch.setattr(fft_backends, 'selector', BackendSelector(mode='numpy'))
+    monkeypatch.setitem(fft_backends.BACKENDS, 'numpy', counting_rfft)
+    data = np.random.default_rng(0).standard_normal(4096)
+    times = np.sort(np.random.default_rng(1).uniform(0, 4.0, 4096))
+
+    cross_spectral_analysis(data, data, 1000.0, 'hann', 512)
+    assert 512 in lengths
+    lengths.clear()
+    envelope_spectrum(data, 1000.0, 100.0, 200.0)
+    assert lengths
+    lengths.clear()
+    compute_nonuniform_spectrum(times, data)
+    assert lengths
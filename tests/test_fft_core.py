@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from fft_core import (DEFAULT_PEAK_PARAMS, compute_spectrum, compute_spectrum_batch, decimate, detect_peaks,
+                      detect_peaks_batch, noise_floor, precision_report)
+
+
+def spectra(rows=24, bins=600, seed=0):
+    """Noisy spectra with peaks of random height, some close together"""
+    rng = np.random.default_rng(seed)
+    amplitudes = np.abs(rng.standard_normal((rows, bins))) * 0.01
+    for row in amplitudes:
+        centers = rng.integers(5, bins - 5, size=12)
+        row[centers] += rng.uniform(0.02, 1.0, size=12)
+        row[centers + rng.integers(1, 8, size=12)] += rng.uniform(0.02, 1.0, size=12)
+    amplitudes[0, 0] = 5.0  # DC above everything else
+    return amplitudes
+
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'threshold_mode': 'relative', 'relative_threshold': 0.02, 'min_distance': 3},
+    {'threshold_mode': 'absolute', 'absolute_threshold': 0.05, 'window_size': 1},
+    {'threshold_mode': 'statistical', 'statistical_factor': 2.0, 'min_distance': 20},
+    {'skip_dc': False, 'window_size': 5, 'min_distance': 1},
+])
+def test_batch_detection_matches_detect_peaks(overrides):
+    params = dict(DEFAULT_PEAK_PARAMS, **overrides)
+    amplitudes = spectra()
+    mask = detect_peaks_batch(amplitudes, params)
+    assert mask.shape == amplitudes.shape
+    for row, row_mask in zip(amplitudes, mask):
+        assert np.flatnonzero(row_mask).tolist() == sorted(detect_peaks(row, params))
+
+
+def test_batch_detection_of_one_spectrum():
+    amplitude = spectra(rows=1)[0]
+    assert np.flatnonzero(detect_peaks_batch(amplitude)[0]).tolist() == sorted(detect_peaks(amplitude))
+
+
+def test_noise_floor_follows_a_sloping_floor():
+    bins = np.arange(1, 4001)
+    floor = 1.0 / bins  # 1/f noise floor spanning 72 dB
+    amplitude = floor * np.random.default_rng(1).uniform(0.8, 1.2, size=len(bins))
+    tones = [50, 500, 3000]
+    amplitude[tones] = 10.0 * floor[tones]  # 20 dB above the local floor
+
+    estimate = noise_floor(amplitude, 65)
+    assert np.all(np.abs(np.log10(estimate[100:-100] / floor[100:-100])) < 0.1)
+
+    params = dict(DEFAULT_PEAK_PARAMS, threshold_mode='noise_floor', noise_margin_db=10.0)
+    assert sorted(detect_peaks(amplitude, params)) == tones
+    relative = dict(DEFAULT_PEAK_PARAMS, threshold_mode='relative', relative_threshold=0.1)
+    assert 3000 not in detect_peaks(amplitude, relative)
+
+
+def test_batch_noise_floor_detection_matches_detect_peaks():
+    params = dict(DEFAULT_PEAK_PARAMS, threshold_mode='noise_floor', noise_margin_db=6.0, noise_window=31)
+    amplitudes = spectra(rows=8)
+    mask = detect_peaks_batch(amplitudes, params)
+    for row, row_mask in zip(amplitudes, mask):
+        assert np.flatnonzero(row_mask).tolist() == sorted(detect_peaks(row, params))
+
+
+@pytest.mark.parametrize('window_func', ['none', 'hann', 'blackman', 'hamming'])
+def test_batch_spectra_match_single_spectra(window_func):
+    segments = np.random.default_rng(2).standard_normal((5, 1000))
+    xf, amplitudes = compute_spectrum_batch(segments, 500.0, window_func)
+    assert amplitudes.shape == (5, 500)
+    for segment, amplitude in zip(segments, amplitudes):
+        single_xf, single = compute_spectrum(segment, 500.0, window_func)
+        np.testing.assert_array_equal(xf, single_xf)
+        np.testing.assert_allclose(amplitude, single, rtol=1e-12, atol=1e-15)
+
+
+def test_sine_amplitude():
+    t = np.arange(1000) / 1000.0
+    xf, amplitude = compute_spectrum(0.7 * np.sin(2 * np.pi * 50.0 * t), 1000.0)
+    assert xf[np.argmax(amplitude)] == 50.0
+    assert amplitude.max() == pytest.approx(0.7)
+
+
+def test_float32_path_stays_single_precision():
+    data = np.random.default_rng(4).standard_normal(4096).astype(np.float32)
+    _, amplitude = compute_spectrum(data, 1000.0, 'hann')
+    _, amplitudes = compute_spectrum_batch(data.reshape(4, 1024), 1000.0, 'hann')
+    assert amplitude.dtype == np.float32 and amplitudes.dtype == np.float32
+    _, reference = compute_spectrum(data.astype(np.float64), 1000.0, 'hann')
+    np.testing.assert_allclose(amplitude, reference, rtol=1e-3, atol=1e-5 * reference.max())
+
+
+def test_precision_report():
+    t = np.arange(8192) / 1000.0
+    data = np.sin(2 * np.pi * 123.0 * t) + 1e-3 * np.random.default_rng(5).standard_normal(len(t))
+    report = precision_report(data, 1000.0, 'hann')
+    assert report['peak_frequency_float32'] == report['peak_frequency_float64']
+    assert report['max_error_vs_peak'] < 1e-5
+    assert report['n_points'] == len(data)
+    assert report['bytes_float32'] * 2 == report['bytes_float64']
+
+
+@pytest.mark.parametrize('n, factor', [(1000, 4), (1001, 4), (999, 3), (10, 1)])
+def test_decimated_length(n, factor):
+    assert len(decimate(np.zeros(n), factor)) == -(-n // factor)
+
+
+def test_decimation_keeps_the_low_band_and_removes_aliases():
+    fs, factor = 1000.0, 8  # New Nyquist frequency 62.5 Hz
+    t = np.arange(80000) / fs
+    low = np.sin(2 * np.pi * 10.0 * t)
+    high = np.sin(2 * np.pi * 200.0 * t)  # Would alias to 50 Hz
+    decimated = decimate(low + high, factor)
+
+    np.testing.assert_allclose(decimated[100:-100], low[::factor][100:-100], atol=0.01)
+    xf, amplitude = compute_spectrum(decimated, fs / factor)
+    assert amplitude[np.argmin(np.abs(xf - 10.0))] == pytest.approx(1.0, rel=0.01)
+    assert amplitude[np.argmin(np.abs(xf - 50.0))] < 1e-3
+
+
+def test_chunked_decimation_matches_one_pass():
+    data = np.random.default_rng(6).standard_normal(10007)
+    whole = decimate(data, 5)
+    np.testing.assert_allclose(decimate(data, 5, chunk_size=64), whole, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(decimate(data, 5, chunk_size=7), whole, rtol=1e-12, atol=1e-12)
+    assert decimate(data.astype(np.float32), 5, chunk_size=64).dtype == np.float32
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from limit_mask import LimitMask, check_files, load_mask, parse_mask, save_mask
+
+FREQUENCIES = np.arange(0, 501) * 1.0  # 1 Hz grid
+
+
+def mask():
+    return LimitMask([100, 200, 400], [1.0, 0.01, 0.01])
+
+
+def flat(value):
+    return np.full(len(FREQUENCIES), float(value))
+
+
+@pytest.mark.parametrize('corner, limit', [(100, 1.0), (200, 0.01), (400, 0.01)])
+def test_pass_and_fail_at_the_corner_points(corner, limit):
+    amplitude = np.zeros(len(FREQUENCIES))
+    amplitude[corner] = limit
+    at_limit = mask().check(FREQUENCIES, amplitude)
+    assert at_limit['passed']
+    assert at_limit['worst_margin_db'] == pytest.approx(0.0, abs=1e-9)
+    assert at_limit['worst_frequency'] == corner
+
+    amplitude[corner] = limit * 1.001
+    over = mask().check(FREQUENCIES, amplitude)
+    assert not over['passed']
+    assert over['violating_bins'] == 1
+    assert over['worst_frequency'] == corner
+    assert over['worst_margin_db'] == pytest.approx(20 * np.log10(1.001))
+
+
+def test_limit_is_interpolated_in_log_amplitude():
+    np.testing.assert_allclose(mask().limit_at([150, 300]), [0.1, 0.01])
+    log_mask = LimitMask([10, 1000], [1.0, 0.01], log_frequency=True)
+    assert log_mask.limit_at(100) == pytest.approx(0.1)
+    assert np.isnan(mask().limit_at([99.5, 400.5])).all()
+
+
+def test_bins_outside_the_mask_are_not_checked():
+    amplitude = flat(1e-6)
+    amplitude[:100] = 100.0
+    amplitude[401:] = 100.0
+    result = mask().check(FREQUENCIES, amplitude)
+    assert result['passed'] and not result['exceeded'].any()
+    no_overlap = LimitMask([1000, 2000], [1, 1]).check(FREQUENCIES, amplitude)
+    assert no_overlap['passed'] and np.isnan(no_overlap['worst_margin_db'])
+
+
+def test_rows_are_checked_together():
+    amplitudes = np.vstack([flat(0.005), flat(0.02), flat(2.0)])
+    result = mask().check(FREQUENCIES, amplitudes)
+    assert result['passed'].tolist() == [True, False, False]
+    assert result['violating_bins'][2] == 301
+    assert result['exceeded'].shape == amplitudes.shape
+
+
+def test_mask_files(tmp_path):
+    parsed = parse_mask("# corner points\n100, 1\n\n400; 0.01 # flat top\n200 0.01\n", name='spec')
+    np.testing.assert_array_equal(parsed.frequencies, [100, 200, 400])
+    path = str(tmp_path / 'spec.csv')
+    save_mask(path, parsed)
+    loaded = load_mask(path)
+    assert loaded.name == 'spec'
+    np.testing.assert_array_equal(loaded.limits, [1.0, 0.01, 0.01])
+    with pytest.raises(ValueError):
+        parse_mask("# nothing\n")
+    with pytest.raises(ValueError):
+        LimitMask([1, 2], [1, 0])
+
+
+def test_files_get_one_row_per_column(tmp_path):
+    t = np.arange(1000) / 1000.0
+    good = tmp_path / 'good.csv'
+    pd.DataFrame({'a': 0.001 * np.sin(2 * np.pi * 150 * t), 'b': 0.5 * np.sin(2 * np.pi * 300 * t)}).to_csv(
+        good, index=False)
+    broken = tmp_path / 'broken.bin'
+    broken.write_bytes(b'\x00' * 8)  # No descriptor
+
+    report = check_files([str(good), str(broken)], mask(), {}, 1000.0, workers=1)
+    rows = {(row.File, row.Column): row for row in report.itertuples()}
+    assert rows[('good.csv', 'a')].Result == 'PASS'
+    assert rows[('good.csv', 'b')].Result == 'FAIL'
+    assert rows[('good.csv', 'b')].Worst_Frequency_Hz == pytest.approx(300.0)
+    assert report[report['File'] == 'broken.bin']['Result'].tolist() == ['ERROR']
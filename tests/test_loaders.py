@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+from fft_core import extract_range, load_table, numeric_columns
+from loaders import MemmapTable, load_binary, write_descriptor
+
+
+def write_binary(path, frames, dtype, header=b''):
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(np.asarray(frames, dtype=dtype).tobytes())
+        f.write(b'\x01')  # Trailing partial frame, ignored
+
+
+def test_interleaved_channels_are_scaled(tmp_path):
+    frames = np.array([[1, -2], [3, -4], [5, -6]])
+    path = str(tmp_path / 'run.bin')
+    write_binary(path, frames, '<i2', header=b'HEAD')
+    write_descriptor(path, {'dtype': 'int16', 'channels': 2, 'sample_rate': 500, 'scale': 0.5, 'offset': 1.0,
+                            'header_bytes': 4, 'channel_names': ['Thrust', 'Current']})
+
+    table = load_table(path)
+    assert isinstance(table, MemmapTable)
+    assert len(table) == 3 and table.sample_rate == 500.0
+    assert numeric_columns(table) == ['Thrust', 'Current']
+    np.testing.assert_array_equal(table.column_values('Current'), [0.0, -1.0, -2.0])
+    np.testing.assert_array_equal(extract_range(table, 'Thrust', 2, 1), [2.5])
+    assert table.full_scale == (-32768 * 0.5 + 1.0, 32767 * 0.5 + 1.0)
+
+
+def test_big_endian_float_samples_in_single_precision(tmp_path):
+    path = str(tmp_path / 'run.dat')
+    write_binary(path, [[0.25], [-0.5]], '>f4')
+    table = load_binary(path, {'dtype': 'float32', 'channels': 1, 'sample_rate': 100, 'byte_order': 'big',
+                               'full_scale': [-2, 2]})
+    assert table.columns == ['Channel_1']
+    assert table.full_scale == (-2.0, 2.0)
+    table.dtype = np.dtype(np.float32)
+    values = table.column_values('Channel_1')
+    assert values.dtype == np.float32
+    np.testing.assert_array_equal(values, [0.25, -0.5])
+
+
+def test_descriptor_errors(tmp_path):
+    path = str(tmp_path / 'run.raw')
+    write_binary(path, [1, 2, 3, 4], '<i2')
+    with pytest.raises(ValueError, match="No descriptor"):
+        load_binary(path)
+    with pytest.raises(ValueError, match="Unsupported sample type"):
+        load_binary(path, {'dtype': 'int8', 'channels': 1})
+    with pytest.raises(ValueError, match="channel names"):
+        load_binary(path, {'dtype': 'int16', 'channels': 2, 'channel_names': ['a']})
+
+
+def test_wav_channels_in_full_scale_units(tmp_path):
+    path = str(tmp_path / 'take.wav')
+    wavfile.write(path, 8000, np.array([[16384, -32768], [0, 8192]], dtype=np.int16))
+    table = load_table(path)
+    assert table.sample_rate == 8000.0
+    assert table.columns == ['Channel_1', 'Channel_2']
+    np.testing.assert_array_equal(table.column_values('Channel_1'), [0.5, 0.0])
+    np.testing.assert_array_equal(table.column_values('Channel_2'), [-1.0, 0.25])
+
+
+def test_unsigned_8_bit_wav_is_centered(tmp_path):
+    path = str(tmp_path / 'take.wav')
+    wavfile.write(path, 8000, np.array([128, 0, 255], dtype=np.uint8))
+    np.testing.assert_array_equal(load_table(path).column_values('Channel_1'), [0.0, -1.0, 127 / 128])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from memory_budget import ValidSamples, estimate_full_bytes, plan_analysis, run_plan
+
+MB = 1024 * 1024
+
+
+def test_plans_follow_the_budget():
+    n = 10_000_000
+    assert plan_analysis(n, 8, 4096 * MB)['strategy'] == 'full'
+
+    averaged = plan_analysis(n, 8, 128 * MB)
+    assert averaged['strategy'] == 'averaged'
+    assert averaged['bytes'] <= 128 * MB < averaged['full_bytes']
+
+    decimated = plan_analysis(n, 8, 128 * MB, decimation=2)
+    assert decimated['strategy'] == 'decimated'
+    assert decimated['decimation'] > 2 and decimated['bytes'] <= 128 * MB
+
+    # Single precision and extra tapers move the estimate in opposite directions
+    assert estimate_full_bytes(n, 4) < estimate_full_bytes(n, 8) < estimate_full_bytes(n, 8, copies=7)
+    assert plan_analysis(n, 8, 1024 * MB, copies=7)['strategy'] == 'averaged'
+
+
+def test_quality_scan_is_dropped_first():
+    n = 1_000_000
+    full = estimate_full_bytes(n, 8)
+    plan = plan_analysis(n, 8, full + 1024, quality_scan=True)
+    assert plan['strategy'] == 'full' and not plan['quality_scan']
+    assert "quality scan skipped" in plan['reason']
+    assert plan_analysis(n, 8, 4 * full, quality_scan=True)['quality_scan']
+
+
+def test_valid_samples_skip_nans_across_chunks():
+    raw = np.arange(1000.0)
+    raw[::7] = np.nan
+    samples = ValidSamples(lambda start, end: raw[start:end], len(raw), chunk_size=64)
+    valid = raw[~np.isnan(raw)]
+    assert len(samples) == len(valid)
+    for start, stop in [(0, 10), (50, 200), (63, 65), (700, len(valid)), (5, 5)]:
+        np.testing.assert_array_equal(samples[start:stop], valid[start:stop])
+
+
+def sine(n, fs, frequency, amplitude=1.0):
+    return amplitude * np.sin(2 * np.pi * frequency * np.arange(n) / fs)
+
+
+def test_averaged_plan_keeps_the_sine_amplitude():
+    data = sine(200_000, 1000.0, 125.0, 0.6)
+    plan = dict(plan_analysis(len(data), 8, 0), strategy='averaged', segment_length=4096)
+    frequencies, amplitudes, n_valid, info = run_plan(plan, lambda s, e: data[s:e], len(data), 1000.0, 'none')
+    assert n_valid == len(data) and "averaged segments of 4096" in info
+    assert frequencies[np.argmax(amplitudes)] == pytest.approx(125.0, abs=0.25)
+    assert amplitudes.max() == pytest.approx(0.6, rel=0.01)
+
+
+def test_decimated_plan_keeps_the_resolution_of_the_low_band():
+    data = sine(200_000, 1000.0, 20.0) + sine(200_000, 1000.0, 400.0)
+    plan = dict(plan_analysis(len(data), 8, 0), strategy='decimated', decimation=10)
+    frequencies, amplitudes, _, _ = run_plan(plan, lambda s, e: data[s:e], len(data), 1000.0, 'hann')
+    assert frequencies[-1] < 50.0
+    assert frequencies[1] == pytest.approx(1000.0 / len(data), rel=1e-3)
+    assert frequencies[np.argmax(amplitudes)] == pytest.approx(20.0, abs=0.01)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from fft_core import MULTITAPER, compute_spectrum, compute_spectrum_batch
+from multitaper import fit_parameters, multitaper_amplitudes
+
+
+def noise(n=8192, seed=0):
+    return np.random.default_rng(seed).standard_normal(n)
+
+
+@pytest.mark.parametrize('adaptive', [True, False])
+def test_noise_level_matches_the_rectangular_window(adaptive):
+    data = noise()
+    _, rectangular = compute_spectrum(data, 1000.0, 'none')
+    _, tapered = compute_spectrum(data, 1000.0, MULTITAPER, {'nw': 4.0, 'n_tapers': 0, 'adaptive': adaptive})
+    rms = lambda amplitude: np.sqrt(np.mean(amplitude[1:] ** 2))
+    assert rms(tapered) == pytest.approx(rms(rectangular), rel=0.03)
+    # Averaging 7 eigenspectra leaves far less scatter than one periodogram
+    assert np.std(tapered[1:]) < 0.5 * np.std(rectangular[1:])
+
+
+def test_sine_peak_frequency():
+    t = np.arange(4096) / 1000.0
+    xf, amplitude = compute_spectrum(3.0 * np.sin(2 * np.pi * 125.0 * t), 1000.0, MULTITAPER)
+    assert xf[np.argmax(amplitude)] == pytest.approx(125.0, abs=0.5)
+
+
+def test_batch_matches_single_segments():
+    segments = noise(4 * 1024).reshape(4, 1024)
+    params = {'nw': 3.0, 'n_tapers': 4, 'adaptive': True}
+    _, batch = compute_spectrum_batch(segments, 1000.0, MULTITAPER, params)
+    for segment, amplitude in zip(segments, batch):
+        np.testing.assert_allclose(amplitude, compute_spectrum(segment, 1000.0, MULTITAPER, params)[1], rtol=1e-9)
+
+
+def test_float32_stays_single_precision():
+    data = noise(2048)
+    _, reference = compute_spectrum(data, 1000.0, MULTITAPER)
+    _, single = compute_spectrum(data.astype(np.float32), 1000.0, MULTITAPER)
+    assert single.dtype == np.float32
+    np.testing.assert_allclose(single, reference, rtol=1e-3, atol=1e-4 * reference.max())
+
+
+def test_short_data():
+    assert fit_parameters(2, 4.0) == (0.5, 1)
+    assert fit_parameters(16, 4.0, n_tapers=40) == (4.0, 15)
+    np.testing.assert_allclose(multitaper_amplitudes(np.array([1.0, -1.0])), [0.0, 2.0], atol=1e-12)
+    with pytest.raises(ValueError):
+        fit_parameters(1, 4.0)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from fft_core import compute_spectrum, compute_spectrum_batch
+from octave_bands import band_edges, band_levels, band_matrix, level_db
+
+
+def test_third_octave_series():
+    centers, lower, upper = band_edges(3, 850.0, 1150.0)
+    np.testing.assert_allclose(centers, [794.33, 1000.0, 1258.93], rtol=1e-4)
+    np.testing.assert_allclose(upper / lower, 10 ** 0.1)
+    np.testing.assert_allclose(upper[:-1], lower[1:])
+
+    centers, _, _ = band_edges(12, 990.0, 1010.0)
+    assert 1000.0 not in centers  # Even fractions put the band edges at the reference
+    with pytest.raises(ValueError):
+        band_edges(3, 0.0, 100.0)
+
+
+def test_sine_level_in_its_band():
+    fs = 8192.0
+    t = np.arange(8192) / fs
+    frequencies, amplitude = compute_spectrum(2.0 * np.sin(2 * np.pi * 1000.0 * t), fs)
+    centers, _, _, rms = band_levels(frequencies, amplitude, '1/3')
+    band = np.argmin(np.abs(centers - 1000.0))
+    assert rms[band] == pytest.approx(np.sqrt(2.0), rel=1e-6)
+    assert level_db(rms[band], np.sqrt(2.0)) == pytest.approx(0.0, abs=1e-6)
+    assert np.all(np.delete(rms, band) < 1e-9)
+
+
+@pytest.mark.parametrize('window_func', ['none', 'hann'])
+def test_noise_power_is_kept(window_func):
+    segments = np.random.default_rng(0).standard_normal((8, 4096))
+    frequencies, amplitudes = compute_spectrum_batch(segments, 1000.0, window_func)
+    _, _, _, rms = band_levels(frequencies, amplitudes, '1/1', window_func)
+    total = np.sqrt(np.sum(rms ** 2, axis=1))
+    np.testing.assert_allclose(total, np.std(segments, axis=1), rtol=0.05)
+
+
+def test_spectra_of_one_shape_share_the_band_matrix():
+    band_matrix.cache_clear()
+    frequencies = np.arange(513) * 2.0
+    amplitudes = np.random.default_rng(1).uniform(size=(3, 513))
+    _, _, _, together = band_levels(frequencies, amplitudes, '1/3')
+    for row, amplitude in zip(together, amplitudes):
+        np.testing.assert_allclose(row, band_levels(frequencies, amplitude, '1/3')[3])
+    assert band_matrix.cache_info().misses == 1
@@ -0,0 +1,18 @@
+import numpy as np
+
+from peak_tracking import track_peaks, track_summary
+
+
+def test_tones_are_followed_as_separate_tracks():
+    fs = 1000.0
+    t = np.arange(20000) / fs
+    rising = 100.0 + 2.0 * t  # 100 -> 140 Hz over 20 s
+    data = np.sin(2 * np.pi * np.cumsum(rising) / fs) + 0.5 * np.sin(2 * np.pi * 300.0 * t)
+
+    tracks = track_peaks(data, fs, 1024, 512, 'hann', peaks_per_frame=2)
+    summary = track_summary(tracks, min_frames=10).sort_values('Mean_Frequency_Hz')
+    assert len(summary) == 2
+    sweep, steady = summary.iloc[0], summary.iloc[1]
+    assert 35.0 < sweep['Frequency_Drift_Hz'] < 42.0
+    assert abs(steady['Mean_Frequency_Hz'] - 300.0) < 1.0
+    assert abs(steady['Frequency_Drift_Hz']) < 1.0
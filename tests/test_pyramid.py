@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pytest
+
+from pyramid import MinMaxPyramid, file_signature, pyramid_path
+
+
+def samples(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.standard_normal(n))
+
+
+def build(values, **kwargs):
+    return MinMaxPyramid.build(lambda start, end: values[start:end], len(values), base=8, factor=4, **kwargs)
+
+
+@pytest.mark.parametrize('start, end, n_pixels', [(0, 20000, 50), (1234, 9876, 100), (3, 20000, 1000),
+                                                   (500, 700, 10)])
+def test_query_bounds_the_raw_samples(start, end, n_pixels):
+    values = samples()
+    pyramid = build(values)
+    assert len(pyramid.levels) > 3
+    x, y = pyramid.query(start, end, n_pixels)
+    mins, maxs = y[0::2], y[1::2]
+    assert len(mins) >= n_pixels
+    assert mins.min() <= values[start:end].min()
+    assert maxs.max() >= values[start:end].max()
+    # Every block's envelope is exact for the rows it covers
+    size = x[2] - x[0]
+    for block_start, low, high in zip(x[0::2], mins, maxs):
+        block = values[block_start:block_start + size]
+        assert low == block.min() and high == block.max()
+
+
+def test_query_returns_none_for_short_ranges():
+    pyramid = build(samples())
+    assert pyramid.query(100, 100 + 4 * 50, 50) is None
+    assert pyramid.query(19990, 30000, 10) is None
+    assert pyramid.query(100, 100 + 4 * 50 + 1, 50) is not None
+
+
+def test_chunked_build_matches_one_pass():
+    values = samples(10007)
+    values[5000:5100] = np.nan
+    one_pass = build(values)
+    chunked = build(values, chunk_size=24)
+    assert len(chunked.levels) == len(one_pass.levels)
+    for (mins, maxs), (ref_mins, ref_maxs) in zip(chunked.levels, one_pass.levels):
+        np.testing.assert_array_equal(mins, ref_mins)
+        np.testing.assert_array_equal(maxs, ref_maxs)
+
+
+def test_load_rejects_a_stale_signature(tmp_path):
+    data_path = tmp_path / 'data.csv'
+    data_path.write_text('a\n1\n2\n')
+    values = samples(1000)
+    pyramid = build(values)
+    path = pyramid_path(str(data_path), 'Accel X')
+    assert os.path.basename(path) == 'data.csv.Accel_X.minmax.npz'
+
+    signature = file_signature(str(data_path), 'Accel X')
+    pyramid.save(path, signature)
+    loaded = MinMaxPyramid.load(path, signature)
+    assert loaded.n_samples == 1000 and (loaded.base, loaded.factor) == (8, 4)
+    np.testing.assert_array_equal(loaded.levels[0][1], pyramid.levels[0][1])
+
+    data_path.write_text('a\n1\n2\n3\n')
+    assert MinMaxPyramid.load(path, file_signature(str(data_path), 'Accel X')) is None
+    assert MinMaxPyramid.load(path, file_signature(str(data_path), 'Accel Y')) is None
+    assert MinMaxPyramid.load(str(tmp_path / 'missing.npz'), signature) is None
@@ -0,0 +1,57 @@
+import numpy as np
+from scipy.io import wavfile
+
+from fft_core import load_table, read_column
+from quality import scan_quality
+
+FS = 20000.0
+
+
+def slow_sine(amplitude, seconds=2.0, frequency=5.0):
+    t = np.arange(int(FS * seconds)) / FS
+    return np.round(amplitude * np.sin(2 * np.pi * frequency * t))
+
+
+def test_quantized_slow_sine_is_clean():
+    # Peaks at ~9% of int16 full scale; its rounded tops repeat the extreme value
+    report = scan_quality(slow_sine(3000))
+    assert report['clipped'] == 0
+    assert report['issues'] == []
+
+
+def test_quantized_slow_sine_is_clean_at_known_full_scale():
+    report = scan_quality(slow_sine(3000), full_scale=(-32768, 32767))
+    assert report['clipped'] == 0
+
+
+def test_hard_clipped_sine_is_flagged_without_full_scale():
+    data = np.clip(slow_sine(3000), -2400, 2400)
+    report = scan_quality(data)
+    assert report['clipped'] > 0.3 * len(data)
+    assert report['clipped_at_rails'][0] > 0 and report['clipped_at_rails'][1] > 0
+    assert any('clipped' in issue for issue in report['issues'])
+
+
+def test_sine_clipped_at_full_scale_is_flagged():
+    data = np.clip(slow_sine(1.2 * 32767), -32768, 32767)
+    report = scan_quality(data, full_scale=(-32768, 32767))
+    assert report['clipped'] > 0
+    assert report['rails'] == (-32768.0, 32767.0)
+
+
+def test_wav_full_scale_reaches_the_scan(tmp_path):
+    path = str(tmp_path / 'clipped.wav')
+    samples = np.clip(slow_sine(1.5 * 32767), -32768, 32767).astype(np.int16)
+    wavfile.write(path, int(FS), samples)
+    table = load_table(path)
+    assert table.full_scale == (-1.0, 32767 / 32768)
+    report = scan_quality(read_column(table, 'Channel_1'), full_scale=table.full_scale)
+    assert report['clipped'] > 0
+
+
+def test_missing_samples_are_counted():
+    data = np.sin(np.arange(1000) / 10.0)
+    data[100:110] = np.nan
+    report = scan_quality(data)
+    assert report['missing'] == 10
+    assert report['missing_runs'] == 1
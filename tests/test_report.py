@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from report import analyze_report_file, generate_reports, group_files, write_html, write_pdf
+
+
+def write_run(path, frequency, n=2000, fs=1000.0):
+    t = np.arange(n) / fs
+    pd.DataFrame({'Accel X': np.sin(2 * np.pi * frequency * t),
+                  'Accel Y': 0.1 * np.sin(2 * np.pi * 3 * frequency * t)}).to_csv(path, index=False)
+
+
+def test_columns_too_short_for_a_spectrum_are_skipped(tmp_path):
+    n = 1000
+    t = np.arange(n) / 1000.0
+    short = np.full(n, np.nan)
+    short[:3] = [1.0, 2.0, 0.5]
+    path = tmp_path / 'run.csv'
+    pd.DataFrame({'long': np.sin(2 * np.pi * 50 * t), 'short': short}).to_csv(path, index=False)
+
+    columns = analyze_report_file(str(path), {}, 1000.0)
+    assert [entry['column'] for entry in columns] == ['long']
+    assert abs(columns[0]['peaks']['Frequency_Hz'].iloc[0] - 50.0) < 1.0
+
+
+def test_files_are_grouped_by_pattern():
+    groups = group_files(['/d/unit1_a.csv', '/d/unit1_b.csv', '/d/unit2_a.csv', '/d/other.csv'], r'(unit\d+)_')
+    assert groups == {'unit1': ['/d/unit1_a.csv', '/d/unit1_b.csv'], 'unit2': ['/d/unit2_a.csv'],
+                      'other': ['/d/other.csv']}
+
+
+def test_pdf_and_html_reports_are_written(tmp_path):
+    path = tmp_path / 'run.csv'
+    write_run(path, 50)
+    columns = analyze_report_file(str(path), {}, 1000.0)
+
+    pdf_path = tmp_path / 'run.pdf'
+    write_pdf(str(pdf_path), 'run', columns)
+    assert pdf_path.read_bytes().startswith(b'%PDF')
+
+    html_path = tmp_path / 'run.html'
+    write_html(str(html_path), 'run', columns)
+    page = html_path.read_text(encoding='utf-8')
+    assert '<title>FFT report run</title>' in page
+    # The overlay of both columns plus one plot per column, embedded as PNG
+    assert page.count('<img src="data:image/png;base64,') == 3
+    assert '<h3>run.csv: Accel X</h3>' in page and '<h3>run.csv: Accel Y</h3>' in page
+
+
+@pytest.mark.parametrize('fmt', ['pdf', 'html'])
+def test_generate_reports_writes_one_file_per_group_and_reports_failures(tmp_path, fmt):
+    write_run(tmp_path / 'unit1_a.csv', 50)
+    write_run(tmp_path / 'unit1_b.csv', 60)
+    groups = group_files([str(tmp_path / 'unit1_a.csv'), str(tmp_path / 'unit1_b.csv'),
+                          str(tmp_path / 'unit2_missing.csv')], r'(unit\d+)_')
+    out_dir = str(tmp_path / 'reports')
+    calls = []
+
+    results = generate_reports(groups, out_dir, {}, 1000.0, fmt=fmt, workers=1,
+                               progress=lambda done, total: calls.append((done, total)))
+
+    assert list(results['Report']) == ['unit1', 'unit2']
+    ok, failed = results.iloc[0], results.iloc[1]
+    assert ok['Status'] == 'ok' and ok['Files'] == 2
+    assert ok['Path'] == os.path.join(out_dir, f"unit1_report.{fmt}")
+    assert os.path.getsize(ok['Path']) > 0
+    assert failed['Status'] == 'failed' and failed['Files'] == 1
+    assert 'unit2_missing.csv' in failed['Error']
+    assert not os.path.exists(os.path.join(out_dir, f"unit2_report.{fmt}"))
+    assert sorted(os.listdir(out_dir)) == [f"unit1_report.{fmt}"]
+    assert calls == [(1, 2), (2, 2)]
+
+
+def test_unknown_report_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        generate_reports({}, str(tmp_path), {}, 1000.0, fmt='docx')
@@ -0,0 +1,92 @@
+import pytest
+
+from results_model import ALL, ResultsModel
+
+
+def result(name, column='Accel X', window='hann', timestamp='2024-01-01 10:00:00'):
+    return {'analysis_name': name, 'column': column, 'window_func': window, 'timestamp': timestamp}
+
+
+def model():
+    results = ResultsModel()
+    results.add_many([
+        result('Run B', 'Accel X', 'hann', '2024-01-02 09:00:00'),
+        result('Run A', 'Accel Y', 'flattop', '2024-01-01 09:00:00'),
+        result('run b', 'Accel X', 'flattop', '2024-01-03 09:00:00'),
+        result('Idle', 'Accel Y', 'hann', '2024-02-01 09:00:00'),
+    ])
+    return results
+
+
+def test_add_many_returns_new_ids_and_refreshes_once(monkeypatch):
+    results = ResultsModel()
+    assert results.add(result('first')) == 1
+    calls = []
+    original = results.refresh
+    monkeypatch.setattr(results, 'refresh', lambda: (calls.append(1), original())[1])
+    assert results.add_many([result('second'), result('third')]) == [2, 3]
+    assert len(calls) == 1
+    assert results.view == [1, 2, 3]
+
+
+def test_ids_are_never_reused():
+    results = model()
+    results.remove([4])
+    assert results.add(result('Again')) == 5
+
+
+def test_filter_by_text_column_and_window():
+    results = model()
+    results.set_filter('run b')
+    assert results.view == [1, 3]
+    results.set_filter('2024-01-0')
+    assert results.view == [1, 2, 3]
+    results.set_filter(column='Accel Y')
+    assert results.view == [2, 4]
+    results.set_filter(window='flattop')
+    assert results.view == [2, 3]
+    results.set_filter('run', column='Accel X', window='flattop')
+    assert results.view == [3]
+    results.set_filter('', ALL, ALL)
+    assert results.view == [1, 2, 3, 4]
+
+
+def test_sort_toggles_and_ties_keep_id_order():
+    results = model()
+    results.set_sort('name')
+    # 'Run B' and 'run b' tie case-insensitively and stay in ID order
+    assert results.view == [4, 2, 1, 3]
+    results.set_sort('name')
+    assert results.sort_reverse
+    assert results.view == [3, 1, 2, 4]
+    results.set_sort('column')
+    assert not results.sort_reverse
+    assert results.view == [1, 3, 2, 4]
+    results.set_sort('id')
+    assert results.view == [1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        results.set_sort('color')
+
+
+def test_visible_slice():
+    results = model()
+    results.set_sort('date')
+    assert [row['id'] for row in results.visible_slice(1, 2)] == [1, 3]
+    assert [row['id'] for row in results.visible_slice(3, 10)] == [4]
+    assert results.visible_slice(10, 5) == []
+
+
+def test_checked_state_survives_remove_and_filter():
+    results = model()
+    results.set_checked([1, 2, 3], True)
+    results.remove([2])
+    assert results.checked_ids() == [1, 3]
+    assert not results.is_checked(2)
+    # Checked results hidden by the filter are still returned, after the visible ones
+    results.set_filter(column='Accel Y')
+    results.set_checked([4], True)
+    assert results.checked_ids() == [4, 1, 3]
+    results.set_checked([1], False)
+    assert results.checked_ids() == [4, 3]
+    results.clear()
+    assert results.checked_ids() == [] and len(results) == 0
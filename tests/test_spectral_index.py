@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from spectral_index import SpectralIndex
+
+FS = 1000.0
+
+
+def write_run(path, frequency=142.0, amplitude=0.5):
+    t = np.arange(4000) / FS
+    pd.DataFrame({'thrust': amplitude * np.sin(2 * np.pi * frequency * t),
+                  'current': 0.01 * np.sin(2 * np.pi * 30.0 * t)}).to_csv(path, index=False)
+
+
+def counts(index):
+    tables = ('files', 'analyses', 'peaks', 'band_energies')
+    return {table: index.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+
+
+@pytest.fixture
+def index(tmp_path):
+    with SpectralIndex(str(tmp_path / 'campaign.db')) as index:
+        yield index
+
+
+def test_up_to_date_files_are_skipped(tmp_path, index):
+    path = str(tmp_path / 'run1.csv')
+    write_run(path)
+    assert index.index_file(path, FS, 'hann') == 2
+    assert index.index_file(path, FS, 'hann') == 0
+    assert index.index_files([path], FS, 'hann') == [(path, 0)]
+
+
+def test_changed_files_and_parameters_are_reindexed(tmp_path, index):
+    path = str(tmp_path / 'run1.csv')
+    write_run(path)
+    index.index_file(path, FS, 'hann')
+    before = counts(index)
+
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert index.index_file(path, FS, 'hann') == 2
+    # The old analyses, peaks and band energies went with the replaced file row
+    assert counts(index) == before
+
+    assert index.index_file(path, FS, 'hann', max_peaks=1) == 2
+    assert counts(index)['peaks'] == 2
+    assert index.index_file(path, FS, 'none', max_peaks=1) == 2
+    assert index.conn.execute("SELECT DISTINCT window_func FROM analyses").fetchall()[0][0] == 'none'
+
+
+def test_peak_query_finds_the_tone(tmp_path, index):
+    write_run(str(tmp_path / 'run1.csv'), 142.0, 0.5)
+    write_run(str(tmp_path / 'run2.csv'), 142.0, 0.05)
+    write_run(str(tmp_path / 'run3.csv'), 160.0, 0.5)
+    index.index_files([str(tmp_path / f"run{i}.csv") for i in (1, 2, 3)], FS, 'none')
+
+    rows = index.query_peaks(140.0, 144.0, amp_min=0.1)
+    assert [os.path.basename(row['path']) for row in rows] == ['run1.csv']
+    assert rows[0]['column_name'] == 'thrust' and rows[0]['rank'] == 1
+    assert rows[0]['frequency'] == pytest.approx(142.0, abs=0.5)
+    assert rows[0]['amplitude'] == pytest.approx(0.5, rel=0.05)
+
+    assert len(index.query_peaks(140.0, 144.0)) == 2
+    assert len(index.query_peaks(140.0, 144.0, amp_max=0.1)) == 1
+    assert index.query_peaks(140.0, 144.0, column='current') == []
+
+
+def test_band_query_returns_overlapping_bands(tmp_path, index):
+    path = str(tmp_path / 'run1.csv')
+    write_run(path)
+    index.index_file(path, FS, 'hann', columns=['thrust'], band_edges=(0, 100, 200, 500))
+
+    def bands(fmin, fmax, **kwargs):
+        return sorted((row['band_low'], row['band_high']) for row in index.query_bands(fmin, fmax, **kwargs))
+
+    assert bands(150.0, 160.0) == [(100.0, 200.0)]
+    assert bands(90.0, 250.0) == [(0.0, 100.0), (100.0, 200.0), (200.0, 500.0)]
+    assert bands(100.0, 200.0) == [(100.0, 200.0)]  # Touching edges do not overlap
+    assert bands(0.0, 1000.0, energy_min=0.01) == [(100.0, 200.0)]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from fft_core import band_energies, compute_spectrum, detect_peaks
+from spectral_summary import (SUMMARY_ARRAYS, load_summaries, save_summaries, summarize_spectrum, summary_curve)
+
+
+def spectrum(n=65536, fs=10000.0):
+    t = np.arange(n) / fs
+    data = (np.sin(2 * np.pi * 60.0 * t) + 0.3 * np.sin(2 * np.pi * 1234.0 * t)
+            + 0.01 * np.random.default_rng(0).standard_normal(n))
+    return compute_spectrum(data, fs, 'hann')
+
+
+def test_summary_keeps_peaks_bins_and_band_energy():
+    frequencies, amplitude = spectrum()
+    peaks = detect_peaks(amplitude)
+    summary = summarize_spectrum(frequencies, amplitude, peaks, {'column': 'x'}, n_bins=64, top_k=2,
+                                 band_edges=(0, 100, 1000, 2000))
+    assert summary['meta']['column'] == 'x' and summary['meta']['n_bins'] == 64
+    np.testing.assert_allclose(summary['peak_frequencies'], [60.0, 1234.0], atol=0.2)
+
+    # Every spectrum bin past DC falls in exactly one log bin
+    curve_f, curve_max = summary_curve(summary)
+    assert curve_max.max() == pytest.approx(amplitude[1:].max(), rel=1e-6)
+    assert np.all(np.diff(curve_f) > 0)
+    assert np.nanmax(summary['bin_mean'] - summary['bin_max']) <= 0
+
+    np.testing.assert_array_equal(summary['band_edges'], np.float32([0, 100, 1000, 2000, frequencies[-1]]))
+    expected = band_energies(frequencies, amplitude, np.array([0, 100, 1000, 2000, frequencies[-1]]))
+    np.testing.assert_allclose(summary['band_energies'], expected, rtol=1e-5)
+
+
+def test_fine_log_bins_below_the_spacing_are_empty():
+    frequencies = np.arange(100) * 10.0
+    summary = summarize_spectrum(frequencies, np.ones(100), n_bins=256)
+    assert np.isnan(summary['bin_max']).any()
+    assert np.all(summary_curve(summary, 'mean')[1] == 1.0)
+    with pytest.raises(ValueError):
+        summarize_spectrum(frequencies[:2], np.ones(2))
+
+
+def test_summaries_round_trip(tmp_path):
+    frequencies, amplitude = spectrum(8192)
+    summaries = [summarize_spectrum(frequencies, amplitude * scale, detect_peaks(amplitude), {'run': scale})
+                 for scale in (1, 2)]
+    path = str(tmp_path / 'archive.npz')
+    save_summaries(path, summaries)
+    loaded = load_summaries(path)
+    assert [summary['meta']['run'] for summary in loaded] == [1, 2]
+    for saved, original in zip(loaded, summaries):
+        for name in SUMMARY_ARRAYS:
+            np.testing.assert_array_equal(saved[name], original[name])
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+
+from spectrum_cache import SpectrumCache, cache_key, digest_rows
+
+
+def key_of(data, **params):
+    digest = digest_rows(lambda start, end: data[start:end], len(data), chunk_size=100)
+    return cache_key(digest, params)
+
+
+def entry(n=1000):
+    return {'amplitudes': np.random.default_rng(n).standard_normal(n)}
+
+
+def test_key_depends_on_samples_and_parameters():
+    data = np.arange(1000.0)
+    assert key_of(data, window='hann') == key_of(data.copy(), window='hann')
+    assert key_of(data, window='hann') != key_of(data, window='none')
+    changed = data.copy()
+    changed[999] += 1
+    assert key_of(data, window='hann') != key_of(changed, window='hann')
+
+
+def test_hit_and_miss(tmp_path):
+    cache = SpectrumCache(str(tmp_path))
+    assert cache.get('ab' * 20) is None
+    arrays = entry()
+    cache.put('ab' * 20, arrays, {'n_points': 1000})
+    stored, meta = cache.get('ab' * 20)
+    np.testing.assert_array_equal(stored['amplitudes'], arrays['amplitudes'])
+    assert meta == {'n_points': 1000}
+    assert cache.get('cd' * 20) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SpectrumCache(str(tmp_path))
+    keys = [f"{i:02x}" * 20 for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.put(key, entry())
+        os.utime(cache.path(key), (1000 + i, 1000 + i))
+    size = os.path.getsize(cache.path(keys[0]))
+    cache.get(keys[0])  # Now the most recently used
+
+    cache.max_bytes = int(3.5 * size)
+    cache.put('ff' * 20, entry())
+    remaining = [key for key in keys if cache.get(key) is not None]
+    assert keys[0] in remaining
+    assert keys[1] not in remaining and keys[2] not in remaining
+    assert cache.usage()[1] <= cache.max_bytes
+    assert cache.total == cache.usage()[1]
+
+
+def test_writes_below_the_bound_do_not_walk_the_directory(tmp_path, monkeypatch):
+    cache = SpectrumCache(str(tmp_path))
+    cache.put('00' * 20, entry())
+    scans = []
+    original = cache.entries
+    monkeypatch.setattr(cache, 'entries', lambda: scans.append(1) or original())
+    for i in range(1, 10):
+        cache.put(f"{i:02x}" * 20, entry())
+    assert scans == []
+    assert cache.total == sum(size for _, size, _ in original())
+
+
+def test_clear(tmp_path):
+    cache = SpectrumCache(str(tmp_path))
+    cache.put('ab' * 20, entry())
+    cache.clear()
+    assert cache.usage() == (0, 0)
+    assert cache.get('ab' * 20) is None
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from fft_core import compute_spectrum
+from sweep import build_sweep_jobs, run_sweep, run_sweep_async, waterfall_matrix
+
+
+def test_jobs_fit_in_the_data():
+    jobs = build_sweep_jobs(1000, 1, 800, 100, [256, 512], ['hann'])
+    assert (1, 256, 'hann') in jobs and (401, 512, 'hann') in jobs
+    assert all(start - 1 + length <= 1000 for start, length, _ in jobs)
+    assert (601, 512, 'hann') not in jobs
+
+
+def test_process_pool_matches_serial_sweep():
+    data = np.random.default_rng(3).standard_normal(4096)
+    jobs = build_sweep_jobs(len(data), 1, 3000, 250, [256, 1024], ['none', 'hann'])
+    serial = run_sweep(data, 1000.0, jobs, workers=1)
+    parallel = run_sweep(data, 1000.0, jobs, workers=2)
+    assert len(serial) == len(parallel) == len(jobs)
+    for a, b in zip(serial, parallel):
+        assert (a['start_line'], a['n_lines'], a['window_func']) == (b['start_line'], b['n_lines'], b['window_func'])
+        np.testing.assert_array_equal(a['amplitudes'], b['amplitudes'])
+
+    start_lines, frequencies, amplitudes = waterfall_matrix(parallel, 1024, 'hann')
+    assert amplitudes.shape == (len(start_lines), 512)
+    _, expected = compute_spectrum(data[250:250 + 1024], 1000.0, 'hann')
+    np.testing.assert_allclose(amplitudes[list(start_lines).index(251)], expected, rtol=1e-6)
+
+
+def test_start_lines_stay_file_rows_across_gaps():
+    data = np.sin(2 * np.pi * 50.0 * np.arange(2000) / 1000.0)
+    data[300:310] = np.nan
+    jobs = build_sweep_jobs(len(data), 1, 1001, 200, [512], ['hann'])
+    results = {r['start_line']: r for r in run_sweep(data, 1000.0, jobs, workers=1)}
+
+    clean = results[601]
+    assert clean['n_valid'] == 512
+    _, expected = compute_spectrum(data[600:1112], 1000.0, 'hann')
+    np.testing.assert_allclose(clean['amplitudes'], expected, rtol=1e-6)
+
+    gapped = results[201]  # Rows 201-712 hold the ten missing samples
+    assert gapped['n_valid'] == 502
+    assert len(gapped['amplitudes']) == len(clean['amplitudes'])
+    assert gapped['peaks'][0][0] == pytest.approx(50.0, abs=2.0)
+
+
+def test_async_sweep_reports_from_its_thread():
+    data = np.random.default_rng(4).standard_normal(1024)
+    outcome, progress = [], []
+    thread = run_sweep_async(data, 1000.0, build_sweep_jobs(1024, 1, 513, 128, [256], ['none']),
+                             lambda results, error: outcome.append((results, error)),
+                             lambda done, total: progress.append((done, total)), workers=1)
+    thread.join(timeout=30)
+    results, error = outcome[0]
+    assert error is None and len(results) == 5
+    assert progress[-1] == (5, 5)
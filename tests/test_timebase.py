@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from timebase import (analyze_time_base, compute_nonuniform_spectrum, find_time_column, has_irregular_sampling,
+                      table_sample_rate)
+
+
+def test_rate_jitter_and_gaps():
+    times = np.arange(1000) / 250.0
+    info = analyze_time_base(times)
+    assert info['sample_rate'] == pytest.approx(250.0)
+    assert info['is_uniform'] and info['n_gaps'] == 0
+
+    gapped = np.concatenate((times[:400], times[500:]))
+    info = analyze_time_base(gapped)
+    assert info['n_gaps'] == 1
+    assert info['gap_starts'][0] == pytest.approx(times[399])
+    assert info['max_gap'] == pytest.approx(101 / 250.0)
+    assert not info['is_uniform']
+
+    jittered = times + np.random.default_rng(0).uniform(-0.05, 0.05, len(times)) / 250.0
+    assert analyze_time_base(jittered)['jitter'] > 0.01
+    assert has_irregular_sampling(jittered)
+    with pytest.raises(ValueError):
+        analyze_time_base(times[::-1])
+
+
+def test_sample_rate_from_the_time_column():
+    df = pd.DataFrame({'Time_s': np.arange(100) / 50.0, 'x': np.zeros(100)})
+    assert find_time_column(df) == 'Time_s'
+    assert table_sample_rate(df, 1000.0) == pytest.approx(50.0)
+    assert table_sample_rate(df[['x']], 1000.0) == 1000.0
+
+
+def test_missing_samples_need_the_nonuniform_spectrum():
+    times = np.arange(10) / 10.0
+    data = np.ones(10)
+    assert not has_irregular_sampling(times, data)
+    data[3] = np.nan
+    assert has_irregular_sampling(times, data)
+
+
+def test_tone_in_irregular_samples():
+    rng = np.random.default_rng(1)
+    times = np.sort(rng.uniform(0, 10.0, 5000))
+    times = times[(times < 4.0) | (times > 5.0)]  # One second missing
+    data = 0.8 * np.sin(2 * np.pi * 37.0 * times) + 0.25
+
+    frequencies, amplitude = compute_nonuniform_spectrum(times, data)
+    peak = np.argmax(amplitude[1:]) + 1
+    assert frequencies[peak] == pytest.approx(37.0, abs=0.15)
+    assert amplitude[peak] == pytest.approx(0.8, rel=0.05)
+    assert amplitude[0] == pytest.approx(0.5, rel=0.05)  # DC scaled as in compute_spectrum()
@@ -0,0 +1,110 @@
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from watch_folder import StableFileTracker, is_processed, main, output_paths, summaries_path, watch
+
+
+def write_tone(path, frequency, fs=1000.0, n=2000):
+    t = np.arange(n) / fs
+    pd.DataFrame({'Accel X': np.sin(2 * np.pi * frequency * t),
+                  'Accel Y': 0.5 * np.sin(2 * np.pi * 2 * frequency * t)}).to_csv(path, index=False)
+
+
+def test_tracker_reports_a_file_once_it_settles(tmp_path):
+    path = str(tmp_path / 'a.csv')
+    with open(path, 'w') as f:
+        f.write('x\n1\n')
+    tracker = StableFileTracker(stable_polls=2)
+    assert tracker.poll([path]) == []
+    assert tracker.poll([path]) == []
+    assert tracker.poll([path]) == [path]
+    # Reported once, not on every later poll
+    assert tracker.poll([path]) == []
+
+    # A write restarts the count
+    with open(path, 'a') as f:
+        f.write('2\n')
+    os.utime(path, (1, 1))
+    assert tracker.poll([path]) == []
+    assert tracker.poll([path]) == []
+    assert tracker.poll([path]) == [path]
+
+
+def test_tracker_skips_empty_and_forgets_removed_files(tmp_path):
+    empty = str(tmp_path / 'empty.csv')
+    open(empty, 'w').close()
+    tracker = StableFileTracker(stable_polls=1)
+    tracker.poll([empty])
+    assert tracker.poll([empty]) == []
+    assert tracker.poll([str(tmp_path / 'gone.csv')]) == []
+    assert tracker.seen == {}
+
+
+def test_is_processed_compares_output_and_input_times(tmp_path):
+    data_path = str(tmp_path / 'run.csv')
+    write_tone(data_path, 50)
+    out_dir = str(tmp_path / 'out')
+    os.makedirs(out_dir)
+    assert not is_processed(data_path, out_dir)
+
+    _, peaks_path = output_paths(data_path, out_dir)
+    with open(peaks_path, 'w') as f:
+        f.write('Column,Rank,Frequency_Hz,Amplitude\n')
+    os.utime(data_path, (1000, 1000))
+    os.utime(peaks_path, (2000, 2000))
+    assert is_processed(data_path, out_dir)
+    # The data file was rewritten after its outputs: process it again
+    os.utime(data_path, (3000, 3000))
+    assert not is_processed(data_path, out_dir)
+
+
+def test_once_run_writes_outputs_and_summary_rows(tmp_path):
+    watch_dir = tmp_path / 'incoming'
+    watch_dir.mkdir()
+    out_dir = str(tmp_path / 'out')
+    write_tone(str(watch_dir / 'first.csv'), 50)
+    write_tone(str(watch_dir / 'second.csv'), 120)
+    (watch_dir / 'notes.md').write_text('not data')
+
+    main([str(watch_dir), '--out', out_dir, '--once', '--interval', '0.05', '--stable-polls', '1',
+          '--workers', '1', '--settings', str(tmp_path / 'missing.json')])
+
+    with open(os.path.join(out_dir, 'summary.csv'), newline='') as f:
+        rows = {row['File']: row for row in csv.DictReader(f)}
+    assert set(rows) == {'first.csv', 'second.csv'}
+    for name, frequency in (('first.csv', 50), ('second.csv', 120)):
+        row = rows[name]
+        assert row['Status'] == 'ok'
+        assert float(row['Sample_Rate_Hz']) == 1000.0
+        assert int(row['Columns']) == 2
+        assert row['Top_Column'] == 'Accel X'
+        assert float(row['Top_Frequency_Hz']) == pytest.approx(frequency, abs=0.5)
+
+        data_path = str(watch_dir / name)
+        spectra_path, peaks_path = output_paths(data_path, out_dir)
+        with np.load(spectra_path) as spectra:
+            assert set(spectra.files) == {'frequencies_Accel X', 'amplitudes_Accel X',
+                                          'frequencies_Accel Y', 'amplitudes_Accel Y'}
+        peaks = pd.read_csv(peaks_path)
+        top = peaks[peaks['Rank'] == 1].set_index('Column')['Frequency_Hz']
+        assert top['Accel X'] == pytest.approx(frequency, abs=0.5)
+        assert top['Accel Y'] == pytest.approx(2 * frequency, abs=0.5)
+        assert os.path.exists(summaries_path(data_path, out_dir))
+        assert is_processed(data_path, out_dir)
+
+    # A restart skips files whose outputs are up to date
+    main([str(watch_dir), '--out', out_dir, '--once', '--interval', '0.05', '--stable-polls', '1',
+          '--workers', '1', '--settings', str(tmp_path / 'missing.json')])
+    with open(os.path.join(out_dir, 'summary.csv'), newline='') as f:
+        assert len(list(csv.DictReader(f))) == 2
+
+
+def test_output_directory_must_differ_from_the_watched_one(tmp_path):
+    with pytest.raises(ValueError):
+        watch(str(tmp_path), str(tmp_path) + os.sep, {}, 1000.0, once=True)
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), '--out', str(tmp_path), '--once'])
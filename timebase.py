@@ -0,0 +1,200 @@
+"""Time column analysis and spectra of non-uniformly sampled data.
+
+The sample rate, jitter and gaps are derived from the time column in a
+single vectorized pass. Irregular data is analyzed with the fast
+Lomb-Scargle method of Press & Rybicki (1989): the samples are
+extirpolated onto a uniform grid and the trigonometric sums are evaluated
+with FFTs, so the cost is O(N log N) instead of O(N * frequencies).
+"""
+from math import factorial
+
+import numpy as np
+
+import fft_backends
+from fft_core import TIME_COLUMN_NAMES, WINDOW_FUNCTIONS
+
+GAP_FACTOR = 1.5  # An interval longer than this many median periods is a gap
+JITTER_TOLERANCE = 0.01  # Relative period jitter still treated as uniform sampling
+
+
+def find_time_column(table):
+    """Return the name of the table's time column, or None"""
+    for column in getattr(table, 'columns', []):
+        if str(column).strip().lower() in TIME_COLUMN_NAMES:
+            return column
+    return None
+
+
+def analyze_time_base(times):
+    """Estimate the sample rate, jitter and gaps of a time column
+
+    Returns a dictionary with the detected 'sample_rate' (Hz), the
+    relative period 'jitter', the number and positions of gaps, and
+    whether the sampling can be treated as uniform.
+    """
+    times = np.asarray(times, dtype=float)
+    times = times[~np.isnan(times)]
+    if len(times) < 2:
+        raise ValueError("At least two time stamps are needed to detect the sample rate.")
+
+    dt = np.diff(times)
+    if np.any(dt <= 0):
+        raise ValueError("Time column is not strictly increasing.")
+
+    period = np.median(dt)
+    is_gap = dt > GAP_FACTOR * period
+    regular = dt[~is_gap]
+    jitter = float(np.std(regular) / period) if len(regular) else 0.0
+    gap_idx = np.flatnonzero(is_gap)
+
+    return {
+        'sample_rate': 1.0 / period,
+        'period': period,
+        'jitter': jitter,
+        'n_gaps': len(gap_idx),
+        'gap_starts': times[gap_idx],
+        'gap_lengths': dt[gap_idx],
+        'max_gap': float(dt[gap_idx].max()) if len(gap_idx) else 0.0,
+        'duration': times[-1] - times[0],
+        'is_uniform': len(gap_idx) == 0 and jitter < JITTER_TOLERANCE
+    }
+
+
+def table_sample_rate(table, default):
+    """Sample rate of a loaded table: its own rate, then its time column, else default"""
+    if getattr(table, 'sample_rate', None):
+        return table.sample_rate
+    time_column = find_time_column(table)
+    if time_column is not None:
+        try:
+            return analyze_time_base(table[time_column].values)['sample_rate']
+        except ValueError:
+            pass
+    return default
+
+
+def describe_time_base(info):
+    """Short human-readable summary of analyze_time_base() results"""
+    text = f"{info['sample_rate']:.6g} Hz, jitter {info['jitter'] * 100:.2f}%"
+    if info['n_gaps']:
+        text += f", {info['n_gaps']} gaps (longest {info['max_gap']:.4g} s)"
+    return text
+
+
+def _extirpolate(x, y, n, order=4):
+    """Spread values at fractional grid positions onto an n-point grid
+
+    The inverse of Lagrange interpolation of the given order, so that
+    sums of y * f(x) can be evaluated as sums over the grid.
+    """
+    # Samples that fall exactly on grid points need no spreading
+    exact = (x % 1 == 0)
+    result = _accumulate(x[exact].astype(int), y[exact], n)
+    x, y = x[~exact], y[~exact]
+
+    ilo = np.clip((x - order // 2).astype(int), 0, n - order)
+    numerator = y * np.prod(x - ilo - np.arange(order)[:, np.newaxis], axis=0)
+    denominator = factorial(order - 1)
+    for j in range(order):
+        if j > 0:
+            denominator *= j / (j - order)
+        ind = ilo + (order - 1 - j)
+        result += _accumulate(ind, numerator / (denominator * (x - ind)), n)
+    return result
+
+
+def _accumulate(indices, values, n):
+    """Unbuffered scatter-add of possibly complex values into an n-point grid"""
+    if np.iscomplexobj(values):
+        return (np.bincount(indices, values.real, minlength=n)
+                + 1j * np.bincount(indices, values.imag, minlength=n))
+    return np.bincount(indices, values, minlength=n)
+
+
+def _trig_sums(t, h, df, n_freq, freq_factor=1, oversampling=5, order=4):
+    """Compute sum(h * sin(2 pi f t)) and sum(h * cos(2 pi f t)) for f = k * df"""
+    df *= freq_factor
+    t0 = t.min()
+    n_grid = 1 << int(np.ceil(np.log2(n_freq * oversampling)))
+    tnorm = ((t - t0) * df) % 1
+    grid = _extirpolate(tnorm * n_grid, h, n_grid, order)
+    # The grid is real, so sum(grid * exp(+2j pi k m / n)) is the conjugate of its rfft
+    sums = np.conj(fft_backends.rfft(grid)[:n_freq])
+    if t0 != 0:
+        sums *= np.exp(2j * np.pi * t0 * df * np.arange(n_freq))
+    return sums.imag, sums.real
+
+
+def compute_nonuniform_spectrum(times, data, window_func='none', oversampling=5):
+    """Single-sided amplitude spectrum of irregularly sampled data
+
+    Uses the fast Lomb-Scargle periodogram and reports the amplitude of
+    the best-fit sinusoid at each frequency, which matches the scaling of
+    compute_spectrum() for uniformly sampled tones. The frequency grid
+    runs from 0 to half the median sample rate with a spacing of
+    1 / record length, like an FFT of the same record.
+    """
+    times = np.asarray(times, dtype=float)
+    data = np.asarray(data, dtype=float)
+    valid = ~(np.isnan(times) | np.isnan(data))
+    times, data = times[valid], data[valid]
+    if len(data) < 4:
+        raise ValueError("Not enough valid samples for a spectrum.")
+
+    order = np.argsort(times, kind='stable')
+    times, data = times[order], data[order]
+    duration = times[-1] - times[0]
+    if duration <= 0:
+        raise ValueError("Time stamps span no time.")
+
+    # Window evaluated at each sample's normalized position in the record
+    if window_func in WINDOW_FUNCTIONS:
+        positions = (times - times[0]) / duration
+        n_win = len(data)
+        data = data * np.interp(positions, np.linspace(0, 1, n_win), WINDOW_FUNCTIONS[window_func](n_win))
+
+    period = np.median(np.diff(times))
+    df = 1.0 / (duration + period)  # Record length, as for N samples of an FFT
+    n_freq = max(int(0.5 / period / df), 2)
+
+    weights = np.full(len(data), 1.0 / len(data))
+    mean = np.dot(weights, data)
+    centered = data - mean
+
+    sh, ch = _trig_sums(times, weights * centered, df, n_freq, oversampling=oversampling)
+    s2, c2 = _trig_sums(times, weights, df, n_freq, freq_factor=2, oversampling=oversampling)
+
+    # Skip f = 0, where the sine basis vanishes
+    sh, ch, s2, c2 = sh[1:], ch[1:], s2[1:], c2[1:]
+
+    tan_2wt = s2 / c2
+    c2w = 1.0 / np.sqrt(1.0 + tan_2wt ** 2)
+    s2w = tan_2wt * c2w
+    cw = np.sqrt(0.5 * (1.0 + c2w))
+    sw = np.sign(s2w) * np.sqrt(0.5 * (1.0 - c2w))
+
+    yc = ch * cw + sh * sw
+    ys = sh * cw - ch * sw
+    cc = 0.5 * (1.0 + c2 * c2w + s2 * s2w)
+    ss = 0.5 * (1.0 - c2 * c2w - s2 * s2w)
+
+    amplitude = np.empty(n_freq)
+    amplitude[0] = 2.0 * abs(mean)  # Same DC scaling as compute_spectrum()
+    amplitude[1:] = np.sqrt((yc / cc) ** 2 + (ys / ss) ** 2)
+    frequencies = df * np.arange(n_freq)
+    return frequencies, amplitude
+
+
+def has_irregular_sampling(times, data=None):
+    """Check whether a range needs the non-uniform spectrum
+
+    True when the range contains missing samples, gaps or jitter beyond
+    JITTER_TOLERANCE. Unusable time stamps fall back to uniform sampling.
+    """
+    times = np.asarray(times, dtype=float)
+    if np.isnan(times).any() or (data is not None and np.isnan(data).any()):
+        return True
+    try:
+        return not analyze_time_base(times)['is_uniform']
+    except ValueError:
+        return False
@@ -0,0 +1,277 @@
+"""Headless watch-folder processing of new data files.
+
+The watched directory is polled for data files. A file is taken once its
+size and modification time have stopped changing for a few polls, so
+files still being written by the acquisition PC are left alone. Each
+ready file is analyzed in a bounded process pool with the parameters of
+the saved ``fft_analyzer_settings.json``: every numeric column gets a
+data-quality scan, an FFT and peak detection, the spectra, peaks and
+compact spectral summaries are written to the output directory and one
+line per file is appended to ``summary.csv``.
+
+At most ``max_pending`` files are in the pool at a time. Files arriving
+faster than they can be processed wait on disk in arrival order instead
+of piling up in memory.
+
+Usage:
+    python watch_folder.py incoming/ --out results/ --fs 1000 --workers 2
+"""
+import argparse
+import csv
+import fnmatch
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from fft_core import (compute_spectrum, detect_peaks, extract_range, load_table,
+                      multitaper_params_from_settings, numeric_columns, peak_params_from_settings, read_column)
+from loaders import BINARY_EXTENSIONS, WAV_EXTENSIONS, descriptor_path
+from quality import describe_quality, scan_quality
+from spectral_index import load_settings_file
+from spectral_summary import save_summaries, summarize_spectrum
+from timebase import table_sample_rate
+
+DATA_PATTERNS = ('*.csv', '*.txt') + tuple('*' + ext for ext in WAV_EXTENSIONS + BINARY_EXTENSIONS)
+POLL_INTERVAL = 2.0  # Seconds between directory scans
+STABLE_POLLS = 2  # Scans a file must stay unchanged before it is processed
+SUMMARY_FILE = 'summary.csv'
+SUMMARY_FIELDS = ['File', 'Processed_At', 'Status', 'Sample_Rate_Hz', 'Columns',
+                  'Top_Column', 'Top_Frequency_Hz', 'Top_Amplitude', 'Quality', 'Seconds', 'Error']
+
+
+class StableFileTracker:
+    """Report files whose size and modification time have settled"""
+
+    def __init__(self, stable_polls=STABLE_POLLS):
+        self.stable_polls = stable_polls
+        self.seen = {}  # path -> ((size, mtime), consecutive unchanged polls)
+
+    def poll(self, paths):
+        """Update with the current directory listing and return the newly stable paths"""
+        ready = []
+        current = set(paths)
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Removed or renamed since the listing
+            signature = (stat.st_size, stat.st_mtime)
+            previous, count = self.seen.get(path, (None, 0))
+            count = count + 1 if signature == previous else 0
+            self.seen[path] = (signature, count)
+            if count == self.stable_polls and stat.st_size > 0:
+                ready.append(path)
+
+        # Forget files that have disappeared so a new file of the same name is picked up
+        for path in list(self.seen):
+            if path not in current:
+                del self.seen[path]
+        return ready
+
+
+def output_paths(file_path, out_dir):
+    """Spectra and peak file paths for a data file"""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(out_dir, f"{stem}_spectra.npz"), os.path.join(out_dir, f"{stem}_peaks.csv")
+
+
+def summaries_path(file_path, out_dir):
+    """Archive of the compact spectral summaries of a data file"""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(out_dir, f"{stem}_summary.npz")
+
+
+def is_processed(file_path, out_dir):
+    """True if the outputs of the file exist and are newer than the file itself"""
+    _, peaks_path = output_paths(file_path, out_dir)
+    return os.path.exists(peaks_path) and os.path.getmtime(peaks_path) >= os.path.getmtime(file_path)
+
+
+def same_directory(first, second):
+    """True if two paths name the same directory"""
+    return os.path.realpath(first) == os.path.realpath(second)
+
+
+def list_data_files(watch_dir, patterns=DATA_PATTERNS):
+    """Data files in the watched directory, oldest first"""
+    paths = []
+    for name in os.listdir(watch_dir):
+        path = os.path.join(watch_dir, name)
+        if os.path.isfile(path) and any(fnmatch.fnmatch(name.lower(), pattern) for pattern in patterns):
+            # Raw binary files are only usable once their descriptor is there
+            if name.lower().endswith(BINARY_EXTENSIONS) and not os.path.exists(descriptor_path(path)):
+                continue
+            paths.append(path)
+    return sorted(paths, key=lambda path: os.path.getmtime(path))
+
+
+def analyze_file(file_path, out_dir, settings, freq_hz, max_peaks=10):
+    """Analyze every numeric column of one file and write its spectra and peaks
+
+    Runs in a worker process. Returns the summary row of the file.
+    """
+    started = time.perf_counter()
+    peak_params = peak_params_from_settings(settings)
+    multitaper = multitaper_params_from_settings(settings)
+    window_func = settings.get('window_function', 'none')
+    table = load_table(file_path, dtype=settings.get('processing_precision', 'float64'))
+
+    # Same sample rate detection as the GUI: the file's own rate, then its time column
+    freq_hz = table_sample_rate(table, freq_hz)
+
+    spectra = {}
+    records = []
+    summaries = []
+    quality = []
+    for column in numeric_columns(table):
+        if settings.get('quality_scan', True):
+            report = scan_quality(read_column(table, column), full_scale=getattr(table, 'full_scale', None))
+            if report['issues']:
+                quality.append(f"{column}: {describe_quality(report)}")
+        data = extract_range(table, column, 1)
+        if len(data) < 2:
+            continue
+        xf, amplitude = compute_spectrum(data, freq_hz, window_func, multitaper)
+        spectra[f"frequencies_{column}"] = xf
+        spectra[f"amplitudes_{column}"] = amplitude
+
+        peaks_idx = sorted(detect_peaks(amplitude, peak_params),
+                           key=lambda idx: amplitude[idx], reverse=True)
+        if len(xf) >= 3:
+            summaries.append(summarize_spectrum(xf, amplitude, peaks_idx, {
+                'display_name': column, 'column': column, 'source_file': os.path.basename(file_path),
+                'window_func': window_func, 'freq_hz': freq_hz, 'start_line': 1, 'n_lines': len(data),
+                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}))
+        for rank, idx in enumerate(peaks_idx[:max_peaks], start=1):
+            records.append({'Column': column, 'Rank': rank,
+                            'Frequency_Hz': float(xf[idx]), 'Amplitude': float(amplitude[idx])})
+
+    spectra_path, peaks_path = output_paths(file_path, out_dir)
+    np.savez_compressed(spectra_path, **spectra)
+    save_summaries(summaries_path(file_path, out_dir), summaries)
+    peaks = pd.DataFrame(records, columns=['Column', 'Rank', 'Frequency_Hz', 'Amplitude'])
+    # Written last: its presence marks the file as processed
+    peaks.to_csv(peaks_path, index=False)
+
+    row = {
+        'File': os.path.basename(file_path),
+        'Status': 'ok',
+        'Sample_Rate_Hz': freq_hz,
+        'Columns': len(spectra) // 2,
+        'Quality': " | ".join(quality) or "ok",
+        'Seconds': round(time.perf_counter() - started, 3)
+    }
+    if not peaks.empty:
+        top = peaks.loc[peaks['Amplitude'].idxmax()]
+        row.update({'Top_Column': top['Column'], 'Top_Frequency_Hz': top['Frequency_Hz'],
+                    'Top_Amplitude': top['Amplitude']})
+    return row
+
+
+def append_summary(out_dir, row):
+    """Append one file's row to the summary CSV, writing the header for a new file"""
+    path = os.path.join(out_dir, SUMMARY_FILE)
+    new_file = not os.path.exists(path)
+    row = dict(row, Processed_At=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    with open(path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow(row)
+
+
+def watch(watch_dir, out_dir, settings, freq_hz, workers=2, max_pending=None,
+          interval=POLL_INTERVAL, stable_polls=STABLE_POLLS, max_peaks=10, once=False, log=print):
+    """Process files appearing in watch_dir until interrupted
+
+    With once=True the files already present are processed and the
+    function returns when they are done. The outputs are CSV files
+    themselves, so out_dir must not be the watched directory.
+    """
+    if same_directory(watch_dir, out_dir):
+        raise ValueError("The output directory must differ from the watched directory")
+    os.makedirs(out_dir, exist_ok=True)
+    max_pending = max_pending or 2 * workers
+    tracker = StableFileTracker(stable_polls)
+    queued = deque()
+    queued_set = set()
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            while True:
+                # Newly settled files join the queue in arrival order
+                for path in tracker.poll(list_data_files(watch_dir)):
+                    if path not in queued_set and path not in running.values() and not is_processed(path, out_dir):
+                        queued.append(path)
+                        queued_set.add(path)
+
+                # Backpressure: only max_pending files are handed to the pool
+                while queued and len(running) < max_pending:
+                    path = queued.popleft()
+                    queued_set.discard(path)
+                    running[pool.submit(analyze_file, path, out_dir, settings, freq_hz, max_peaks)] = path
+                if queued:
+                    log(f"{len(queued)} files waiting, {len(running)} in progress")
+
+                if running:
+                    done, _ = wait(running, timeout=interval, return_when=FIRST_COMPLETED)
+                else:
+                    done = set()
+                    if once and not queued and all(count >= stable_polls for _, count in tracker.seen.values()):
+                        return
+                    time.sleep(interval)
+
+                for future in done:
+                    path = running.pop(future)
+                    try:
+                        row = future.result()
+                        log(f"{path}: {row['Columns']} columns analyzed in {row['Seconds']} s")
+                    except Exception as e:
+                        row = {'File': os.path.basename(path), 'Status': 'failed', 'Error': str(e)}
+                        log(f"{path}: failed ({e})")
+                    append_summary(out_dir, row)
+        except KeyboardInterrupt:
+            log(f"Stopping; finishing {len(running)} files in progress")
+            for future in running:
+                future.cancel()
+            raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a directory and analyze new data files as they arrive")
+    parser.add_argument('watch_dir', help="Directory the acquisition PC writes to")
+    parser.add_argument('--out', default=None, help="Output directory (default: <watch_dir>/fft_results)")
+    parser.add_argument('--fs', type=float, default=1000.0,
+                        help="Acquisition frequency (Hz) for files without their own sample rate or time column")
+    parser.add_argument('--settings', default='fft_analyzer_settings.json',
+                        help="Settings file providing window and peak detection parameters")
+    parser.add_argument('--workers', type=int, default=2, help="Worker processes")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="Files handed to the workers at once (default: twice the workers)")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help="Seconds between scans")
+    parser.add_argument('--stable-polls', type=int, default=STABLE_POLLS,
+                        help="Scans a file must stay unchanged before it is processed")
+    parser.add_argument('--max-peaks', type=int, default=10, help="Peaks reported per column")
+    parser.add_argument('--once', action='store_true', help="Process the files present now and exit")
+    args = parser.parse_args(argv)
+
+    out_dir = args.out or os.path.join(args.watch_dir, 'fft_results')
+    if same_directory(args.watch_dir, out_dir):
+        parser.error("--out must differ from the watched directory, whose CSV files are taken as input")
+    settings = load_settings_file(args.settings)
+    print(f"Watching {args.watch_dir}, writing results to {out_dir}")
+    try:
+        watch(args.watch_dir, out_dir, settings, args.fs, workers=args.workers, max_pending=args.max_pending,
+              interval=args.interval, stable_polls=args.stable_polls, max_peaks=args.max_peaks, once=args.once)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()